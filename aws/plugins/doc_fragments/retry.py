@@ -0,0 +1,37 @@
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r'''
+options:
+  retry_max_attempts:
+    description:
+      - The maximum number of attempts of an AWS call that fails with a throttling or other retryable error.
+    type: int
+    default: 8
+  retry_base_delay:
+    description:
+      - The minimum delay in seconds before retrying a failed AWS call.
+      - Retries are delayed with decorrelated jitter, a random delay between this and three times the previous delay,
+        or 0.1 seconds if that is longer.
+    type: float
+    default: 1.0
+  retry_max_delay:
+    description:
+      - The maximum delay in seconds before retrying a failed AWS call.
+    type: float
+    default: 30.0
+  rate_limit:
+    description:
+      - The maximum number of AWS calls per second, shared by every task using the same region and credentials.
+      - The rate limiter is stored in '~/.pureport/ansible', or the PUREPORT_ANSIBLE_CACHE_DIR environment variable,
+        so tasks that run at the same time, e.g. on several hosts, share it.  A throttled call pauses all of them.
+      - Set to 0 to disable the rate limiter.
+    type: float
+    default: 5.0
+'''
@@ -0,0 +1,238 @@
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from hashlib import sha256
+from tempfile import mkstemp
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+    fcntl = None
+
+try:
+    from botocore.exceptions import ClientError
+except ImportError:
+    # handled by HAS_BOTO3
+    pass
+
+ENVIRONMENT_CACHE_DIR = 'PUREPORT_ANSIBLE_CACHE_DIR'
+DEFAULT_CACHE_DIR = '~/.pureport/ansible'
+RATE_LIMIT_FILE_NAME = 'aws_rate_limits.json'
+# The jitter grows from at least this delay, so a retry_base_delay of 0 does not retry without any delay
+MIN_JITTER_DELAY = 0.1
+
+# The error codes of calls that may succeed if they are retried
+THROTTLING_ERROR_CODES = frozenset([
+    'Throttling',
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'RequestLimitExceeded',
+])
+RETRYABLE_ERROR_CODES = THROTTLING_ERROR_CODES | frozenset([
+    'RequestTimeout',
+    'RequestTimeoutException',
+    'InternalFailure',
+    'ServiceUnavailable',
+    'DirectConnectServerException',
+    # Direct Connect rejects some calls until a connection or virtual interface it just created settles
+    'DirectConnectClientException',
+])
+
+
+def get_retry_argument_spec():
+    """
+    Return the retry policy params
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        retry_max_attempts=dict(type='int', default=8),
+        retry_base_delay=dict(type='float', default=1.0),
+        retry_max_delay=dict(type='float', default=30.0),
+        rate_limit=dict(type='float', default=5.0)
+    )
+
+
+class RetryPolicy(object):
+    def __init__(self, module, region, aws_connect_kwargs):
+        """
+        Retries failed AWS calls with decorrelated jitter backoff, and limits the
+        rate of calls with a token bucket shared by every task of the play that
+        uses the same region and credentials, so tasks that run at the same time
+        do not all get throttled.  A throttled call empties the shared bucket, so
+        the other tasks slow down as well.
+        :param AnsibleAWSModule module: the Ansible module
+        :param str region: the AWS region
+        :param dict aws_connect_kwargs: the boto3 connection params
+        """
+        self.max_attempts = max(1, module.params.get('retry_max_attempts'))
+        self.base_delay = max(0.0, module.params.get('retry_base_delay'))
+        self.max_delay = max(self.base_delay, module.params.get('retry_max_delay'))
+        self.rate_limit = module.params.get('rate_limit')
+        self.bucket_key = sha256('\0'.join('%s' % part for part in (
+            region,
+            aws_connect_kwargs.get('aws_access_key_id') or aws_connect_kwargs.get('profile_name')
+        )).encode('utf-8')).hexdigest()
+        self.calls = []
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __get_rate_limit_path():
+        """
+        Get the path of the file shared by every task that holds the rate limiter
+        token buckets, creating its directory if it does not exist yet.  This may be
+        overridden with the PUREPORT_ANSIBLE_CACHE_DIR environment variable.
+        :rtype: str
+        """
+        cache_dir = os.path.expanduser(os.environ.get(ENVIRONMENT_CACHE_DIR, DEFAULT_CACHE_DIR))
+        if not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir, 0o700)
+            except OSError:
+                # Another fork may have created it in the meantime
+                if not os.path.isdir(cache_dir):
+                    raise
+        return os.path.join(cache_dir, RATE_LIMIT_FILE_NAME)
+
+    @staticmethod
+    @contextmanager
+    def __locked_buckets():
+        """
+        Open the token buckets under an exclusive lock, so the tasks of a play that
+        run at the same time see a consistent view.  The yielded dict is written
+        back when the context exits without an error.
+        :rtype: dict
+        """
+        path = RetryPolicy.__get_rate_limit_path()
+        with open(path + '.lock', 'a') as lock_file:
+            if HAS_FCNTL:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(path) as f:
+                        buckets = json.load(f)
+                    if not isinstance(buckets, dict):
+                        buckets = dict()
+                except (IOError, OSError, ValueError):
+                    buckets = dict()
+                yield buckets
+                fd, tmp_path = mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        json.dump(buckets, f, separators=(',', ':'))
+                    os.chmod(tmp_path, 0o600)
+                    os.rename(tmp_path, path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            finally:
+                if HAS_FCNTL:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __acquire_token(self):
+        """
+        Take a token from the shared bucket, waiting until one is available
+        :returns: the time waited in seconds
+        :rtype: float
+        """
+        if not self.rate_limit or self.rate_limit <= 0:
+            return 0.0
+        burst = max(1.0, self.rate_limit)
+        waited = 0.0
+        while True:
+            with self.__locked_buckets() as buckets:
+                now = time.time()
+                bucket = buckets.get(self.bucket_key) or dict(tokens=burst, updated_at=now)
+                tokens = min(burst, bucket['tokens'] + max(0.0, now - bucket['updated_at']) * self.rate_limit)
+                if tokens >= 1:
+                    buckets[self.bucket_key] = dict(tokens=tokens - 1, updated_at=now)
+                    return waited
+                buckets[self.bucket_key] = dict(tokens=tokens, updated_at=now)
+                wait = (1 - tokens) / self.rate_limit
+            time.sleep(wait)
+            waited += wait
+
+    def __empty_bucket(self):
+        """
+        Empty the shared bucket after a throttled call
+        """
+        if not self.rate_limit or self.rate_limit <= 0:
+            return
+        with self.__locked_buckets() as buckets:
+            buckets[self.bucket_key] = dict(tokens=0.0, updated_at=time.time())
+
+    def call(self, operation, fn, *args, **kwargs):
+        """
+        Call an AWS operation, retrying it while it fails with a retryable error
+        :param str operation: the name of the operation, e.g. 'describe_virtual_interfaces'
+        :param fn: the boto3 client method
+        :returns: the result of the call
+        """
+        metrics = dict(operation=operation, attempts=0, retry_delay=0.0, rate_limit_delay=0.0, error_codes=[])
+        with self.__lock:
+            self.calls.append(metrics)
+        delay = self.base_delay
+        while True:
+            metrics['rate_limit_delay'] += self.__acquire_token()
+            metrics['attempts'] += 1
+            try:
+                return fn(*args, **kwargs)
+            except ClientError as e:
+                error_code = e.response.get('Error', dict()).get('Code')
+                if error_code not in RETRYABLE_ERROR_CODES or metrics['attempts'] >= self.max_attempts:
+                    raise
+                metrics['error_codes'].append(error_code)
+                if error_code in THROTTLING_ERROR_CODES:
+                    self.__empty_bucket()
+            # Decorrelated jitter: sleep = min(cap, random_between(base, sleep * 3))
+            delay = min(self.max_delay, random.uniform(self.base_delay, max(delay, MIN_JITTER_DELAY) * 3))
+            time.sleep(delay)
+            metrics['retry_delay'] += delay
+
+    def get_metrics(self):
+        """
+        Get the retry metrics of every call made so far, for the module output
+        :rtype: dict
+        """
+        with self.__lock:
+            calls = [dict(call, retry_delay=round(call['retry_delay'], 3), rate_limit_delay=round(call['rate_limit_delay'], 3))
+                     for call in self.calls]
+        return dict(
+            calls=calls,
+            total_calls=len(calls),
+            total_retries=sum(call['attempts'] - 1 for call in calls),
+            total_retry_delay=round(sum(call['retry_delay'] for call in calls), 3),
+            total_rate_limit_delay=round(sum(call['rate_limit_delay'] for call in calls), 3)
+        )
+
+
+class RetryingClient(object):
+    def __init__(self, client, policy):
+        """
+        A stand-in for a boto3 client that makes every call through a retry policy
+        :param client: the boto3 client
+        :param RetryPolicy policy: the retry policy
+        """
+        self.__client = client
+        self.__policy = policy
+
+    def __getattr__(self, name):
+        attr = getattr(self.__client, name)
+        if not callable(attr) or name.startswith('_') or name in ('can_paginate', 'get_paginator', 'get_waiter'):
+            return attr
+
+        def call(*args, **kwargs):
+            return self.__policy.call(name, attr, *args, **kwargs)
+        return call
@@ -0,0 +1,54 @@
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import time
+
+# The first delay between polls, which grows by WAIT_BACKOFF up to WAIT_MAX_DELAY
+WAIT_INITIAL_DELAY = 5.0
+WAIT_MAX_DELAY = 30.0
+WAIT_BACKOFF = 1.5
+
+
+def get_wait_argument_spec():
+    """
+    Return the wait params
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        wait=dict(type='bool', default=False),
+        wait_timeout=dict(type='int', default=600)
+    )
+
+
+def wait_for_states(get_states, ids, target_states, timeout, states=None):
+    """
+    Poll the states of many resources in a single loop, with a growing delay
+    between polls, until every resource is in one of the target states or the
+    timeout expires.  Each poll gets the states of all the resources that are
+    not in a target state yet.
+    :param (list[str]) -> dict[str, str] get_states: gets the states of resources by ID
+    :param list[str] ids: the IDs of the resources
+    :param collections.Iterable[str] target_states: the states to wait for, e.g. ['available']
+    :param int timeout: the maximum number of seconds to wait
+    :param dict[str, str] states: the known states, e.g. from before the resources were changed
+    :returns: the last states of the resources, and if all of them reached a target state
+    :rtype: (dict[str, str], bool)
+    """
+    target_states = set(target_states)
+    states = dict(states or dict())
+    deadline = time.time() + timeout
+    delay = WAIT_INITIAL_DELAY
+    while True:
+        pending_ids = [resource_id for resource_id in ids if states.get(resource_id) not in target_states]
+        if len(pending_ids) == 0:
+            return states, True
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return states, False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * WAIT_BACKOFF, WAIT_MAX_DELAY)
+        states.update(get_states(pending_ids))
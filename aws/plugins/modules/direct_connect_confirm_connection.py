@@ -18,6 +18,7 @@ module: aws_direct_connect_confirm_connection
 short_description: Confirms the creation of the specified hosted connection on an interconnect.
 description:
   - Confirms the creation of the specified hosted connection on an interconnect.
+  - Many hosted connections can be confirmed at the same time with I(connection_ids).
 version_added: "2.8"
 author: "Matt Traynham (@mtraynham)"
 requirements:
@@ -27,18 +28,72 @@ options:
   connection_id:
     description:
       - The ID of the hosted connection.
-    choices: [present, absent]
+      - Mutually exclusive with I(connection_ids).
+  connection_ids:
+    description:
+      - The IDs of many hosted connections, e.g. of both gateways of a highly available connection.
+      - The connections are described with a single call, and the ones in the C(ordering) state are confirmed
+        at the same time.
+      - Mutually exclusive with I(connection_id).
+    type: list
+    elements: str
+  wait:
+    description:
+      - Wait until every connection is C(available), polling them all in a single loop.
+      - Fails if a connection ends up C(down), C(rejected) or C(deleted), or the timeout expires.
+    type: bool
+    default: false
+  wait_timeout:
+    description:
+      - The maximum number of seconds to wait.
+    type: int
+    default: 600
 extends_documentation_fragment:
   - aws
   - ec2
+  - pureport.aws.retry
 '''
 
 RETURN = '''
 connection_state:
   description: The state of the connection.
-  returned: always
+  returned: when I(connection_id) is given
   type: str
   sample: pending
+connection_states:
+  description: The state of each connection, by connection ID.
+  returned: always
+  type: dict
+  sample: {"dxcon-fgb175av": "pending", "dxcon-ffx5tq1n": "pending"}
+retry_metrics:
+  description: The attempts and delays of each AWS call made by the task.
+  returned: always
+  type: complex
+  contains:
+    calls:
+      description: The AWS calls, with their operation, attempts, retry delay, rate limit delay and retried error codes.
+      returned: always
+      type: list
+    total_calls:
+      description: The number of AWS calls.
+      returned: always
+      type: int
+      sample: 1
+    total_retries:
+      description: The number of retried attempts.
+      returned: always
+      type: int
+      sample: 0
+    total_retry_delay:
+      description: The seconds waited before retrying.
+      returned: always
+      type: float
+      sample: 0.0
+    total_rate_limit_delay:
+      description: The seconds waited for the rate limiter.
+      returned: always
+      type: float
+      sample: 0.0
 '''
 
 EXAMPLES = '''
@@ -46,52 +101,145 @@ EXAMPLES = '''
 - name: confirm the connection id
   aws_direct_connect_confirm_connection:
     connection_id: dxcon-XXXXXXXX
+
+- name: confirm the connections of both gateways and wait until they are available
+  aws_direct_connect_confirm_connection:
+    connection_ids:
+      - dxcon-XXXXXXXX
+      - dxcon-YYYYYYYY
+    wait: true
 '''
 
+import traceback
 from ansible.module_utils.aws.core import AnsibleAWSModule
 from ansible.module_utils.aws.direct_connect import DirectConnectError
 from ansible.module_utils.ec2 import (boto3_conn,
                                       ec2_argument_spec,
                                       get_aws_connection_info)
+from ..module_utils.direct_connect_retry import \
+    RetryingClient, \
+    RetryPolicy, \
+    get_retry_argument_spec
+from ..module_utils.direct_connect_wait import \
+    get_wait_argument_spec, \
+    wait_for_states
+
+try:
+    from botocore.exceptions import ClientError, BotoCoreError
+except ImportError:
+    # handled by HAS_BOTO3
+    pass
+
+# The states a connection does not leave without another change
+FINAL_CONNECTION_STATES = ('available', 'down', 'rejected', 'deleted')
+# The maximum number of connections confirmed at the same time
+CONFIRM_CONCURRENCY = 10
+
+
+def get_connection_states(module, client, connection_ids):
+    '''
+        Returns the state of each connection, by connection ID. A single connection is described by its ID,
+        otherwise all the connections are described with a single call.
+    '''
+    try:
+        if len(connection_ids) == 1:
+            connections = client.describe_connections(connectionId=connection_ids[0])['connections']
+        else:
+            connections = client.describe_connections()['connections']
+    except (ClientError, BotoCoreError) as e:
+        raise DirectConnectError("Failed to describe connections", traceback.format_exc(), e)
+    states = dict((c['connectionId'], c['connectionState']) for c in connections if c['connectionId'] in connection_ids)
+    missing_ids = [connection_id for connection_id in connection_ids if connection_id not in states]
+    if missing_ids:
+        module.fail_json(msg="Direct Connect Connection {0} not found.".format(', '.join(missing_ids)))
+    return states
+
+
+def confirm_connection(client, connection_id):
+    '''
+        Confirms a connection, returning its new state
+    '''
+    try:
+        return client.confirm_connection(connectionId=connection_id)['connectionState']
+    except (ClientError, BotoCoreError) as e:
+        raise DirectConnectError("Failed to confirm connection {0}".format(connection_id), traceback.format_exc(), e)
 
 
-def get_connection_state(module, client, connection_id):
+def confirm_connections(client, connection_ids):
+    '''
+        Confirms many connections at the same time, returning the new state of each connection, by connection ID
+    '''
+    if len(connection_ids) == 1:
+        return {connection_ids[0]: confirm_connection(client, connection_ids[0])}
+
+    # multiprocessing is slow to import, so it is only imported to confirm many connections
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(min(len(connection_ids), CONFIRM_CONCURRENCY))
     try:
-        return client.describe_connections(
-            connectionId=connection_id
-        )['connections'][0]['connectionState']
-    except IndexError:
-        module.fail_json(msg="Direct Connect Connection {} not found.".format(connection_id))
+        new_states = pool.map(lambda connection_id: confirm_connection(client, connection_id), connection_ids)
+    finally:
+        pool.close()
+    return dict(zip(connection_ids, new_states))
 
 
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
-        connection_id=dict(required=True)
+        connection_id=dict(),
+        connection_ids=dict(type='list', elements='str')
     ))
-    module = AnsibleAWSModule(argument_spec=argument_spec)
+    argument_spec.update(get_retry_argument_spec())
+    argument_spec.update(get_wait_argument_spec())
+    module = AnsibleAWSModule(argument_spec=argument_spec,
+                              required_one_of=[['connection_id', 'connection_ids']],
+                              mutually_exclusive=[['connection_id', 'connection_ids']])
 
     region, ec2_url, aws_connect_kwargs = get_aws_connection_info(module, boto3=True)
-    connection = boto3_conn(module, conn_type='client', resource='directconnect', region=region, endpoint=ec2_url, **aws_connect_kwargs)
+    policy = RetryPolicy(module, region, aws_connect_kwargs)
+    connection = RetryingClient(
+        boto3_conn(module, conn_type='client', resource='directconnect', region=region, endpoint=ec2_url, **aws_connect_kwargs),
+        policy
+    )
 
     connection_id = module.params['connection_id']
+    connection_ids = [connection_id] if connection_id else []
+    for c in module.params['connection_ids'] or []:
+        if c not in connection_ids:
+            connection_ids.append(c)
     changed = False
-    connection_state = None
+    connection_states = dict()
     try:
-        connection_state = get_connection_state(module, connection, connection_id)
-        if connection_state == 'ordering':
-            connection.confirm_connection(
-                connectionId=module.params['connection_id']
-            )
+        if connection_ids:
+            connection_states = get_connection_states(module, connection, connection_ids)
+        ordering_ids = [c for c in connection_ids if connection_states[c] == 'ordering']
+        if ordering_ids:
+            connection_states.update(confirm_connections(connection, ordering_ids))
             changed = True
-            connection_state = get_connection_state(module, connection, connection_id)
+        if module.params['wait']:
+            connection_states, completed = wait_for_states(
+                lambda ids: get_connection_states(module, connection, ids),
+                connection_ids,
+                FINAL_CONNECTION_STATES,
+                module.params['wait_timeout'],
+                states=connection_states
+            )
+            unavailable_ids = [c for c in connection_ids if connection_states[c] != 'available']
+            if unavailable_ids:
+                if completed:
+                    msg = "Connections {0} did not become available.".format(', '.join(unavailable_ids))
+                else:
+                    msg = "Timed out waiting for connections {0} to become available.".format(', '.join(unavailable_ids))
+                module.fail_json(msg=msg, changed=changed, connection_states=connection_states, retry_metrics=policy.get_metrics())
     except DirectConnectError as e:
         if e.exception:
-            module.fail_json_aws(exception=e.exception, msg=e.msg)
+            module.fail_json_aws(exception=e.exception, msg=e.msg, retry_metrics=policy.get_metrics())
         else:
-            module.fail_json(msg=e.msg)
+            module.fail_json(msg=e.msg, retry_metrics=policy.get_metrics())
 
-    module.exit_json(changed=changed, connection_state=connection_state)
+    result = dict(changed=changed, connection_states=connection_states, retry_metrics=policy.get_metrics())
+    if connection_id:
+        result['connection_state'] = connection_states[connection_id]
+    module.exit_json(**result)
 
 
 if __name__ == '__main__':
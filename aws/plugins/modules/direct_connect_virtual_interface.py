@@ -26,6 +26,7 @@ options:
   id_to_associate:
     description:
       - The ID of the link aggrecation group or connection to associate with the virtual interface.
+      - Required, unless every item of I(virtual_interfaces) has it.
     aliases: [link_aggregation_group_id, connection_id]
   public:
     description:
@@ -68,9 +69,34 @@ options:
   virtual_interface_id:
     description:
       - The virtual interface ID.
+  virtual_interfaces:
+    description:
+      - Reconcile many virtual interfaces, e.g. one for each gateway of a highly available connection, in a
+        single task.
+      - Each item may have any of the I(state), I(id_to_associate), I(public), I(name), I(vlan), I(bgp_asn),
+        I(authentication_key), I(amazon_address), I(customer_address), I(address_type), I(cidr),
+        I(virtual_gateway_id), I(direct_connect_gateway_id) and I(virtual_interface_id) options, which override
+        the options of the task for that virtual interface.
+      - All virtual interfaces are matched against a single describe call, the ones that need it are created,
+        modified or deleted at the same time, and with I(wait) all of them are polled in a single loop.
+    type: list
+    elements: dict
+  wait:
+    description:
+      - Wait until the virtual interface is C(available), C(down), C(rejected) or C(deleted), polling it with
+        a growing delay, rather than returning its state right after creating or modifying it.
+      - With I(state=absent), wait until the deleted virtual interface is C(deleted).
+    type: bool
+    default: false
+  wait_timeout:
+    description:
+      - The maximum number of seconds to wait.
+    type: int
+    default: 600
 extends_documentation_fragment:
   - aws
   - ec2
+  - pureport.aws.retry
 '''
 
 RETURN = '''
@@ -210,6 +236,44 @@ vlan:
   returned: always
   type: int
   sample: 100
+virtual_interfaces:
+  description:
+    - The result of each item of I(virtual_interfaces), in order, with whether it changed and the same fields as
+      a single virtual interface. A deleted virtual interface only has I(changed).
+    - If some of them failed, the task fails with the result of every item, where a failed item has I(failed),
+      I(msg) and I(error), and the task's I(changed) is whether any other item changed.
+  returned: when I(virtual_interfaces) is given
+  type: list
+  elements: dict
+retry_metrics:
+  description: The attempts and delays of each AWS call made by the task.
+  returned: always
+  type: complex
+  contains:
+    calls:
+      description: The AWS calls, with their operation, attempts, retry delay, rate limit delay and retried error codes.
+      returned: always
+      type: list
+    total_calls:
+      description: The number of AWS calls.
+      returned: always
+      type: int
+      sample: 1
+    total_retries:
+      description: The number of retried attempts.
+      returned: always
+      type: int
+      sample: 0
+    total_retry_delay:
+      description: The seconds waited before retrying.
+      returned: always
+      type: float
+      sample: 0.0
+    total_rate_limit_delay:
+      description: The seconds waited for the rate limiter.
+      returned: always
+      type: float
+      sample: 0.0
 '''
 
 EXAMPLES = '''
@@ -221,6 +285,29 @@ EXAMPLES = '''
     link_aggregation_group_id: LAG-XXXXXXXX
     connection_id: dxcon-XXXXXXXX
 
+- name: create a private virtual interface and wait until it is available
+  aws_direct_connect_virtual_interface:
+    state: present
+    name: "{{ name }}"
+    public: false
+    connection_id: dxcon-XXXXXXXX
+    direct_connect_gateway_id: XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX
+    wait: true
+
+- name: create a private virtual interface for each gateway of a highly available connection
+  aws_direct_connect_virtual_interface:
+    state: present
+    public: false
+    direct_connect_gateway_id: XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX
+    virtual_interfaces:
+      - name: "{{ name }}-1"
+        connection_id: dxcon-XXXXXXXX
+        vlan: 101
+      - name: "{{ name }}-2"
+        connection_id: dxcon-YYYYYYYY
+        vlan: 102
+    wait: true
+
 - name: remove an association between a connection and virtual interface
   aws_direct_connect_virtual_interface:
     state: absent
@@ -232,9 +319,16 @@ EXAMPLES = '''
 import traceback
 from ansible.module_utils.aws.core import AnsibleAWSModule
 from ansible.module_utils.aws.direct_connect import DirectConnectError, delete_virtual_interface
-from ansible.module_utils.ec2 import (AWSRetry, boto3_conn,
+from ansible.module_utils.ec2 import (boto3_conn,
                                       ec2_argument_spec, get_aws_connection_info,
                                       camel_dict_to_snake_dict)
+from ..module_utils.direct_connect_retry import \
+    RetryingClient, \
+    RetryPolicy, \
+    get_retry_argument_spec
+from ..module_utils.direct_connect_wait import \
+    get_wait_argument_spec, \
+    wait_for_states
 
 try:
     from botocore.exceptions import ClientError, BotoCoreError
@@ -243,14 +337,23 @@ except ImportError:
     pass
 
 
+# The states a virtual interface does not leave without another change
+FINAL_VI_STATES = ('available', 'down', 'rejected', 'deleted')
+# The options that may be given per item of virtual_interfaces
+VI_OPTIONS = ('state', 'id_to_associate', 'public', 'name', 'vlan', 'bgp_asn', 'authentication_key', 'amazon_address',
+              'customer_address', 'address_type', 'cidr', 'virtual_gateway_id', 'virtual_interface_id', 'direct_connect_gateway_id')
+# The maximum number of virtual interfaces of virtual_interfaces changed at the same time
+BATCH_CONCURRENCY = 10
+
+
 def try_except_ClientError(failure_msg):
     '''
-        Wrapper for boto3 calls that uses AWSRetry and handles exceptions
+        Wrapper for boto3 calls that handles exceptions. The calls are retried by the client's RetryPolicy.
     '''
     def wrapper(f):
         def run_func(*args, **kwargs):
             try:
-                result = AWSRetry.backoff(tries=8, delay=5, catch_extra_error_codes=['DirectConnectClientException'])(f)(*args, **kwargs)
+                result = f(*args, **kwargs)
             except (ClientError, BotoCoreError) as e:
                 raise DirectConnectError(failure_msg, traceback.format_exc(), e)
             return result
@@ -258,58 +361,124 @@ def try_except_ClientError(failure_msg):
     return wrapper
 
 
-def find_unique_vi(client, connection_id, virtual_interface_id, name):
+class VirtualInterfacesError(DirectConnectError):
+    def __init__(self, labels, results, errors):
+        '''
+            Raised when some virtual interfaces of a batch failed, after the others were applied
+            :param labels: the label of each virtual interface
+            :param results: if anything changed, and the latest state, for each virtual interface
+            :param errors: the DirectConnectError of each virtual interface, or None if it succeeded
+        '''
+        failed = [(label, error) for label, error in zip(labels, errors) if error is not None]
+        super(VirtualInterfacesError, self).__init__('; '.join('{0}: {1}'.format(label, error.msg) for label, error in failed),
+                                                     failed[0][1].last_traceback, failed[0][1].exception)
+        self.results = results
+        self.errors = errors
+
+
+class VirtualInterfaceSnapshot(object):
+    '''
+        The virtual interfaces of a single describe_virtual_interfaces call, indexed by ID, name and connection ID,
+        so finding a virtual interface, checking if it needs modification and returning its state do not describe
+        it again. Writes update the snapshot with the virtual interface they return.
+    '''
+
+    def __init__(self, client, virtual_interface_id=None):
+        # Get the virtual interfaces, filtering by the ID if provided.
+        vi_params = {}
+        if virtual_interface_id:
+            vi_params = {'virtualInterfaceId': virtual_interface_id}
+
+        virtual_interfaces = try_except_ClientError(
+            failure_msg="Failed to describe virtual interface")(
+            client.describe_virtual_interfaces)(**vi_params).get('virtualInterfaces')
+
+        self.by_id = {}
+        self.by_name = {}
+        self.by_connection_id = {}
+        for vi in virtual_interfaces:
+            self.update(vi)
+
+    def update(self, vi):
+        '''
+            Adds or replaces a virtual interface, e.g. the one returned by a create or associate call
+        '''
+        vi = dict((k, v) for k, v in vi.items() if k != 'ResponseMetadata')
+        virtual_interface_id = vi['virtualInterfaceId']
+        previous = self.by_id.get(virtual_interface_id)
+        if previous is not None:
+            self.__remove_from_index(self.by_name, previous.get('virtualInterfaceName'), virtual_interface_id)
+            self.__remove_from_index(self.by_connection_id, previous.get('connectionId'), virtual_interface_id)
+        self.by_id[virtual_interface_id] = vi
+
+        # Deleting/deleted virtual interfaces are never matched.
+        if vi['virtualInterfaceState'] not in ('deleting', 'deleted'):
+            self.by_name.setdefault(vi.get('virtualInterfaceName'), []).append(virtual_interface_id)
+            self.by_connection_id.setdefault(vi.get('connectionId'), []).append(virtual_interface_id)
+
+    @staticmethod
+    def __remove_from_index(index, key, virtual_interface_id):
+        if virtual_interface_id in index.get(key, []):
+            index[key].remove(virtual_interface_id)
+
+    def get(self, virtual_interface_id):
+        '''
+            Returns the state of the virtual interface.
+        '''
+        return self.by_id[virtual_interface_id]
+
+    def live_ids(self):
+        '''
+            Returns the IDs of the virtual interfaces that are not deleting/deleted
+        '''
+        return [virtual_interface_id for ids in self.by_name.values() for virtual_interface_id in ids]
+
+
+def find_unique_vi(snapshot, connection_id, virtual_interface_id, name):
     '''
         Determines if the virtual interface exists. Returns the virtual interface ID if an exact match is found.
         If multiple matches are found False is returned. If no matches are found None is returned.
     '''
-
-    # Get the virtual interfaces, filtering by the ID if provided.
-    vi_params = {}
-    if virtual_interface_id:
-        vi_params = {'virtualInterfaceId': virtual_interface_id}
-
-    virtual_interfaces = try_except_ClientError(
-        failure_msg="Failed to describe virtual interface")(
-        client.describe_virtual_interfaces)(**vi_params).get('virtualInterfaces')
-
-    # Remove deleting/deleted matches from the results.
-    virtual_interfaces = [vi for vi in virtual_interfaces if vi['virtualInterfaceState'] not in ('deleting', 'deleted')]
-
-    matching_virtual_interfaces = filter_virtual_interfaces(virtual_interfaces, name, connection_id)
+    matching_virtual_interfaces = filter_virtual_interfaces(snapshot, virtual_interface_id, name, connection_id)
     return exact_match(matching_virtual_interfaces)
 
 
-def exact_match(virtual_interfaces):
+def exact_match(virtual_interface_ids):
     '''
         Returns the virtual interface ID if one was found,
         None if the virtual interface ID needs to be created,
         False if an exact match was not found
     '''
 
-    if not virtual_interfaces:
+    if not virtual_interface_ids:
         return None
-    if len(virtual_interfaces) == 1:
-        return virtual_interfaces[0]['virtualInterfaceId']
+    if len(virtual_interface_ids) == 1:
+        return virtual_interface_ids[0]
     else:
         return False
 
 
-def filter_virtual_interfaces(virtual_interfaces, name, connection_id):
+def filter_virtual_interfaces(snapshot, virtual_interface_id, name, connection_id):
     '''
         Filters the available virtual interfaces to try to find a unique match
     '''
+    # Filter by the ID if provided.
+    live_ids = snapshot.live_ids()
+    if virtual_interface_id:
+        live_ids = [i for i in live_ids if i == virtual_interface_id]
+
     # Filter by name if provided.
     if name:
-        matching_by_name = find_virtual_interface_by_name(virtual_interfaces, name)
+        matching_by_name = [i for i in snapshot.by_name.get(name, []) if i in live_ids]
         if len(matching_by_name) == 1:
             return matching_by_name
     else:
-        matching_by_name = virtual_interfaces
+        matching_by_name = live_ids
 
     # If there isn't a unique match filter by connection ID as last resort (because connection_id may be a connection yet to be associated)
     if connection_id and len(matching_by_name) > 1:
-        matching_by_connection_id = find_virtual_interface_by_connection_id(matching_by_name, connection_id)
+        matching_by_connection_id = [virtual_interface_id for virtual_interface_id in matching_by_name
+                                     if virtual_interface_id in snapshot.by_connection_id.get(connection_id, [])]
         if len(matching_by_connection_id) == 1:
             return matching_by_connection_id
     else:
@@ -318,27 +487,48 @@ def filter_virtual_interfaces(virtual_interfaces, name, connection_id):
     return matching_by_connection_id
 
 
-def find_virtual_interface_by_connection_id(virtual_interfaces, connection_id):
+def describe_vi_states(client, snapshot, virtual_interface_ids):
     '''
-        Return virtual interfaces that have the connection_id associated
+        Describes virtual interfaces again, updating the snapshot, and returns their states by ID. A single virtual
+        interface is described by its ID, otherwise all of them are described with a single call. A virtual interface
+        that is not found any more is deleted.
     '''
-    return [vi for vi in virtual_interfaces if vi['connectionId'] == connection_id]
+    vi_params = {}
+    if len(virtual_interface_ids) == 1:
+        vi_params = {'virtualInterfaceId': virtual_interface_ids[0]}
+    virtual_interfaces = try_except_ClientError(
+        failure_msg="Failed to describe virtual interface")(
+        client.describe_virtual_interfaces)(**vi_params).get('virtualInterfaces')
 
+    states = dict((virtual_interface_id, 'deleted') for virtual_interface_id in virtual_interface_ids)
+    for vi in virtual_interfaces:
+        if vi['virtualInterfaceId'] in states:
+            snapshot.update(vi)
+            states[vi['virtualInterfaceId']] = vi['virtualInterfaceState']
+    return states
 
-def find_virtual_interface_by_name(virtual_interfaces, name):
-    '''
-        Return virtual interfaces that match the provided name
-    '''
-    return [vi for vi in virtual_interfaces if vi['virtualInterfaceName'] == name]
 
-
-def vi_state(client, virtual_interface_id):
+def wait_for_vis(client, snapshot, virtual_interface_ids, timeout, deleted=False):
     '''
-        Returns the state of the virtual interface.
+        Waits until the virtual interfaces reach a final state, or are deleted, polling them all in a single loop
     '''
-    err_msg = "Failed to describe virtual interface: {0}".format(virtual_interface_id)
-    vi = try_except_ClientError(failure_msg=err_msg)(client.describe_virtual_interfaces)(virtualInterfaceId=virtual_interface_id)
-    return vi['virtualInterfaces'][0]
+    if deleted:
+        target_states = ('deleted',)
+        states = dict((virtual_interface_id, 'deleting') for virtual_interface_id in virtual_interface_ids)
+    else:
+        target_states = FINAL_VI_STATES
+        states = dict((virtual_interface_id, snapshot.get(virtual_interface_id)['virtualInterfaceState'])
+                      for virtual_interface_id in virtual_interface_ids)
+    states, completed = wait_for_states(
+        lambda ids: describe_vi_states(client, snapshot, ids),
+        virtual_interface_ids,
+        target_states,
+        timeout,
+        states=states
+    )
+    if not completed:
+        pending = ['{0} ({1})'.format(k, v) for k, v in sorted(states.items()) if v not in target_states]
+        raise DirectConnectError("Timed out waiting for virtual interfaces {0}.".format(', '.join(pending)))
 
 
 def assemble_params_for_creating_vi(params):
@@ -388,7 +578,7 @@ def create_vi(client, public, associated_id, creation_params):
         :param associated_id: a link aggregation group ID or connection ID to associate
                               with the virtual interface.
         :param creation_params: a dict of parameters to use in the boto call
-        :return The ID of the created virtual interface
+        :return The created virtual interface
     '''
     err_msg = "Failed to create virtual interface"
     if public:
@@ -402,70 +592,184 @@ def create_vi(client, public, associated_id, creation_params):
         )(
             connectionId=associated_id,
             newPrivateVirtualInterface=creation_params)
-    return vi['virtualInterfaceId']
+    return vi
 
 
 def modify_vi(client, virtual_interface_id, connection_id):
     '''
-        Associate a new connection ID
+        Associate a new connection ID, returning the modified virtual interface
     '''
     err_msg = "Unable to associate {0} with virtual interface {1}".format(connection_id, virtual_interface_id)
-    try_except_ClientError(failure_msg=err_msg)(client.associate_virtual_interface)(virtualInterfaceId=virtual_interface_id,
-                                                                                    connectionId=connection_id)
+    return try_except_ClientError(failure_msg=err_msg)(client.associate_virtual_interface)(virtualInterfaceId=virtual_interface_id,
+                                                                                           connectionId=connection_id)
 
 
-def needs_modification(client, virtual_interface_id, connection_id):
+def needs_modification(vi, connection_id):
     '''
         Determine if the associated connection ID needs to be updated
     '''
-    return vi_state(client, virtual_interface_id).get('connectionId') != connection_id
-
-
-def ensure_state(connection, module):
-    changed = False
+    return vi.get('connectionId') != connection_id
 
-    state = module.params['state']
-    connection_id = module.params['id_to_associate']
-    public = module.params['public']
-    name = module.params['name']
 
-    virtual_interface_id = find_unique_vi(connection, connection_id, module.params.get('virtual_interface_id'), name)
+def get_vi_params(module):
+    '''
+        Returns the params of each virtual interface. Without virtual_interfaces, these are the module params.
+        Otherwise the options of each item of virtual_interfaces override the module params.
+    '''
+    if not module.params.get('virtual_interfaces'):
+        return [module.params]
+
+    vi_params = []
+    for item in module.params['virtual_interfaces']:
+        params = dict(module.params)
+        overrides = dict((k, v) for k, v in item.items() if v is not None and k in VI_OPTIONS)
+        # A gateway of the item replaces either gateway of the module params
+        if 'virtual_gateway_id' in overrides or 'direct_connect_gateway_id' in overrides:
+            params['virtual_gateway_id'] = None
+            params['direct_connect_gateway_id'] = None
+        params.update(overrides)
+        vi_params.append(params)
+    return vi_params
+
+
+def check_vi_params(module, label, params):
+    '''
+        Checks the params of a virtual interface the way the module checks its own params, since the options of
+        virtual_interfaces may be given per item or for all of them
+    '''
+    prefix = '{0}: '.format(label) if label else ''
+    if not params['id_to_associate']:
+        module.fail_json(msg=prefix + "missing required arguments: id_to_associate")
+    if not params['virtual_interface_id'] and not params['name']:
+        module.fail_json(msg=prefix + "one of the following is required: virtual_interface_id, name")
+    if params['virtual_gateway_id'] and params['direct_connect_gateway_id']:
+        module.fail_json(msg=prefix + "parameters are mutually exclusive: virtual_gateway_id|direct_connect_gateway_id")
+    if params['state'] == 'present' and params['public'] is None:
+        module.fail_json(msg=prefix + "state is present but all of the following are missing: public")
+    if params['public']:
+        for name in ('amazon_address', 'customer_address', 'cidr'):
+            if not params[name]:
+                module.fail_json(msg=prefix + "public is True but all of the following are missing: {0}".format(name))
+
+
+def find_vi(module, snapshot, label, params):
+    '''
+        Returns the ID of the existing virtual interface matching the params, or None if it needs to be created
+    '''
+    prefix = '{0}: '.format(label) if label else ''
+    virtual_interface_id = find_unique_vi(snapshot, params['id_to_associate'], params['virtual_interface_id'], params['name'])
 
     if virtual_interface_id is False:
-        module.fail_json(msg="Multiple virtual interfaces were found. Use the virtual_interface_id, name, "
-                             "and connection_id options if applicable to find a unique match.")
+        module.fail_json(msg=prefix + "Multiple virtual interfaces were found. Use the virtual_interface_id, name, "
+                                      "and connection_id options if applicable to find a unique match.")
+
+    if params['state'] == 'present' and not virtual_interface_id and params['virtual_interface_id']:
+        module.fail_json(msg=prefix + "The virtual interface {0} does not exist.".format(params['virtual_interface_id']))
 
-    if state == 'present':
+    return virtual_interface_id
 
-        if not virtual_interface_id and module.params['virtual_interface_id']:
-            module.fail_json(msg="The virtual interface {0} does not exist.".format(module.params['virtual_interface_id']))
 
-        elif not virtual_interface_id:
-            assembled_params = assemble_params_for_creating_vi(module.params)
-            virtual_interface_id = create_vi(connection, public, connection_id, assembled_params)
+def apply_vi(connection, snapshot, params, virtual_interface_id):
+    '''
+        Creates, modifies or deletes a virtual interface. This only reads the snapshot, so the virtual interfaces
+        of a batch can be applied at the same time.
+        :return If anything changed, and the latest state of the virtual interface, or None if it was deleted
+    '''
+    connection_id = params['id_to_associate']
+    if params['state'] == 'present':
+        changed = False
+        if not virtual_interface_id:
+            assembled_params = assemble_params_for_creating_vi(params)
+            vi = create_vi(connection, params['public'], connection_id, assembled_params)
             changed = True
+        else:
+            vi = snapshot.get(virtual_interface_id)
 
-        if needs_modification(connection, virtual_interface_id, connection_id):
-            modify_vi(connection, virtual_interface_id, connection_id)
+        if needs_modification(vi, connection_id):
+            vi = modify_vi(connection, vi['virtualInterfaceId'], connection_id)
             changed = True
 
-        latest_state = vi_state(connection, virtual_interface_id)
+        return changed, vi
+
+    if virtual_interface_id:
+        delete_virtual_interface(connection, virtual_interface_id)
+        return True, None
+    return False, None
+
 
+def ensure_states(connection, module, snapshot, vi_params, labels):
+    '''
+        Reconciles many virtual interfaces against a single snapshot. Every virtual interface is matched before any
+        is changed, then the changes are made at the same time, and with wait all of them are polled in one loop.
+        :return If anything changed, and the latest state, for each virtual interface
+    '''
+    virtual_interface_ids = []
+    for label, params in zip(labels, vi_params):
+        virtual_interface_id = find_vi(module, snapshot, label, params)
+        if virtual_interface_id and virtual_interface_id in virtual_interface_ids:
+            module.fail_json(msg="{0} and {1} match the same virtual interface {2}.".format(
+                labels[virtual_interface_ids.index(virtual_interface_id)], label, virtual_interface_id))
+        virtual_interface_ids.append(virtual_interface_id)
+
+    def apply_at(index):
+        # The error is returned, so the results of the other virtual interfaces are kept
+        try:
+            changed, vi = apply_vi(connection, snapshot, vi_params[index], virtual_interface_ids[index])
+            return changed, vi, None
+        except DirectConnectError as e:
+            return False, snapshot.get(virtual_interface_ids[index]) if virtual_interface_ids[index] else None, e
+
+    if len(vi_params) == 1:
+        applied = [apply_at(0)]
     else:
-        if virtual_interface_id:
-            delete_virtual_interface(connection, virtual_interface_id)
-            changed = True
+        # multiprocessing is slow to import, so it is only imported to apply many virtual interfaces
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(len(vi_params), BATCH_CONCURRENCY))
+        try:
+            applied = pool.map(apply_at, range(len(vi_params)))
+        finally:
+            pool.close()
+            pool.join()
+
+    present_ids = []
+    deleted_ids = []
+    for (changed, vi, error), virtual_interface_id in zip(applied, virtual_interface_ids):
+        if vi is not None:
+            snapshot.update(vi)
+            present_ids.append(vi['virtualInterfaceId'])
+        elif changed:
+            deleted_ids.append(virtual_interface_id)
+
+    errors = [error for changed, vi, error in applied]
+    if any(error is not None for error in errors):
+        raise VirtualInterfacesError(labels, [(changed, vi or {}) for changed, vi, error in applied], errors)
+
+    if module.params['wait']:
+        if present_ids:
+            wait_for_vis(connection, snapshot, present_ids, module.params['wait_timeout'])
+        if deleted_ids:
+            wait_for_vis(connection, snapshot, deleted_ids, module.params['wait_timeout'], deleted=True)
+
+    return [(changed, snapshot.get(vi['virtualInterfaceId']) if vi is not None else {}) for changed, vi, error in applied]
 
-        latest_state = {}
 
-    return changed, latest_state
+def ensure_state(connection, module):
+    check_vi_params(module, None, module.params)
+
+    # Describe once, and reuse the snapshot for the match, the modification check and the final state.
+    snapshot = VirtualInterfaceSnapshot(connection, module.params.get('virtual_interface_id'))
+    try:
+        return ensure_states(connection, module, snapshot, [module.params], [None])[0]
+    except VirtualInterfacesError as e:
+        # A single virtual interface fails with its own error
+        raise e.errors[0]
 
 
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
         state=dict(required=True, choices=['present', 'absent']),
-        id_to_associate=dict(required=True, aliases=['link_aggregation_group_id', 'connection_id']),
+        id_to_associate=dict(aliases=['link_aggregation_group_id', 'connection_id']),
         public=dict(type='bool'),
         name=dict(),
         vlan=dict(type='int', default=100),
@@ -478,28 +782,68 @@ def main():
         virtual_gateway_id=dict(),
         virtual_interface_id=dict(),
         direct_connect_gateway_id=dict(),
+        virtual_interfaces=dict(type='list', elements='dict', options=dict(
+            state=dict(choices=['present', 'absent']),
+            id_to_associate=dict(aliases=['link_aggregation_group_id', 'connection_id']),
+            public=dict(type='bool'),
+            name=dict(),
+            vlan=dict(type='int'),
+            bgp_asn=dict(type='int'),
+            authentication_key=dict(),
+            amazon_address=dict(),
+            customer_address=dict(),
+            address_type=dict(),
+            cidr=dict(type='list'),
+            virtual_gateway_id=dict(),
+            virtual_interface_id=dict(),
+            direct_connect_gateway_id=dict(),
+        )),
     ))
+    argument_spec.update(get_retry_argument_spec())
+    argument_spec.update(get_wait_argument_spec())
 
-    module = AnsibleAWSModule(argument_spec=argument_spec,
-                              required_one_of=[['virtual_interface_id', 'name']],
-                              required_if=[['state', 'present', ['public']],
-                                           ['public', True, ['amazon_address']],
-                                           ['public', True, ['customer_address']],
-                                           ['public', True, ['cidr']]],
-                              mutually_exclusive=[['virtual_gateway_id', 'direct_connect_gateway_id']])
+    # The params of each virtual interface are checked by check_vi_params, since with virtual_interfaces they may be
+    # given per item or for all of them
+    module = AnsibleAWSModule(argument_spec=argument_spec)
 
     region, ec2_url, aws_connect_kwargs = get_aws_connection_info(module, boto3=True)
-    connection = boto3_conn(module, conn_type='client', resource='directconnect', region=region, endpoint=ec2_url, **aws_connect_kwargs)
+    policy = RetryPolicy(module, region, aws_connect_kwargs)
+    connection = RetryingClient(
+        boto3_conn(module, conn_type='client', resource='directconnect', region=region, endpoint=ec2_url, **aws_connect_kwargs),
+        policy
+    )
 
     try:
-        changed, latest_state = ensure_state(connection, module)
+        if module.params['virtual_interfaces']:
+            vi_params = get_vi_params(module)
+            labels = ['virtual_interfaces[{0}]'.format(i) for i in range(len(vi_params))]
+            for label, params in zip(labels, vi_params):
+                check_vi_params(module, label, params)
+            results = ensure_states(connection, module, VirtualInterfaceSnapshot(connection), vi_params, labels)
+        else:
+            changed, latest_state = ensure_state(connection, module)
+    except VirtualInterfacesError as e:
+        module.fail_json(msg=e.msg,
+                         changed=any(changed for changed, latest_state in e.results),
+                         virtual_interfaces=[dict(changed=changed, **camel_dict_to_snake_dict(latest_state))
+                                             if error is None else
+                                             dict(changed=changed, failed=True, msg=error.msg,
+                                                  error=str(error.exception) if error.exception else None,
+                                                  **camel_dict_to_snake_dict(latest_state))
+                                             for (changed, latest_state), error in zip(e.results, e.errors)],
+                         retry_metrics=policy.get_metrics())
     except DirectConnectError as e:
         if e.exception:
-            module.fail_json_aws(exception=e.exception, msg=e.msg)
+            module.fail_json_aws(exception=e.exception, msg=e.msg, retry_metrics=policy.get_metrics())
         else:
-            module.fail_json(msg=e.msg)
-
-    module.exit_json(changed=changed, **camel_dict_to_snake_dict(latest_state))
+            module.fail_json(msg=e.msg, retry_metrics=policy.get_metrics())
+
+    if module.params['virtual_interfaces']:
+        module.exit_json(changed=any(changed for changed, latest_state in results),
+                         virtual_interfaces=[dict(changed=changed, **camel_dict_to_snake_dict(latest_state))
+                                             for changed, latest_state in results],
+                         retry_metrics=policy.get_metrics())
+    module.exit_json(changed=changed, retry_metrics=policy.get_metrics(), **camel_dict_to_snake_dict(latest_state))
 
 
 if __name__ == '__main__':
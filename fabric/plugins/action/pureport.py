@@ -0,0 +1,287 @@
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import os
+import sys
+from importlib import import_module
+from time import time
+from traceback import format_exc
+
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.six import StringIO
+from ansible.plugins.action import ActionBase
+from ansible.utils.vars import merge_hash
+from ansible_collections.pureport.fabric.plugins.module_utils.pureport_cache import get_cache_key, read_cache, update_cache
+from ansible_collections.pureport.fabric.plugins.module_utils.pureport_objects import has_secret_fields
+
+try:
+    from ansible.module_utils.common.json import AnsibleJSONEncoder
+except ImportError:
+    from ansible.parsing.ajson import AnsibleJSONEncoder
+try:
+    # Check for pureport-client without importing it, as the module may not need it
+    from importlib.util import find_spec
+    HAS_PUREPORT_CLIENT = find_spec('pureport') is not None
+except ImportError:
+    # Python 2 controllers leave the check to the module
+    HAS_PUREPORT_CLIENT = True
+
+MODULES_PACKAGE = 'ansible_collections.pureport.fabric.plugins.modules'
+# Set this variable to false to always run the modules the regular way
+IN_PROCESS_VAR = 'pureport_in_process'
+# Ansible 2.19+ serializes module args and results with a named profile
+MODULE_PROFILE = 'legacy'
+HAS_MODULE_PROFILES = hasattr(basic, '_ANSIBLE_PROFILE')
+# Set this variable to true to memoize the results of read-only modules within a play
+MEMOIZE_VAR = 'pureport_memoize'
+MEMO_CACHE_NAME = 'memo'
+# The memos of plays that started longer ago than this are removed
+MEMO_MAX_AGE = 86400
+# The modules that do not change anything, so their results can be memoized
+READ_ONLY_MODULES = frozenset([
+    'accounts_info',
+    'cloud_regions_info',
+    'cloud_services_info',
+    'connections_info',
+    'facilities_info',
+    'locations_info',
+    'networks_info',
+    'options_info',
+    'ports_info',
+    'supported_connections_info',
+    'supported_ports_info'
+])
+# The args that identify the accounts and networks a module reads or changes
+SCOPE_ARGS = dict(
+    accounts=('account_id', 'account_href'),
+    networks=('network_id', 'network_href', 'network_ids', 'network_hrefs')
+)
+
+
+class ActionModule(ActionBase):
+    """
+    Runs the fabric modules in the controller's worker process, rather than
+    packaging each module with AnsiballZ, transferring it and starting a new
+    interpreter for it.  The fabric modules only talk to the Pureport API, so a
+    task that runs on the controller anyway, i.e. over a local connection,
+    behaves the same.  Any other task is run the regular way.
+
+    If the 'pureport_memoize' variable is set, the results of read-only modules
+    are memoized for the rest of the play, and a changed or failed result of any
+    other module removes the memoized results of the accounts or networks it may
+    have changed.
+    """
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        if task_vars is None:
+            task_vars = dict()
+        module_name = getattr(self._task, 'resolved_action', None) or self._task.action
+        short_module_name = module_name.rpartition('.')[2]
+
+        memo_key = None
+        if short_module_name in READ_ONLY_MODULES and boolean(task_vars.get(MEMOIZE_VAR, False), strict=False):
+            memo_key = self.__get_memo_key(short_module_name)
+            memoized_result = self.__read_memo(memo_key)
+            if memoized_result is not None:
+                return merge_hash(result, memoized_result)
+
+        if not self.__can_run_in_process(task_vars):
+            wrap_async = self._task.async_val and not self._connection.has_native_async
+            module_result = self._execute_module(
+                module_name=module_name,
+                task_vars=task_vars,
+                wrap_async=wrap_async
+            )
+            if not wrap_async:
+                self._remove_tmp_path(self._connection._shell.tmpdir)
+        else:
+            module_args = dict(self._task.args)
+            self._update_module_args(module_name, module_args, task_vars)
+            environment = dict()
+            self._compute_environment_string(environment)
+            module_result = self.__run_in_process(short_module_name, module_args, environment)
+
+        if memo_key is not None and not module_result.get('failed'):
+            self.__write_memo(memo_key, self.__get_scope(short_module_name), module_result)
+        elif short_module_name not in READ_ONLY_MODULES and (module_result.get('changed') or module_result.get('failed')):
+            self.__invalidate_memo(self.__get_scope(short_module_name))
+        return merge_hash(result, module_result)
+
+    def __can_run_in_process(self, task_vars):
+        """
+        Check if the task can run in this process, i.e. it would otherwise run on
+        the controller as the same user, and the controller has pureport-client
+        :param dict task_vars: the task vars
+        :rtype: bool
+        """
+        return boolean(task_vars.get(IN_PROCESS_VAR, True), strict=False) and \
+            HAS_PUREPORT_CLIENT and \
+            getattr(self._connection, 'transport', None) == 'local' and \
+            not self._play_context.become and \
+            not self._task.async_val
+
+    def __get_play_key(self):
+        """
+        Get the key of the memo of the task's play, which is shared by the tasks
+        of the play in every worker process
+        :rtype: str|None
+        """
+        get_play = getattr(self._task, 'get_play', None)
+        play = get_play() if get_play is not None else None
+        play_id = getattr(play, '_uuid', None)
+        return get_cache_key(play_id) if play_id is not None else None
+
+    def __get_memo_key(self, module_name):
+        """
+        Get the memo key of a task from its module name, its args, including the
+        credentials, and its environment, e.g. PUREPORT_API_URL
+        :param str module_name: the module name, e.g. 'networks_info'
+        :rtype: str
+        """
+        environment = dict()
+        self._compute_environment_string(environment)
+        return get_cache_key(
+            module_name,
+            json.dumps(self._task.args, sort_keys=True, cls=AnsibleJSONEncoder),
+            json.dumps(environment, sort_keys=True, cls=AnsibleJSONEncoder)
+        )
+
+    def __get_scope(self, module_name):
+        """
+        Get the ids of the accounts and networks a task reads or changes, from
+        its args.  Any connection of the 'connections' module may have its own
+        network, and the 'network' and 'fabric_state' modules may have the id of
+        their network.
+        :param str module_name: the module name, e.g. 'networks_info'
+        :rtype: dict[str, list[str]]
+        """
+        args = [self._task.args]
+        if module_name == 'connections':
+            args += [connection for connection in self._task.args.get('connections') or []
+                     if isinstance(connection, dict)]
+        scope = dict()
+        for kind, names in SCOPE_ARGS.items():
+            values = []
+            for arg in args:
+                for name in names:
+                    value = arg.get(name)
+                    values += value if isinstance(value, list) else [value] if value is not None else []
+            scope[kind] = ['%s' % value for value in values]
+        network = self._task.args.get('network') if module_name == 'fabric_state' else self._task.args
+        if module_name in ('network', 'fabric_state') and isinstance(network, dict) and network.get('id') is not None:
+            scope['networks'].append('%s' % network.get('id'))
+        return dict((kind, sorted(set(value.rstrip('/').rpartition('/')[2] for value in values)))
+                    for kind, values in scope.items())
+
+    def __read_memo(self, memo_key):
+        """
+        Read a memoized result of the task's play
+        :param str memo_key: the memo key
+        :rtype: dict|None
+        """
+        play_key = self.__get_play_key()
+        if play_key is None:
+            return None
+        entry = read_cache(MEMO_CACHE_NAME).get(play_key, dict()).get('results', dict()).get(memo_key)
+        if entry is None:
+            return None
+        # The memoized result is parsed the same way as the result of a module
+        res = dict(rc=0, stdout=entry['result'], stderr='')
+        if HAS_MODULE_PROFILES:
+            return self._parse_returned_data(res, MODULE_PROFILE)
+        return self._parse_returned_data(res)
+
+    def __write_memo(self, memo_key, scope, module_result):
+        """
+        Memoize a result for the rest of the task's play, and remove the memos of
+        plays that started long ago.  Results with secret fields, e.g. the keys of
+        IPSec connections, are not memoized, as they would be written to disk.
+        :param str memo_key: the memo key
+        :param dict[str, list[str]] scope: the accounts and networks the result is about
+        :param dict module_result: the module result
+        """
+        play_key = self.__get_play_key()
+        if play_key is None or has_secret_fields(module_result):
+            return
+        now = time()
+        with update_cache(MEMO_CACHE_NAME) as cache:
+            for expired_key in [k for k, v in cache.items() if now - v['started_at'] >= MEMO_MAX_AGE]:
+                del cache[expired_key]
+            memo = cache.setdefault(play_key, dict(started_at=now, results=dict()))
+            memo['results'][memo_key] = dict(
+                scope=scope,
+                result=json.dumps(module_result, cls=AnsibleJSONEncoder)
+            )
+
+    def __invalidate_memo(self, scope):
+        """
+        Remove the memoized results of the task's play that may have changed
+        with a change to some accounts or networks.  Results that are not about
+        any account or network, such as locations, are kept.  Other results are
+        only kept if they are about different accounts or different networks.
+        :param dict[str, list[str]] scope: the accounts and networks that may have changed
+        """
+        play_key = self.__get_play_key()
+        if play_key is None or play_key not in read_cache(MEMO_CACHE_NAME):
+            return
+
+        def is_affected(result_scope):
+            if not any(result_scope.values()):
+                return False
+            if any(set(result_scope[kind]) & set(scope[kind]) for kind in scope):
+                return True
+            return not any(len(result_scope[kind]) > 0 and len(scope[kind]) > 0 for kind in scope)
+
+        with update_cache(MEMO_CACHE_NAME) as cache:
+            results = cache.get(play_key, dict()).get('results', dict())
+            for memo_key in [k for k, v in results.items() if is_affected(v['scope'])]:
+                del results[memo_key]
+
+    def __run_in_process(self, module_name, module_args, environment):
+        """
+        Run a fabric module's main function in this process with the task's
+        environment, capturing the result it would print
+        :param str module_name: the module name, e.g. 'network'
+        :param dict module_args: the module args, including the internal '_ansible_' args
+        :param dict[str, str] environment: the task environment
+        :rtype: dict
+        """
+        module = import_module('%s.%s' % (MODULES_PACKAGE, module_name))
+        previous_args = basic._ANSIBLE_ARGS
+        previous_profile = getattr(basic, '_ANSIBLE_PROFILE', None)
+        previous_stdout = sys.stdout
+        previous_environment = dict(os.environ)
+
+        basic._ANSIBLE_ARGS = to_bytes(json.dumps(dict(ANSIBLE_MODULE_ARGS=module_args), cls=AnsibleJSONEncoder))
+        if HAS_MODULE_PROFILES:
+            basic._ANSIBLE_PROFILE = MODULE_PROFILE
+        os.environ.update(environment)
+        sys.stdout = stdout = StringIO()
+        rc = 0
+        try:
+            module.main()
+        except SystemExit as e:
+            rc = e.code or 0
+        except Exception as e:
+            return dict(failed=True, msg='Module %s failed: %s' % (module_name, e), exception=format_exc())
+        finally:
+            sys.stdout = previous_stdout
+            os.environ.clear()
+            os.environ.update(previous_environment)
+            basic._ANSIBLE_ARGS = previous_args
+            if HAS_MODULE_PROFILES:
+                basic._ANSIBLE_PROFILE = previous_profile
+
+        res = dict(rc=rc, stdout=stdout.getvalue(), stderr='')
+        if HAS_MODULE_PROFILES:
+            return self._parse_returned_data(res, MODULE_PROFILE)
+        return self._parse_returned_data(res)
@@ -0,0 +1,26 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r'''
+options:
+    catalog_cache:
+        description:
+            - Read this reference data from a local catalog cache, which is shared by all tasks and plays.
+            - Cached data younger than 'catalog_cache_ttl' is returned without any request to the server.  Older
+              data is revalidated with its ETag, so it is only transferred again if it changed.
+            - The cache is stored in '~/.pureport/ansible', or the PUREPORT_ANSIBLE_CACHE_DIR environment variable.
+        required: false
+        type: bool
+        default: true
+    catalog_cache_ttl:
+        description:
+            - The number of seconds cached reference data is used before it is revalidated with the server.
+        required: false
+        type: int
+        default: 86400
+    '''
@@ -31,4 +31,23 @@ options:
             - the `pureport_access_token_fact` module.
             - Users should provide either the 'api_key' and 'api_secret' or the obtained 'api_access_token'.
         type: str
+    api_token_cache:
+        description:
+            - When using 'api_key' and 'api_secret', reuse a still valid access token from a local token
+            - cache instead of logging in on every task.  Tokens are cached per 'api_base_url' and 'api_key'
+            - and are refreshed a minute before they expire.
+            - The cache is stored in '~/.pureport/ansible', or the PUREPORT_ANSIBLE_CACHE_DIR environment variable.
+        required: false
+        type: bool
+        default: true
+    api_proxy:
+        description:
+            - Route requests through a local proxy over a Unix socket, which keeps a pool of warm keep-alive
+            - connections to 'api_base_url', so each task does not pay for a new TCP and TLS handshake.
+            - The proxy is started on first use and stops after 10 minutes without requests.
+            - The socket is stored in '~/.pureport/ansible/proxy.sock', or the PUREPORT_ANSIBLE_PROXY_SOCKET
+            - environment variable.  If the proxy can not be started, requests are sent directly.
+        required: false
+        type: bool
+        default: false
     '''
@@ -0,0 +1,29 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r'''
+options:
+    filters:
+        description:
+            - Only return the objects that match all of these filters.
+            - The supported filters are 'name', 'type' and 'state', which are a glob pattern or a list of glob patterns,
+              'tags', which is a dict of tags that must all match, and 'location', which is a location id or href,
+              or a list of them.
+            - Filters are sent to the API where it supports them and are otherwise applied before the objects are returned.
+        required: false
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Only return these top level fields (e.g. 'id', 'href', 'name') of each object.  By default, all fields
+              are returned.
+        required: false
+        type: list
+        elements: str
+        default: []
+    '''
@@ -0,0 +1,21 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r'''
+options:
+    object_cache:
+        description:
+            - Keep the objects retrieved by id in a local object cache with their ETag or Last-Modified.
+            - Objects retrieved before are requested conditionally, so the server only sends an object again if
+              it changed.
+            - Objects with secret fields, e.g. IPSec pre-shared keys or BGP passwords, are not cached.
+            - The cache is stored in '~/.pureport/ansible', or the PUREPORT_ANSIBLE_CACHE_DIR environment variable.
+        required: false
+        type: bool
+        default: true
+    '''
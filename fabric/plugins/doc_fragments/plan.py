@@ -0,0 +1,27 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r'''
+options:
+    plan_cache:
+        description:
+            - In check mode, store the returned plan with the existing object and its ETag in a local plan cache.
+            - The next run of the same task with the same parameters reuses the existing object if the server
+              confirms with a conditional request that it did not change, rather than retrieving or resolving it
+              again.  Each plan is only used once.
+            - The cache is stored in '~/.pureport/ansible', or the PUREPORT_ANSIBLE_CACHE_DIR environment variable.
+        required: false
+        type: bool
+        default: true
+    plan_cache_ttl:
+        description:
+            - The number of seconds a plan can be reused after it was made in check mode.
+        required: false
+        type: int
+        default: 3600
+    '''
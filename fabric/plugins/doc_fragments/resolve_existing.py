@@ -14,4 +14,12 @@ options:
         required: false
         type: bool
         default: true
+    resolve_existing_cache_ttl:
+        description:
+            - The number of seconds a local index of the existing items used by 'resolve_existing' is reused
+            - by later tasks, so they only retrieve the matched item instead of listing every item again.
+            - Cached matches are always verified against the server.  Set to 0 to disable the cache.
+        required: false
+        type: int
+        default: 300
     '''
@@ -14,4 +14,11 @@ options:
             - server has completed it's task, set this to True.
         required: false
         type: bool
+    wait_for_server_timeout:
+        description:
+            - The number of seconds to wait for the server when 'wait_for_server' is set.
+            - When many connections are changed at once, they are all waited on at the same time.
+        required: false
+        type: int
+        default: 1800
     '''
@@ -0,0 +1,331 @@
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+DOCUMENTATION = '''
+---
+name: pureport
+plugin_type: inventory
+short_description: Pureport inventory source
+description:
+    - "Build an inventory of Pureport connections and ports, grouped by account, network, type and state."
+    - "Each connection and port becomes a host, with the properties of the Pureport object as host variables
+      prefixed with 'pureport_', e.g. 'pureport_speed'.  The 'pureport_resource' variable is either 'connection' or 'port'."
+    - "Uses a YAML configuration file that ends with 'pureport.yml' or 'pureport.yaml'."
+    - "Listings are retrieved conditionally with the ETag of the previous refresh, so only the listings,
+      notably the connections of each network, that changed since the last refresh are retrieved again.
+      Listings with secret fields, e.g. IPSec pre-shared keys or BGP passwords, are not kept and are always retrieved."
+version_added: "2.8.0"
+requirements: [ pureport-client ]
+author: Matt Traynham (@mtraynham)
+options:
+    plugin:
+        description: The name of this plugin, it should always be set to 'pureport.fabric.pureport'.
+        required: true
+        choices: ['pureport.fabric.pureport']
+    api_base_url:
+        description:
+            - The host url for the Pureport API.
+        type: str
+        env:
+            - name: PUREPORT_API_URL
+    api_key:
+        description:
+            - The pre-configured API Key for a Pureport Account.
+            - Users should provide either the 'api_key' and 'api_secret' or the obtained 'api_access_token'.
+        type: str
+        env:
+            - name: PUREPORT_API_KEY
+    api_secret:
+        description:
+            - The pre-configured API Secret for a Pureport Account.
+            - Users should provide either the 'api_key' and 'api_secret' or the obtained 'api_access_token'.
+        type: str
+        env:
+            - name: PUREPORT_API_SECRET
+    api_access_token:
+        description:
+            - The access token to use with Pureport API.
+            - Users should provide either the 'api_key' and 'api_secret' or the obtained 'api_access_token'.
+        type: str
+        env:
+            - name: PUREPORT_API_ACCESS_TOKEN
+    account_ids:
+        description:
+            - Only include these accounts.  By default, all accounts visible to the credentials are included.
+        type: list
+        elements: str
+        default: []
+    include_ports:
+        description:
+            - If ports should be included as hosts.
+        type: bool
+        default: true
+    hostnames:
+        description:
+            - The connection and port property used as the inventory hostname.
+        type: str
+        choices: ['id', 'name']
+        default: id
+    fetch_concurrency:
+        description:
+            - The maximum number of listings retrieved from the server at once.
+        type: int
+        default: 8
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+'''
+
+EXAMPLES = '''
+# pureport.yml
+plugin: pureport.fabric.pureport
+api_key: XXXXXXXXXXXXX
+api_secret: XXXXXXXXXXXXXXXXX
+cache: true
+cache_plugin: jsonfile
+cache_connection: ~/.pureport/ansible/inventory
+cache_timeout: 300
+keyed_groups:
+  - key: pureport_location.href.split('/')[-1]
+    prefix: location
+'''
+
+from functools import partial
+from multiprocessing.pool import ThreadPool
+
+from ansible.errors import AnsibleError
+from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
+
+try:
+    from pureport.api.client import Client, API_URL
+    from pureport.exception.api import ClientHttpException
+    HAS_PUREPORT_CLIENT = True
+except ImportError:
+    HAS_PUREPORT_CLIENT = False
+    Client = None
+    API_URL = None
+    ClientHttpException = None
+
+from ansible_collections.pureport.fabric.plugins.module_utils.pureport_cache import get_cache_key, read_cache, update_cache
+from ansible_collections.pureport.fabric.plugins.module_utils.pureport_client import get_session
+from ansible_collections.pureport.fabric.plugins.module_utils.pureport_objects import has_secret_fields
+
+LISTINGS_CACHE_NAME = 'inventory_listings'
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+    NAME = 'pureport.fabric.pureport'
+
+    def verify_file(self, path):
+        """
+        Only accept configuration files that end with pureport.yml or pureport.yaml
+        :param str path: the configuration file path
+        :rtype: bool
+        """
+        return super(InventoryModule, self).verify_file(path) and \
+            path.endswith(('pureport.yml', 'pureport.yaml'))
+
+    def __get_client(self):
+        """
+        Get a logged in Pureport Client from the plugin options
+        :rtype: Client
+        """
+        if not HAS_PUREPORT_CLIENT:
+            raise AnsibleError('pureport-client required for this inventory plugin')
+        client = Client(self.get_option('api_base_url') or API_URL)
+        client.login(
+            key=self.get_option('api_key'),
+            secret=self.get_option('api_secret'),
+            access_token=self.get_option('api_access_token')
+        )
+        return client
+
+    @staticmethod
+    def __get_listing(session, previous_listings, href):
+        """
+        Retrieve a listing, sending the ETag of the previous refresh so an
+        unchanged listing is not transferred again
+        :param pureport.util.api.PureportSession session: the Pureport session
+        :param dict[str, dict] previous_listings: the listings of the previous refresh by href
+        :param str href: the listing href
+        :rtype: dict
+        """
+        previous_listing = previous_listings.get(href)
+        headers = dict()
+        if previous_listing is not None and previous_listing.get('etag') is not None:
+            headers['If-None-Match'] = previous_listing['etag']
+        response = session.get(href, headers=headers)
+        if response.status_code == 304:
+            return previous_listing
+        return dict(etag=response.headers.get('ETag'), items=response.json())
+
+    def __get_listings(self, session, previous_listings, hrefs):
+        """
+        Retrieve many listings concurrently over a single session
+        :param pureport.util.api.PureportSession session: the Pureport session
+        :param dict[str, dict] previous_listings: the listings of the previous refresh by href
+        :param list[str] hrefs: the listing hrefs
+        :rtype: dict[str, dict]
+        """
+        get_listing = partial(self.__get_listing, session, previous_listings)
+        workers = max(1, min(self.get_option('fetch_concurrency'), len(hrefs)))
+        if workers == 1:
+            return dict((href, get_listing(href)) for href in hrefs)
+        pool = ThreadPool(workers)
+        try:
+            return dict(zip(hrefs, pool.map(get_listing, hrefs)))
+        finally:
+            pool.close()
+            pool.join()
+
+    def __fetch(self):
+        """
+        Retrieve the accounts, networks, connections and ports, reusing any
+        listing that has not changed since the previous refresh
+        :rtype: dict[str, list[dict]]
+        """
+        client = self.__get_client()
+        session = get_session(client)
+        snapshot_key = get_cache_key(
+            self.get_option('api_base_url') or API_URL,
+            self.get_option('api_key') or self.get_option('api_access_token')
+        )
+        previous_listings = read_cache(LISTINGS_CACHE_NAME).get(snapshot_key, dict())
+
+        listings = dict()
+        account_ids = self.get_option('account_ids')
+        accounts = [account for account in client.accounts.list()
+                    if len(account_ids) == 0 or account.get('id') in account_ids]
+
+        hrefs = ['/accounts/%s/networks' % account['id'] for account in accounts]
+        if self.get_option('include_ports'):
+            hrefs += ['/accounts/%s/ports' % account['id'] for account in accounts]
+        listings.update(self.__get_listings(session, previous_listings, hrefs))
+        networks = [network for account in accounts
+                    for network in listings['/accounts/%s/networks' % account['id']]['items']]
+
+        hrefs = ['/networks/%s/connections' % network['id'] for network in networks]
+        listings.update(self.__get_listings(session, previous_listings, hrefs))
+        connections = [connection for href in hrefs for connection in listings[href]['items']]
+
+        ports = []
+        if self.get_option('include_ports'):
+            ports = [port for account in accounts for port in listings['/accounts/%s/ports' % account['id']]['items']]
+
+        # Listings with secret fields, e.g. the keys of IPSec connections, are never written to disk
+        with update_cache(LISTINGS_CACHE_NAME) as cache:
+            cache[snapshot_key] = dict((href, listing) for href, listing in listings.items()
+                                       if not has_secret_fields(listing['items']))
+
+        return dict(
+            accounts=accounts,
+            networks=networks,
+            connections=connections,
+            ports=ports
+        )
+
+    @staticmethod
+    def __get_hostvars(item, resource):
+        """
+        Get the prefixed host variables of a connection or port
+        :param dict item: the connection or port
+        :param str resource: either 'connection' or 'port'
+        :rtype: dict
+        """
+        hostvars = dict(('pureport_%s' % k, v) for k, v in camel_dict_to_snake_dict(item).items())
+        hostvars['pureport_resource'] = resource
+        return hostvars
+
+    def __add_host(self, item, groups, hostvars):
+        """
+        Add a connection or port as a host, with its constructed groups and variables
+        :param dict item: the connection or port
+        :param list[str] groups: the groups of this host
+        :param dict hostvars: the host variables
+        """
+        strict = self.get_option('strict')
+        host = item.get(self.get_option('hostnames')) or item.get('id')
+        for group in groups:
+            self.inventory.add_host(host, group=group)
+        for k, v in hostvars.items():
+            self.inventory.set_variable(host, k, v)
+        self._set_composite_vars(self.get_option('compose'), hostvars, host, strict=strict)
+        self._add_host_to_composed_groups(self.get_option('groups'), hostvars, host, strict=strict)
+        self._add_host_to_keyed_groups(self.get_option('keyed_groups'), hostvars, host, strict=strict)
+
+    def __add_group(self, name, parent=None):
+        """
+        Add a sanitized group, optionally as the child of another group
+        :param str name: the group name
+        :param str parent: the parent group
+        :rtype: str
+        """
+        group = self.inventory.add_group(self._sanitize_group_name(name))
+        if parent is not None:
+            self.inventory.add_child(parent, group)
+        return group
+
+    def __populate(self, results):
+        """
+        Populate the inventory from the retrieved objects
+        :param dict[str, list[dict]] results: the retrieved objects
+        """
+        connections_group = self.__add_group('pureport_connections')
+        ports_group = self.__add_group('pureport_ports')
+
+        account_groups = dict()
+        for account in results['accounts']:
+            account_groups[account['href']] = self.__add_group('account_%s' % (account.get('name') or account['id']))
+        network_groups = dict()
+        for network in results['networks']:
+            network_groups[network['href']] = self.__add_group(
+                'network_%s' % (network.get('name') or network['id']),
+                account_groups.get((network.get('account') or dict()).get('href'))
+            )
+
+        for connection in results['connections']:
+            groups = [connections_group]
+            network_group = network_groups.get((connection.get('network') or dict()).get('href'))
+            if network_group is not None:
+                groups.append(network_group)
+            if connection.get('type') is not None:
+                groups.append(self.__add_group(connection['type'].lower()))
+            if connection.get('state') is not None:
+                groups.append(self.__add_group('state_%s' % connection['state'].lower()))
+            self.__add_host(connection, groups, self.__get_hostvars(connection, 'connection'))
+
+        for port in results['ports']:
+            groups = [ports_group]
+            account_group = account_groups.get((port.get('account') or dict()).get('href'))
+            if account_group is not None:
+                groups.append(account_group)
+            self.__add_host(port, groups, self.__get_hostvars(port, 'port'))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        use_cache = self.get_option('cache') and cache
+        cache_needs_update = self.get_option('cache') and not cache
+
+        results = None
+        if use_cache:
+            try:
+                results = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+        if results is None:
+            try:
+                results = self.__fetch()
+            except ClientHttpException as e:
+                raise AnsibleError('Failed to retrieve the Pureport inventory: %s' % e.response.text)
+        if cache_needs_update:
+            self._cache[cache_key] = results
+
+        self.__populate(results)
@@ -0,0 +1,211 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import os
+from contextlib import contextmanager
+from hashlib import sha256
+from tempfile import mkstemp
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+    fcntl = None
+
+ENVIRONMENT_CACHE_DIR = 'PUREPORT_ANSIBLE_CACHE_DIR'
+DEFAULT_CACHE_DIR = '~/.pureport/ansible'
+BLOBS_DIR_NAME = 'blobs'
+
+
+def get_cache_dir():
+    """
+    Get the local cache directory, creating it if it does not exist yet.
+    This may be overridden with the PUREPORT_ANSIBLE_CACHE_DIR environment variable.
+    :rtype: str
+    """
+    cache_dir = os.path.expanduser(os.environ.get(ENVIRONMENT_CACHE_DIR, DEFAULT_CACHE_DIR))
+    if not os.path.isdir(cache_dir):
+        try:
+            os.makedirs(cache_dir, 0o700)
+        except OSError:
+            # Another fork may have created it in the meantime
+            if not os.path.isdir(cache_dir):
+                raise
+    return cache_dir
+
+
+def get_cache_key(*parts):
+    """
+    Build a stable cache key from a set of values
+    :param parts: the values that identify a cache entry
+    :rtype: str
+    """
+    return sha256('\0'.join('%s' % part for part in parts).encode('utf-8')).hexdigest()
+
+
+def __get_cache_path(name):
+    """
+    Get the path of a named cache file
+    :param str name: the cache name
+    :rtype: str
+    """
+    return os.path.join(get_cache_dir(), '%s.json' % name)
+
+
+def __read(path):
+    """
+    Read a cache file, treating a missing or corrupt file as empty
+    :param str path: the cache file path
+    :rtype: dict
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else dict()
+    except (IOError, OSError, ValueError):
+        return dict()
+
+
+def __write(path, data):
+    """
+    Atomically replace a cache file, readable only by the current user
+    :param str path: the cache file path
+    :param dict data: the cache data
+    """
+    __write_bytes(path, json.dumps(data, separators=(',', ':')).encode('utf-8'))
+
+
+def __write_bytes(path, content):
+    """
+    Atomically replace a file with some content, readable only by the current user
+    :param str path: the file path
+    :param bytes content: the content
+    """
+    fd, tmp_path = mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o600)
+        os.rename(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def __locked(path, exclusive):
+    """
+    Hold a lock on a cache file for the duration of the context.  The lock is
+    taken on a sibling '.lock' file so the cache file itself can be replaced.
+    :param str path: the cache file path
+    :param bool exclusive: if the lock should be exclusive or shared
+    """
+    with open(path + '.lock', 'a') as lock_file:
+        if HAS_FCNTL:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if HAS_FCNTL:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_cache(name):
+    """
+    Read a named cache under a shared lock
+    :param str name: the cache name
+    :rtype: dict
+    """
+    path = __get_cache_path(name)
+    with __locked(path, False):
+        return __read(path)
+
+
+@contextmanager
+def update_cache(name):
+    """
+    Open a named cache under an exclusive lock, so concurrent forks see a
+    consistent view.  The yielded dict is written back when the context exits
+    without an error.
+    :param str name: the cache name
+    :rtype: dict
+    """
+    path = __get_cache_path(name)
+    with __locked(path, True):
+        data = __read(path)
+        yield data
+        __write(path, data)
+
+
+@contextmanager
+def lock_cache(name):
+    """
+    Hold an exclusive lock on a named cache without reading or writing it, e.g.
+    to serialize starting a single shared resource between concurrent forks.
+    :param str name: the cache name
+    """
+    with __locked(__get_cache_path(name), True):
+        yield
+
+
+def __get_blob_path(digest):
+    """
+    Get the path of a content addressed blob, creating the blobs directory if
+    it does not exist yet
+    :param str digest: the sha256 hex digest of the content
+    :rtype: str
+    """
+    blobs_dir = os.path.join(get_cache_dir(), BLOBS_DIR_NAME)
+    if not os.path.isdir(blobs_dir):
+        try:
+            os.makedirs(blobs_dir, 0o700)
+        except OSError:
+            if not os.path.isdir(blobs_dir):
+                raise
+    return os.path.join(blobs_dir, digest)
+
+
+def read_blob(digest):
+    """
+    Read a content addressed blob, verifying its content still matches the digest
+    :param str digest: the sha256 hex digest of the content
+    :returns: the content, or None if it is missing or corrupt
+    :rtype: bytes|None
+    """
+    try:
+        with open(__get_blob_path(digest), 'rb') as f:
+            content = f.read()
+    except (IOError, OSError):
+        return None
+    return content if sha256(content).hexdigest() == digest else None
+
+
+def write_blob(content):
+    """
+    Store some content by its digest.  Identical content is only stored once.
+    :param bytes content: the content
+    :returns: the sha256 hex digest of the content
+    :rtype: str
+    """
+    digest = sha256(content).hexdigest()
+    path = __get_blob_path(digest)
+    if not os.path.exists(path):
+        __write_bytes(path, content)
+    return digest
+
+
+def remove_blob(digest):
+    """
+    Remove a content addressed blob, if it exists
+    :param str digest: the sha256 hex digest of the content
+    """
+    try:
+        os.remove(__get_blob_path(digest))
+    except (IOError, OSError):
+        pass
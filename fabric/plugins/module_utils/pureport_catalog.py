@@ -0,0 +1,86 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+from time import time
+
+from .pureport_cache import read_cache, update_cache, read_blob, write_blob, remove_blob
+from .pureport_client import get_client, get_client_cache_key, get_session
+from .pureport_pagination import list_items
+
+CATALOG_CACHE_NAME = 'catalog'
+# Reference data rarely changes, so it is only revalidated once a day by default
+DEFAULT_CATALOG_CACHE_TTL = 86400
+
+
+def get_catalog_argument_spec():
+    """
+    Return the basic catalog cache params
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        catalog_cache=dict(type='bool', default=True),
+        catalog_cache_ttl=dict(type='int', default=DEFAULT_CATALOG_CACHE_TTL)
+    )
+
+
+def __store_entry(key, digest, etag):
+    """
+    Point a catalog entry at a blob, removing the blob it previously pointed to
+    if no other entry still references it
+    :param str key: the catalog entry key
+    :param str digest: the digest of the blob
+    :param str|None etag: the ETag of the response
+    """
+    with update_cache(CATALOG_CACHE_NAME) as cache:
+        previous_entry = cache.get(key)
+        cache[key] = dict(digest=digest, etag=etag, fetched_at=time())
+        if previous_entry is not None and previous_entry['digest'] != digest and \
+                all(entry['digest'] != previous_entry['digest'] for entry in cache.values()):
+            remove_blob(previous_entry['digest'])
+
+
+def get_catalog(module, href):
+    """
+    Get the decoded response of a reference data endpoint, e.g. /locations, from
+    the local catalog cache.  A cached response younger than 'catalog_cache_ttl'
+    is returned without any request, not even a login.  An older one is
+    revalidated with its ETag, so it is only transferred again if it changed.
+    Responses are stored by the digest of their content, so identical responses
+    for different credentials are only stored once.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str href: the endpoint href
+    :rtype: list|dict
+    """
+    key = get_client_cache_key(module, href)
+    entry = read_cache(CATALOG_CACHE_NAME).get(key)
+    content = read_blob(entry['digest']) if entry is not None else None
+    if content is not None and time() - entry['fetched_at'] < module.params.get('catalog_cache_ttl'):
+        return json.loads(content.decode('utf-8'))
+
+    headers = dict()
+    if content is not None and entry.get('etag') is not None:
+        headers['If-None-Match'] = entry['etag']
+    response = get_session(get_client(module)).get(href, headers=headers)
+    if response.status_code == 304 and content is not None:
+        __store_entry(key, entry['digest'], entry['etag'])
+    else:
+        content = response.content
+        __store_entry(key, write_blob(content), response.headers.get('ETag'))
+    return json.loads(content.decode('utf-8'))
+
+
+def list_catalog_items(module, href):
+    """
+    List the items of a reference data endpoint, from the catalog cache unless
+    'catalog_cache' is disabled, in which case they are streamed from the server
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str href: the endpoint href, e.g. /locations
+    :rtype: collections.Iterable[dict]
+    """
+    if module.params.get('catalog_cache'):
+        return get_catalog(module, href)
+    return list_items(module, get_client(module), href)
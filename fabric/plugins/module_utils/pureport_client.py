@@ -4,13 +4,22 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
-try:
-    from pureport.api.client import Client, API_URL
-    HAS_PUREPORT_CLIENT = True
-except ImportError:
-    HAS_PUREPORT_CLIENT = False
-    API_URL = None
-    Client = None
+from os import getenv
+from time import time
+
+from .pureport_cache import get_cache_key, read_cache, update_cache
+
+# The default api url of pureport-client.  pureport-client imports requests, so it is only
+# imported once a client is needed, not to build the argument spec of every module.
+API_URL = 'https://api.pureport.com'
+ENVIRONMENT_API_URL = 'PUREPORT_API_URL'
+TOKEN_CACHE_NAME = 'access_tokens'
+# Refresh cached tokens this many seconds before they actually expire
+TOKEN_CACHE_EXPIRY_MARGIN = 60
+# Used if the server did not tell us when the token expires
+TOKEN_CACHE_DEFAULT_TTL = 300
+# Logged in clients of this process, by their api url and credentials
+__CLIENTS = dict()
 
 
 def get_client_argument_spec():
@@ -22,7 +31,9 @@ def get_client_argument_spec():
         api_base_url=dict(type='str', default=API_URL),
         api_key=dict(type='str'),
         api_secret=dict(type='str', no_log=True),
-        api_access_token=dict(type='str', no_log=True)
+        api_access_token=dict(type='str', no_log=True),
+        api_token_cache=dict(type='bool', default=True),
+        api_proxy=dict(type='bool', default=False)
     )
 
 
@@ -37,20 +48,149 @@ def get_client_mutually_exclusive():
     ]
 
 
+def get_session(client):
+    """
+    Get the underlying requests session of a Pureport Client
+    :param Client client: the Pureport client
+    :rtype: pureport.util.api.PureportSession
+    """
+    return client._Client__session
+
+
+def ensure_session_pool_size(session, size):
+    """
+    Make sure a session keeps at least this many connections per host open, so
+    requests made concurrently over it reuse their connections
+    :param pureport.util.api.PureportSession session: the Pureport session
+    :param int size: the number of concurrent requests
+    """
+    from requests.adapters import HTTPAdapter
+    for prefix, adapter in list(session.adapters.items()):
+        # Other adapters, e.g. the local proxy's, manage their own pool
+        if type(adapter) is HTTPAdapter and adapter._pool_maxsize < size:
+            session.mount(prefix, HTTPAdapter(
+                pool_connections=adapter._pool_connections,
+                pool_maxsize=size,
+                max_retries=adapter.max_retries,
+                pool_block=adapter._pool_block
+            ))
+
+
+def get_token_cache_stats():
+    """
+    Get the cumulative hit/miss counters of the access token cache
+    :rtype: dict[str, int]
+    """
+    stats = read_cache(TOKEN_CACHE_NAME).get('stats', dict())
+    return dict(hits=stats.get('hits', 0), misses=stats.get('misses', 0))
+
+
+def get_api_base_url(module):
+    """
+    Get the api base url a module's client will use
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: str
+    """
+    # The client prefers the environment api url over the passed in one
+    return getenv(ENVIRONMENT_API_URL) or module.params.get('api_base_url') or API_URL
+
+
+def get_client_cache_key(module, *parts):
+    """
+    Build a cache key scoped to the api base url and credentials of a module
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param parts: the values that identify a cache entry
+    :rtype: str
+    """
+    credentials = module.params.get('api_key') or module.params.get('api_access_token')
+    return get_cache_key(get_api_base_url(module), credentials, *parts)
+
+
+def get_cached_access_token(module, client):
+    """
+    Get an access token from the controller local token cache, logging in
+    and storing the new token if there is no valid cached token.  The cache is
+    held under an exclusive lock, so parallel forks login at most once.  The
+    refresh token and expiry are cached and restored on the client's session as
+    well, so the session refreshes the token before it expires, e.g. while a
+    task waits for a connection.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param Client client: the Pureport client
+    :rtype: str
+    """
+    api_key = module.params.get('api_key')
+    api_secret = module.params.get('api_secret')
+    key = get_cache_key(get_api_base_url(module), api_key, api_secret)
+    with update_cache(TOKEN_CACHE_NAME) as cache:
+        tokens = cache.setdefault('tokens', dict())
+        stats = cache.setdefault('stats', dict(hits=0, misses=0))
+        now = time()
+        # Drop any tokens that are about to expire, regardless of the key
+        for expired_key in [k for k, v in tokens.items() if v['expires_at'] - TOKEN_CACHE_EXPIRY_MARGIN <= now]:
+            del tokens[expired_key]
+        session = get_session(client)
+        if key in tokens:
+            stats['hits'] += 1
+            token = tokens[key]
+        else:
+            stats['misses'] += 1
+            access_token = client.login(key=api_key, secret=api_secret)
+            expires_at = getattr(session, '_token_expire_time', None)
+            token = tokens[key] = dict(
+                access_token=access_token,
+                refresh_token=getattr(session, '_refresh_token', None),
+                expires_at=expires_at if expires_at is not None else now + TOKEN_CACHE_DEFAULT_TTL
+            )
+        if token.get('refresh_token') is not None:
+            # The session refreshes the token once this time has passed
+            session._refresh_token = token['refresh_token']
+            session._token_expire_time = token['expires_at'] - TOKEN_CACHE_EXPIRY_MARGIN
+        return token['access_token']
+
+
 def get_client(module):
     """
-    Get a Pureport Client instance
+    Get a Pureport Client instance.  Clients are reused for the same api url and
+    credentials for the life of the process, so a module, or many modules run in
+    the same process, e.g. by the fabric action plugin, only login once.
     :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
     :rtype: Client
     """
-    if not HAS_PUREPORT_CLIENT:
+    key = get_cache_key(
+        get_api_base_url(module),
+        module.params.get('api_key'),
+        module.params.get('api_secret'),
+        module.params.get('api_access_token'),
+        module.params.get('api_token_cache'),
+        module.params.get('api_proxy')
+    )
+    client = __CLIENTS.get(key)
+    if client is not None:
+        return client
+    try:
+        from pureport.api.client import Client
+    except ImportError:
         module.fail_json(msg='pureport-client required for this module')
     client = Client(module.params.get('api_base_url'))
+    access_token = module.params.get('api_access_token')
+    if access_token is None and \
+            module.params.get('api_key') is not None and \
+            module.params.get('api_secret') is not None and \
+            module.params.get('api_token_cache'):
+        access_token = get_cached_access_token(module, client)
     client.login(
         key=module.params.get('api_key'),
         secret=module.params.get('api_secret'),
-        access_token=module.params.get('api_access_token')
+        access_token=access_token
     )
+    # The proxy is only used after logging in, since login resets the session's base url
+    if module.params.get('api_proxy'):
+        from .pureport_proxy import get_proxy_socket_path, start_proxy, use_proxy
+        # Fall back to connecting directly if the proxy can't be started
+        socket_path = get_proxy_socket_path()
+        if start_proxy(socket_path):
+            use_proxy(get_session(client), socket_path)
+    __CLIENTS[key] = client
     return client
 
 
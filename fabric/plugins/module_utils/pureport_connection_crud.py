@@ -6,23 +6,57 @@ __metaclass__ = type
 
 from functools import partial
 
-try:
-    from pureport.exception.api import ClientHttpException, NotFoundException
-except ImportError:
-    ClientHttpException = None
-    NotFoundException = None
-
 from .pureport_client import get_client, get_network_id
-from .pureport_crud import item_crud, deep_compare
+from .pureport_crud import \
+    COMPARE_UNORDERED, \
+    item_crud, \
+    deep_diff, \
+    get_merge_patch, \
+    patch_item, \
+    register_comparison_policy
+from .pureport_exceptions import get_client_http_exception, get_not_found_exception
+from .pureport_objects import get_object
+from .pureport_pagination import list_items
+from .pureport_resolve import build_index, resolve_existing_items
+from .pureport_wait import \
+    WAIT_COMPLETED, \
+    WAIT_DEFAULT_TIMEOUT, \
+    wait_for_connections
+
+# Changing only these fields does not reconfigure the connection, so there is nothing to wait for
+CONNECTION_METADATA_FIELDS = frozenset(['name', 'description', 'tags'])
+# The server does not keep the order of these lists
+CONNECTION_UNORDERED_FIELDS = ['customerNetworks', 'nat.mappings', 'cloudServices', 'trafficSelectors']
+
+for unordered_field in CONNECTION_UNORDERED_FIELDS:
+    register_comparison_policy(unordered_field, COMPARE_UNORDERED)
+
+
+class ConnectionApplyError(Exception):
+    def __init__(self, index, response, results):
+        """
+        Raised when the server rejected a connection's planned operation, after the
+        operations of the connections before it were applied
+        :param int index: the index of the connection that failed
+        :param requests.Response response: the server's response
+        :param list[(bool, str|None, pureport.api.client.Connection)] results:
+            a (changed, operation, connection) result per connection, where only
+            the connections before the failed one changed
+        """
+        super(ConnectionApplyError, self).__init__('Applying the plan failed for connections[%d].' % index)
+        self.index = index
+        self.response = response
+        self.results = results
 
 
 def get_wait_for_server_argument_spec():
     """
-    Return the basic wait_for_server param
+    Return the basic wait_for_server params
     :rtype: dict[str, dict]
     """
     return dict(
-        wait_for_server=dict(type='bool', default=False)
+        wait_for_server=dict(type='bool', default=False),
+        wait_for_server_timeout=dict(type='int', default=WAIT_DEFAULT_TIMEOUT)
     )
 
 
@@ -76,9 +110,10 @@ def get_peering_connection_argument_spec():
     )
 
 
-def __retrieve_connection(client, connection):
+def __retrieve_connection(module, client, connection):
     """
     Retrieve the Connection from the Ansible inferred Connection
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
     :param pureport.api.client.Client client: the Pureport client
     :param pureport.api.client.Connection connection: the Ansible inferred Connection
     :rtype: pureport.api.client.Connection |None
@@ -86,8 +121,8 @@ def __retrieve_connection(client, connection):
     connection_id = connection.get('id')
     if connection_id is not None:
         try:
-            return client.connections.get(connection_id)
-        except NotFoundException:
+            return get_object(module, client, '/connections/%s' % connection_id)
+        except get_not_found_exception():
             return None
     return None
 
@@ -103,10 +138,14 @@ def __resolve_connection(module, client, connection):
     """
     network_id = get_network_id(module)
     if network_id is not None:
-        existing_connections = client.networks.connections(network_id).list()
-        matched_connections = [existing_connection for existing_connection in existing_connections
-                               if all([existing_connection.get(k) == connection.get(k)
-                                       for k in ['name', 'type']])]
+        matched_connections = resolve_existing_items(
+            module,
+            '/networks/%s/connections' % network_id,
+            partial(list_items, module, client, '/networks/%s/connections' % network_id),
+            lambda connection_id: get_object(module, client, '/connections/%s' % connection_id),
+            connection,
+            ['name', 'type']
+        )
         if len(matched_connections) == 1:
             return matched_connections[0]
         elif len(matched_connections) > 1:
@@ -135,30 +174,246 @@ def __copy_existing_connection_properties(connection, existing_connection):
     return copied_connection
 
 
+def __wait_for_server(module, client, targets):
+    """
+    Wait for the created, updated or deleted connections to reach their expected
+    state if 'wait_for_server' is set, failing the module if any of them fail or
+    time out.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param list[(str, str)] targets: a list of (connection id, expected state) tuples
+    :returns: the last polled connection per target, in order
+    :rtype: list[pureport.api.client.Connection|None]
+    """
+    if not module.params.get('wait_for_server') or len(targets) == 0:
+        return [None for target in targets]
+    results = wait_for_connections(client, targets, module.params.get('wait_for_server_timeout'))
+    incomplete = [dict(id=connection_id,
+                       outcome=outcome,
+                       state=connection.get('state') if connection is not None else None)
+                  for connection_id, outcome, connection in results
+                  if outcome != WAIT_COMPLETED]
+    if len(incomplete) > 0:
+        # Only created, updated or deleted connections are waited on
+        module.fail_json(msg='Waiting for the server failed for %d connection(s).' % len(incomplete),
+                         changed=True,
+                         connections=incomplete)
+    return [connection for connection_id, outcome, connection in results]
+
+
+def __create_connection(module, client, connection):
+    """
+    Create a connection, waiting until it is active if 'wait_for_server' is set
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param pureport.api.client.Connection connection: the connection to create
+    :rtype: pureport.api.client.Connection
+    """
+    created_connection = client.networks.connections(get_network_id(module)).create(connection)
+    return __wait_for_server(module, client, [(created_connection['id'], 'ACTIVE')])[0] or created_connection
+
+
+def __update_connection(module, client, connection):
+    """
+    Update a connection, waiting until it is active if 'wait_for_server' is set
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param pureport.api.client.Connection connection: the connection to update
+    :rtype: pureport.api.client.Connection
+    """
+    updated_connection = client.connections.update(connection)
+    return __wait_for_server(module, client, [(updated_connection['id'], 'ACTIVE')])[0] or updated_connection
+
+
+def __patch_connection(module, client, connection, patch):
+    """
+    Update only the changed fields of a connection, waiting until it is active if
+    'wait_for_server' is set and anything other than its metadata changed
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param pureport.api.client.Connection connection: the connection to update
+    :param dict patch: the merge patch of the changed fields
+    :rtype: pureport.api.client.Connection
+    """
+    updated_connection = patch_item(module, client, client.connections.update, connection, patch)
+    if CONNECTION_METADATA_FIELDS.issuperset(patch):
+        return updated_connection
+    return __wait_for_server(module, client, [(updated_connection['id'], 'ACTIVE')])[0] or updated_connection
+
+
+def __delete_connection(module, client, connection):
+    """
+    Delete a connection, waiting until it is deleted if 'wait_for_server' is set
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param pureport.api.client.Connection connection: the connection to delete
+    """
+    client.connections.delete(connection.get('id'))
+    __wait_for_server(module, client, [(connection.get('id'), 'DELETED')])
+
+
 def connection_crud(module,
                     construct_item_fn,
-                    compare_item_fn=deep_compare):
+                    diff_item_fn=deep_diff):
     """
     Handle a basic connection's Ansible CRUD operations
     :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
     :param () -> T construct_item_fn:
         A function that creates the item from the Ansible module params
-    :param (T, T) -> boolean compare_item_fn:
-        A function that compares the Ansible item with the retrieved item
-    :rtype: (bool, T, T, T)
+    :param (T, T) -> list[(tuple, *, *)] diff_item_fn:
+        A function that lists the differences of the Ansible item with the retrieved item
+    :rtype: (bool, T, T, T, dict|None)
     """
     client = get_client(module)
-    wait_for_server = module.params.get('wait_for_server')
     return item_crud(
         module,
         construct_item_fn,
-        partial(__retrieve_connection, client),
+        partial(__retrieve_connection, module, client),
         partial(__resolve_connection, module, client),
-        lambda connection: client.networks
-                                 .connections(get_network_id(module))
-                                 .create(connection, wait_until_active=wait_for_server),
-        lambda connection: client.connections.update(connection, wait_until_active=wait_for_server),
-        lambda connection: client.connections.delete(connection.get('id'), wait_until_deleted=wait_for_server),
-        compare_item_fn=compare_item_fn,
+        partial(__create_connection, module, client),
+        partial(__update_connection, module, client),
+        partial(__delete_connection, module, client),
+        diff_item_fn=diff_item_fn,
+        patch_item_fn=partial(__patch_connection, module, client),
         copy_existing_item_properties_fn=__copy_existing_connection_properties
     )
+
+
+def index_connections(existing_connections):
+    """
+    Index the existing connections of a network by id, and by name and type
+    to resolve them with
+    :param collections.Iterable[pureport.api.client.Connection] existing_connections: the existing connections
+    :rtype: (dict[str, pureport.api.client.Connection], dict[tuple, list[pureport.api.client.Connection]])
+    """
+    by_id = dict((existing_connection.get('id'), existing_connection)
+                 for existing_connection in existing_connections)
+    return by_id, build_index(by_id.values(), ['name', 'type'])
+
+
+def plan_connections(module, connections, indexes):
+    """
+    Compare many connections with the indexed existing connections of their
+    networks in memory, and plan the operation each one needs
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param list[(pureport.api.client.Connection, str, str)] connections:
+        A list of (Ansible inferred Connection, network id, state) tuples
+    :param dict[str, tuple] indexes: the index_connections of each network id
+    :returns: an (operation, network id, changed connection, existing connection, differences) plan
+        per connection, where operation is one of 'create', 'update', 'delete' or None
+    :rtype: list[(str|None, str, pureport.api.client.Connection, pureport.api.client.Connection|None, list|None)]
+    """
+    resolve_existing = module.params.get('resolve_existing')
+    plans = []
+    claimed_ids = set()
+    for connection, network_id, state in connections:
+        by_id, by_name_and_type = indexes[network_id]
+        existing_connection = None
+        if connection.get('id') is not None:
+            existing_connection = by_id.get(connection.get('id'))
+        # Like item_crud, a connection whose id is not found is resolved by its name and type
+        if existing_connection is None and resolve_existing:
+            matched_connections = by_name_and_type.get((connection.get('name'), connection.get('type')), [])
+            if len(matched_connections) > 1:
+                module.fail_json(msg="Resolved more than one existing connection for '%s'.  Please provide an 'id' "
+                                     "if you are attempting to update/delete an existing connection.  "
+                                     "Otherwise, use a more distinct name & type or set "
+                                     "'resolve_existing' to false." % connection.get('name'))
+            elif len(matched_connections) == 1:
+                existing_connection = matched_connections[0]
+        if existing_connection is not None:
+            if existing_connection.get('id') in claimed_ids:
+                module.fail_json(msg="More than one connection resolved to the existing connection '%s'."
+                                     % existing_connection.get('id'))
+            claimed_ids.add(existing_connection.get('id'))
+
+        changed_connection = connection
+        if existing_connection is not None:
+            changed_connection = __copy_existing_connection_properties(connection, existing_connection)
+        differences = deep_diff(changed_connection, existing_connection) if existing_connection is not None else None
+
+        operation = None
+        if state == 'present' and existing_connection is None:
+            operation = 'create'
+        elif state == 'present' and len(differences) > 0:
+            operation = 'update'
+        elif state == 'absent' and existing_connection is not None:
+            operation = 'delete'
+        plans.append((operation, network_id, changed_connection, existing_connection, differences))
+    return plans
+
+
+def apply_connection_plan(module, client, plan):
+    """
+    Apply a connection's planned operation without waiting for it
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param tuple plan: the connection's plan from plan_connections
+    :returns: the resulting connection and the state to wait for, if any
+    :rtype: (pureport.api.client.Connection|None, str|None)
+    """
+    operation, network_id, changed_connection, existing_connection, differences = plan
+    if operation == 'create':
+        return client.networks.connections(network_id).create(changed_connection), 'ACTIVE'
+    elif operation == 'update':
+        patch = get_merge_patch(changed_connection, differences)
+        updated_connection = patch_item(module, client, client.connections.update, changed_connection, patch)
+        return updated_connection, None if CONNECTION_METADATA_FIELDS.issuperset(patch) else 'ACTIVE'
+    elif operation == 'delete':
+        client.connections.delete(existing_connection.get('id'))
+        return existing_connection, 'DELETED'
+    return existing_connection, None
+
+
+def connections_crud(module, connections):
+    """
+    Handle the Ansible CRUD operations for many connections at once.  The existing
+    connections of each network are listed a single time and every connection is
+    compared in memory before any create, update or delete is made.  If 'wait_for_server'
+    is set, all changes are made first and then waited on at the same time.  If
+    the server rejects a change, no further changes are made, and a
+    ConnectionApplyError is raised with the results so far.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param list[(pureport.api.client.Connection, str, str)] connections:
+        A list of (Ansible inferred Connection, network id, state) tuples
+    :returns: if anything changed and a (changed, operation, connection) result per connection
+    :rtype: (bool, list[(bool, str|None, pureport.api.client.Connection)])
+    """
+    client = get_client(module)
+
+    # List and index the existing connections of each network once
+    indexes = dict()
+    for connection, network_id, state in connections:
+        if network_id not in indexes:
+            indexes[network_id] = index_connections(list_items(module, client, '/networks/%s/connections' % network_id))
+
+    # Compare everything in memory
+    plans = plan_connections(module, connections, indexes)
+
+    # Apply the changes without waiting
+    results = []
+    targets = []
+    for index, plan in enumerate(plans):
+        operation, network_id, changed_connection, existing_connection, differences = plan
+        if module.check_mode:
+            result_connection = changed_connection if operation in ('create', 'update') else existing_connection
+        else:
+            try:
+                result_connection, expected_state = apply_connection_plan(module, client, plan)
+            except get_client_http_exception() as e:
+                results += [(False, remaining_operation, remaining_existing_connection)
+                            for remaining_operation, _, _, remaining_existing_connection, _ in plans[index:]]
+                raise ConnectionApplyError(index, e.response, results)
+            if expected_state is not None:
+                targets.append((len(results), result_connection.get('id'), expected_state))
+        results.append((operation is not None, operation, result_connection))
+
+    # Wait for all changes at once
+    polled_connections = __wait_for_server(module, client, [(connection_id, expected_state)
+                                                            for index, connection_id, expected_state in targets])
+    for (index, connection_id, expected_state), polled_connection in zip(targets, polled_connections):
+        if polled_connection is not None:
+            changed, operation, result_connection = results[index]
+            results[index] = (changed, operation, polled_connection)
+
+    return any(changed for changed, operation, connection in results), results
@@ -0,0 +1,664 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.module_utils.common.dict_transformations import snake_dict_to_camel_dict
+
+from .pureport_client import get_object_link
+from .pureport_connection_crud import \
+    get_connection_argument_spec, \
+    get_connection_required_one_of, \
+    get_cloud_connection_argument_spec, \
+    get_peering_connection_argument_spec
+from .pureport_params import get_sub_params
+
+__IKE_V1_IKE_ENCRYPTION_ALGORITHMS = [
+    'AES_128',
+    'AES_192',
+    'AES_256'
+]
+__IKE_V1_IKE_INTEGRITY_ALGORITHMS = [
+    'MD5_HMAC',
+    'SHA1_HMAC',
+    'SHA256_HMAC',
+    'SHA384_HMAC',
+    'SHA512_HMAC'
+]
+__NO_INTEGRITY_ALGORITHMS = [
+    'AES_128_GCM_64',
+    'AES_192_GCM_64',
+    'AES_256_GCM_64',
+    'AES_128_GCM_96',
+    'AES_192_GCM_96',
+    'AES_256_GCM_96',
+    'AES_128_GCM_128',
+    'AES_192_GCM_128',
+    'AES_256_GCM_128',
+    'AES_128_GMAC',
+    'AES_192_GMAC',
+    'AES_256_GMAC'
+]
+
+
+def get_aws_direct_connect_connection_argument_spec():
+    """
+    Return the params for an AWS Direct Connect connection
+    :rtype: dict[str, dict]
+    """
+    argument_spec = dict()
+    argument_spec.update(get_connection_argument_spec())
+    argument_spec.update(get_cloud_connection_argument_spec())
+    argument_spec.update(get_peering_connection_argument_spec())
+    argument_spec.update(
+        dict(
+            aws_account_id=dict(type='str', required=True),
+            aws_region=dict(type='str', required=True),
+            cloud_service_ids=dict(type='list', default=[], elements='str'),
+            cloud_service_hrefs=dict(type='list', default=[], elements='str')
+        )
+    )
+    return argument_spec
+
+
+def construct_aws_direct_connect_connection(module):
+    """
+    Construct an AWS Direct Connect Connection from the Ansible module arguments
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: pureport.api.client.Connection
+    """
+    connection = dict((k, module.params.get(k)) for k in (
+        'id',
+        'name',
+        'description',
+        'speed',
+        'high_availability',
+        'billing_term',
+        'customer_asn',
+        'customer_networks',
+        'aws_account_id',
+        'aws_region'
+    ))
+    cloud_services = [dict(href='/cloudServices/%s' % cloud_service_id)
+                      for cloud_service_id in module.params.get('cloud_service_ids')]
+    cloud_services += [dict(href=cloud_service_href)
+                       for cloud_service_href in module.params.get('cloud_service_hrefs')]
+    connection.update(dict(
+        type='AWS_DIRECT_CONNECT',
+        peering=dict(type=module.params.get('peering_type')),
+        location=get_object_link(module, '/locations', 'location_id', 'location_href'),
+        cloud_services=cloud_services,
+        nat=dict(
+            enabled=module.params.get('nat_enabled'),
+            mappings=[dict(native_cidr=nat_mapping)
+                      for nat_mapping in module.params.get('nat_mappings')]
+        )
+    ))
+    connection = snake_dict_to_camel_dict(connection)
+    # Correct naming
+    connection.update(dict(
+        customerASN=connection.pop('customerAsn'),
+        tags=module.params.get('tags')
+    ))
+    return connection
+
+
+def get_azure_express_route_connection_argument_spec():
+    """
+    Return the params for an Azure Express Route connection
+    :rtype: dict[str, dict]
+    """
+    argument_spec = dict()
+    argument_spec.update(get_connection_argument_spec())
+    argument_spec.update(get_cloud_connection_argument_spec())
+    argument_spec.update(get_peering_connection_argument_spec())
+    argument_spec.update(
+        dict(
+            service_key=dict(type='str', required=True)
+        )
+    )
+    return argument_spec
+
+
+def construct_azure_express_route_connection(module):
+    """
+    Construct an Azure Express Route Connection from the Ansible module arguments
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: pureport.api.client.Connection
+    """
+    connection = dict((k, module.params.get(k)) for k in (
+        'id',
+        'name',
+        'description',
+        'speed',
+        'high_availability',
+        'billing_term',
+        'customer_networks',
+        'service_key'
+    ))
+    connection.update(dict(
+        type='AZURE_EXPRESS_ROUTE',
+        peering=dict(type=module.params.get('peering_type')),
+        location=get_object_link(module, '/locations', 'location_id', 'location_href'),
+        nat=dict(
+            enabled=module.params.get('nat_enabled'),
+            mappings=[dict(native_cidr=nat_mapping)
+                      for nat_mapping in module.params.get('nat_mappings')]
+        )
+    ))
+    connection = snake_dict_to_camel_dict(connection)
+    connection.update(dict(
+        tags=module.params.get('tags')
+    ))
+    return connection
+
+
+def get_google_cloud_interconnect_connection_argument_spec():
+    """
+    Return the params for a Google Cloud Interconnect connection
+    :rtype: dict[str, dict]
+    """
+    argument_spec = dict()
+    argument_spec.update(get_connection_argument_spec())
+    argument_spec.update(get_cloud_connection_argument_spec())
+    argument_spec.update(
+        dict(
+            primary_pairing_key=dict(type='str', required=True),
+            secondary_pairing_key=dict(type='str')
+        )
+    )
+    return argument_spec
+
+
+def construct_google_cloud_interconnect_connection(module):
+    """
+    Construct a Google Cloud Interconnect Connection from the Ansible module arguments
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: pureport.api.client.Connection
+    """
+    connection = dict((k, module.params.get(k)) for k in (
+        'id',
+        'name',
+        'description',
+        'speed',
+        'high_availability',
+        'billing_term',
+        'customer_networks',
+        'primary_pairing_key',
+        'secondary_pairing_key'
+    ))
+    connection.update(dict(
+        type='GOOGLE_CLOUD_INTERCONNECT',
+        location=get_object_link(module, '/locations', 'location_id', 'location_href'),
+        nat=dict(
+            enabled=module.params.get('nat_enabled'),
+            mappings=[dict(native_cidr=nat_mapping)
+                      for nat_mapping in module.params.get('nat_mappings')]
+        )
+    ))
+    connection = snake_dict_to_camel_dict(connection)
+    connection.update(dict(
+        tags=module.params.get('tags')
+    ))
+    return connection
+
+
+def get_oracle_fast_connect_connection_argument_spec():
+    """
+    Return the params for a Oracle FastConnect connection
+    :rtype: dict[str, dict]
+    """
+    argument_spec = dict()
+    argument_spec.update(get_connection_argument_spec())
+    argument_spec.update(get_cloud_connection_argument_spec())
+    argument_spec.update(
+        dict(
+            cloud_region_id=dict(type='str'),
+            cloud_region_href=dict(type='str'),
+            primary_ocid=dict(type='str', required=True),
+            secondary_ocid=dict(type='str', required=True),
+            primary_remote_bgp_ip=dict(type='str', required=True),
+            primary_pureport_bgp_ip=dict(type='str', required=True),
+            secondary_remote_bgp_ip=dict(type='str', required=True),
+            secondary_pureport_bgp_ip=dict(type='str', required=True)
+        )
+    )
+    return argument_spec
+
+
+def construct_oracle_fast_connect_connection(module):
+    """
+    Construct a Oracle FastConnect Connection from the Ansible module arguments
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: pureport.api.client.Connection
+    """
+    connection = dict((k, module.params.get(k)) for k in (
+        'id',
+        'name',
+        'description',
+        'speed',
+        'billing_term',
+        'customer_networks',
+        'primary_ocid',
+        'secondary_ocid'
+    ))
+    connection.update(dict(
+        type='ORACLE_FAST_CONNECT',
+        high_availability=True,
+        location=get_object_link(module, '/locations', 'location_id', 'location_href'),
+        cloud_region=get_object_link(module, '/cloudRegions', 'cloud_region_id', 'cloud_region_href'),
+        nat=dict(
+            enabled=module.params.get('nat_enabled'),
+            mappings=[dict(native_cidr=nat_mapping)
+                      for nat_mapping in module.params.get('nat_mappings')]
+        )
+    ))
+    connection = snake_dict_to_camel_dict(connection)
+    # Correct naming
+    connection.update(dict(
+        peering=dict(
+            type='PRIVATE',
+            primaryRemoteBgpIP=module.params.get('primary_remote_bgp_ip'),
+            primaryPureportBgpIP=module.params.get('primary_pureport_bgp_ip'),
+            secondaryRemoteBgpIP=module.params.get('secondary_remote_bgp_ip'),
+            secondaryPureportBgpIP=module.params.get('secondary_pureport_bgp_ip'),
+        ),
+        tags=module.params.get('tags')
+    ))
+    return connection
+
+
+def get_port_connection_argument_spec():
+    """
+    Return the params for a Port connection
+    :rtype: dict[str, dict]
+    """
+    argument_spec = dict()
+    argument_spec.update(get_connection_argument_spec())
+    argument_spec.update(get_cloud_connection_argument_spec())
+    argument_spec.update(
+        dict(
+            primary_port_id=dict(type='str'),
+            primary_port_href=dict(type='str'),
+            secondary_port_id=dict(type='str'),
+            secondary_port_href=dict(type='str'),
+            primary_customer_vlan=dict(type='int', required=True),
+            secondary_customer_vlan=dict(type='int')
+        )
+    )
+    return argument_spec
+
+
+def construct_port_connection(module):
+    """
+    Construct a Port Connection from the Ansible module arguments
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: pureport.api.client.Connection
+    """
+    connection = dict((k, module.params.get(k)) for k in (
+        'id',
+        'name',
+        'description',
+        'speed',
+        'high_availability',
+        'billing_term',
+        'customer_asn',
+        'customer_networks',
+        'primary_customer_vlan',
+        'secondary_customer_vlan'
+    ))
+    connection.update(dict(
+        type='PORT',
+        location=get_object_link(module, '/locations', 'location_id', 'location_href'),
+        primary_port=get_object_link(module, '/ports', 'primary_port_id', 'primary_port_href'),
+        nat=dict(
+            enabled=module.params.get('nat_enabled'),
+            mappings=[dict(native_cidr=nat_mapping)
+                      for nat_mapping in module.params.get('nat_mappings')]
+        )
+    ))
+    secondary_port = get_object_link(module, '/ports', 'secondary_port_id', 'secondary_port_href')
+    if secondary_port is not None:
+        connection.update(dict(
+            secondary_port=secondary_port,
+        ))
+    connection = snake_dict_to_camel_dict(connection)
+    # Correct naming
+    connection.update(dict(
+        customerASN=connection.pop('customerAsn'),
+        tags=module.params.get('tags')
+    ))
+    return connection
+
+
+def get_site_ipsec_vpn_connection_argument_spec():
+    """
+    Return the params for a Site IPSec VPN connection
+    :rtype: dict[str, dict]
+    """
+    argument_spec = dict()
+    argument_spec.update(get_connection_argument_spec())
+    argument_spec.update(
+        dict(
+            primary_customer_router_ip=dict(type='str', required=True),
+            secondary_customer_router_ip=dict(type='str'),
+            routing_type=dict(
+                type='str',
+                choices=[
+                    'ROUTE_BASED_BGP',
+                    'ROUTE_BASED_STATIC',
+                    'POLICY_BASED'
+                ],
+                default='ROUTE_BASED_BGP'
+            ),
+            physical_address=dict(type='dict'),
+            ike_version=dict(
+                type='str',
+                choices=[
+                    'V1',
+                    'V2'
+                ],
+                default='V2'
+            ),
+            ike_encryption=dict(
+                type='str',
+                choices=[
+                    'NULL',
+                    'AES_128',
+                    'AES_192',
+                    'AES_256',
+                    'AES_128_CTR',
+                    'AES_192_CTR',
+                    'AES_256_CTR',
+                    'AES_128_GCM_64',
+                    'AES_192_GCM_64',
+                    'AES_256_GCM_64',
+                    'AES_128_GCM_96',
+                    'AES_192_GCM_96',
+                    'AES_256_GCM_96',
+                    'AES_128_GCM_128',
+                    'AES_192_GCM_128',
+                    'AES_256_GCM_128'
+                ],
+                default='AES_128'
+            ),
+            ike_integrity=dict(
+                type='str',
+                choices=[
+                    'MD5_HMAC',
+                    'SHA1_HMAC',
+                    'SHA256_HMAC',
+                    'SHA384_HMAC',
+                    'SHA512_HMAC',
+                    'AES_XCBC'
+                ]
+            ),
+            ike_prf=dict(
+                type='str',
+                choices=[
+                    'MD5',
+                    'SHA_1',
+                    'AES_XCBC',
+                    'SHA_256',
+                    'SHA_384',
+                    'SHA_512'
+                ]
+            ),
+            ike_dh_group=dict(
+                type='str',
+                choices=[
+                    'MODP_1024',
+                    'MODP_1536',
+                    'MODP_2048',
+                    'MODP_3072',
+                    'MODP_4096',
+                    'MODP_6144',
+                    'MODP_8192',
+                    'ECP_192',
+                    'ECP_224',
+                    'ECP_256',
+                    'ECP_384',
+                    'ECP_521'
+                ],
+                default='MODP_2048'
+            ),
+            esp_encryption=dict(
+                type='str',
+                choices=[
+                    'NULL',
+                    'AES_128',
+                    'AES_192',
+                    'AES_256',
+                    'AES_128_CTR',
+                    'AES_192_CTR',
+                    'AES_256_CTR',
+                    'AES_128_GCM_64',
+                    'AES_192_GCM_64',
+                    'AES_256_GCM_64',
+                    'AES_128_GCM_96',
+                    'AES_192_GCM_96',
+                    'AES_256_GCM_96',
+                    'AES_128_GCM_128',
+                    'AES_192_GCM_128',
+                    'AES_256_GCM_128',
+                    'AES_128_GMAC',
+                    'AES_192_GMAC',
+                    'AES_256_GMAC'
+                ],
+                default='AES_128'
+            ),
+            esp_integrity=dict(
+                type='str',
+                choices=[
+                    'MD5_HMAC',
+                    'SHA1_HMAC',
+                    'SHA256_HMAC',
+                    'SHA384_HMAC',
+                    'SHA512_HMAC',
+                    'AES_XCBC'
+                ]
+            ),
+            esp_dh_group=dict(
+                type='str',
+                choices=[
+                    'MODP_1024',
+                    'MODP_1536',
+                    'MODP_2048',
+                    'MODP_3072',
+                    'MODP_4096',
+                    'MODP_6144',
+                    'MODP_8192',
+                    'ECP_192',
+                    'ECP_224',
+                    'ECP_256',
+                    'ECP_384',
+                    'ECP_521'
+                ],
+                default='MODP_2048'
+            ),
+            primary_key=dict(type='str'),
+            secondary_key=dict(type='str'),
+            traffic_selectors=dict(type='list', default=[], elements='dict'),
+            enable_bgp_password=dict(type='bool')
+        )
+    )
+    return argument_spec
+
+
+def construct_site_ipsec_vpn_connection(module):
+    """
+    Construct a Site IPSec VPN Connection from the Ansible module arguments
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: pureport.api.client.Connection
+    """
+    connection = dict((k, module.params.get(k)) for k in (
+        'id',
+        'name',
+        'description',
+        'speed',
+        'high_availability',
+        'billing_term',
+        'customer_asn',
+        'customer_networks',
+        'primary_customer_router_ip',
+        'secondary_customer_router_ip',
+        'routing_type',
+        'physical_address',
+        'ike_version',
+        'primary_key',
+        'secondary_key',
+        'traffic_selectors',
+        'enable_bgp_password'
+    ))
+    is_ike_v1 = connection.get('ike_version') == 'V1'
+    connection.update([
+        (
+            'ikeV1' if is_ike_v1 else 'ikeV2',
+            dict(
+                ike=dict((k[4:], module.params.get(k)) for k in (
+                    'ike_encryption',
+                    'ike_integrity',
+                    'ike_prf' if not is_ike_v1 else None,
+                    'ike_dh_group',
+                ) if k is not None),
+                esp=dict((k[4:], module.params.get(k)) for k in (
+                    'esp_encryption',
+                    'esp_integrity',
+                    'esp_dh_group'
+                ))
+            )
+        )
+    ])
+
+    if 'ikeV1' in connection:
+        if connection['ikeV1']['ike']['encryption'] not in __IKE_V1_IKE_ENCRYPTION_ALGORITHMS:
+            module.fail_json(msg='For IKE V1, \'ike_encryption\' must '
+                                 'be one of %s' % __IKE_V1_IKE_ENCRYPTION_ALGORITHMS)
+        if connection['ikeV1']['ike']['integrity'] is None:
+            connection['ikeV1']['ike']['integrity'] = 'SHA256_HMAC'
+        elif connection['ikeV1']['ike']['integrity'] not in __IKE_V1_IKE_INTEGRITY_ALGORITHMS:
+            module.fail_json(msg='For IKE V1, \'ike_integrity\' must '
+                                 'be one of %s' % __IKE_V1_IKE_INTEGRITY_ALGORITHMS)
+        if connection['ikeV1']['esp']['encryption'] in __NO_INTEGRITY_ALGORITHMS:
+            del connection['ikeV1']['esp']['integrity']
+    elif 'ikeV2' in connection:
+        if connection['ikeV2']['ike']['encryption'] in __NO_INTEGRITY_ALGORITHMS:
+            if connection['ikeV2']['ike']['integrity'] is not None:
+                del connection['ikeV2']['ike']['integrity']
+            if connection['ikeV2']['ike']['prf'] is None:
+                connection['ikeV2']['ike']['prf'] = 'SHA_256'
+        else:
+            if connection['ikeV2']['ike']['integrity'] is None:
+                connection['ikeV2']['ike']['integrity'] = 'SHA256_HMAC'
+            if connection['ikeV2']['ike']['prf'] is not None:
+                del connection['ikeV2']['ike']['prf']
+
+    connection.update(dict(
+        type='SITE_IPSEC_VPN',
+        authType='PSK',
+        location=get_object_link(module, '/locations', 'location_id', 'location_href'),
+        nat=dict(
+            enabled=module.params.get('nat_enabled'),
+            mappings=[dict(native_cidr=nat_mapping)
+                      for nat_mapping in module.params.get('nat_mappings')]
+        )
+    ))
+    connection = snake_dict_to_camel_dict(connection)
+    # Correct naming
+    connection.update(dict(
+        primaryCustomerRouterIP=connection.pop('primaryCustomerRouterIp'),
+        secondaryCustomerRouterIP=connection.pop('secondaryCustomerRouterIp'),
+        customerASN=connection.pop('customerAsn'),
+        enableBGPPassword=connection.pop('enableBgpPassword'),
+        tags=module.params.get('tags')
+    ))
+    return connection
+
+
+def get_connection_types():
+    """
+    Return the supported connection types keyed by the connection 'type',
+    including each type's params, param constraints and construct function
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        AWS_DIRECT_CONNECT=dict(
+            argument_spec=get_aws_direct_connect_connection_argument_spec(),
+            mutually_exclusive=[
+                ['cloud_service_ids', 'cloud_service_hrefs']
+            ],
+            required_one_of=get_connection_required_one_of(),
+            construct_fn=construct_aws_direct_connect_connection
+        ),
+        AZURE_EXPRESS_ROUTE=dict(
+            argument_spec=get_azure_express_route_connection_argument_spec(),
+            mutually_exclusive=[],
+            required_one_of=get_connection_required_one_of(),
+            construct_fn=construct_azure_express_route_connection
+        ),
+        GOOGLE_CLOUD_INTERCONNECT=dict(
+            argument_spec=get_google_cloud_interconnect_connection_argument_spec(),
+            mutually_exclusive=[],
+            required_one_of=get_connection_required_one_of(),
+            construct_fn=construct_google_cloud_interconnect_connection
+        ),
+        ORACLE_FAST_CONNECT=dict(
+            argument_spec=get_oracle_fast_connect_connection_argument_spec(),
+            mutually_exclusive=[],
+            required_one_of=get_connection_required_one_of() + [
+                ['cloud_region_id', 'cloud_region_href']
+            ],
+            construct_fn=construct_oracle_fast_connect_connection
+        ),
+        PORT=dict(
+            argument_spec=get_port_connection_argument_spec(),
+            mutually_exclusive=[
+                ['secondary_port_id', 'secondary_port_href']
+            ],
+            required_one_of=get_connection_required_one_of() + [
+                ['primary_port_id', 'primary_port_href']
+            ],
+            construct_fn=construct_port_connection
+        ),
+        SITE_IPSEC_VPN=dict(
+            argument_spec=get_site_ipsec_vpn_connection_argument_spec(),
+            mutually_exclusive=[
+                ['ike_integrity', 'ike_prf']
+            ],
+            required_one_of=get_connection_required_one_of(),
+            construct_fn=construct_site_ipsec_vpn_connection
+        )
+    )
+
+
+def get_connection_params(module, label, connection_types, spec, extra_options=None):
+    """
+    Validate a single connection of a list option against its connection type's
+    params, filling in defaults.  Besides its type's params, a connection has a
+    'type' and a 'state', which defaults to 'present'.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str label: the connection's name in error messages, e.g. 'connections[0]'
+    :param dict[str, dict] connection_types: the supported connection types
+    :param dict spec: the user provided connection
+    :param list[str] extra_options: any other options the connection may have
+    :rtype: dict
+    """
+    connection_type = spec.get('type') if isinstance(spec, dict) else None
+    if connection_type not in connection_types:
+        module.fail_json(msg="%s: 'type' must be one of %s" % (label, sorted(connection_types.keys())))
+    definition = connection_types[connection_type]
+    params = get_sub_params(
+        module,
+        label,
+        spec,
+        definition['argument_spec'],
+        mutually_exclusive=definition['mutually_exclusive'],
+        required_one_of=definition['required_one_of'],
+        extra_options=['type', 'state'] + list(extra_options or [])
+    )
+    if params['state'] is None:
+        params['state'] = 'present'
+    if params['state'] not in ('present', 'absent'):
+        module.fail_json(msg="%s: 'state' must be one of ['present', 'absent']" % label)
+    return params
@@ -4,6 +4,35 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+from collections import defaultdict
+from time import time
+
+from .pureport_cache import read_cache, update_cache
+from .pureport_client import get_api_base_url, get_session
+from .pureport_exceptions import get_client_http_exception
+from .pureport_plan import get_plan_key, get_planned_existing_item, store_plan
+
+API_CAPABILITIES_CACHE_NAME = 'api_capabilities'
+# Remember that the server rejected a PATCH for this many seconds
+API_CAPABILITIES_CACHE_TTL = 86400
+PATCH_UNSUPPORTED_STATUS_CODES = (405, 501)
+# Servers without PATCH support may also reject it as a bad request, an unknown route or an unsupported media type,
+# but these may be caused by the item as well, so a PATCH is only remembered as unsupported if the full update succeeds
+PATCH_REJECTED_STATUS_CODES = (400, 404, 415)
+
+# The operations of a plan
+PLAN_CREATE = 'create'
+PLAN_UPDATE = 'update'
+PLAN_DELETE = 'delete'
+PLAN_NONE = 'none'
+
+# Lists are compared by position
+COMPARE_ORDERED = 'ordered'
+# Lists are compared as multisets, the server may return their entries in any order
+COMPARE_UNORDERED = 'unordered'
+# The comparison policy of list fields by their dotted path from the root of an item, see register_comparison_policy
+COMPARISON_POLICIES = dict()
+
 
 def get_state_argument_spec():
     """
@@ -17,54 +46,395 @@ def get_state_argument_spec():
 
 def get_resolve_existing_argument_spec():
     """
-    Return the basic resolve_existing param
+    Return the basic resolve_existing params
     :rtype: dict[str, dict]
     """
     return dict(
-        resolve_existing=dict(type='bool', default=True)
+        resolve_existing=dict(type='bool', default=True),
+        resolve_existing_cache_ttl=dict(type='int', default=300)
     )
 
 
+def __is_empty_value(existing_value):
+    """
+    Check if an existing value is what the server returns in place of a None
+    value, a false boolean, empty list or empty dict
+    :param * existing_value:
+    :rtype: bool
+    """
+    return existing_value is False or \
+        (isinstance(existing_value, (dict, list)) and len(existing_value) == 0)
+
+
+def register_comparison_policy(field, policy):
+    """
+    Register how a list field is compared.  Lists are compared by position
+    unless registered otherwise.
+    :param str field: the dotted path of keys from the root of an item, e.g. nat.mappings
+    :param str policy: either COMPARE_ORDERED or COMPARE_UNORDERED
+    """
+    if policy not in (COMPARE_ORDERED, COMPARE_UNORDERED):
+        raise ValueError('Unknown comparison policy %s' % policy)
+    COMPARISON_POLICIES[field] = policy
+
+
+def __get_comparison_policy(path):
+    """
+    Get the comparison policy of a list field
+    :param tuple path: the keys/indexes from the root of the item
+    :rtype: str
+    """
+    if len(COMPARISON_POLICIES) == 0:
+        return COMPARE_ORDERED
+    field = '.'.join(k for k in path if not isinstance(k, int))
+    return COMPARISON_POLICIES.get(field, COMPARE_ORDERED)
+
+
+def __get_canonical_key(value):
+    """
+    Get a canonical, hashable form of a value, which is the same for equal values
+    regardless of the order of their dict keys.  Scalars keep their type, so values
+    like 0 and False, which deep_compare treats differently, are kept apart.
+    :param * value:
+    :rtype: collections.Hashable
+    """
+    if isinstance(value, dict):
+        return dict, frozenset((k, __get_canonical_key(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return list, tuple(__get_canonical_key(v) for v in value)
+    return type(value), value
+
+
+def __is_fully_set(value):
+    """
+    Check if a value does not contain any None value, false boolean, empty list
+    or empty dict, which deep_compare treats as the same as other values
+    :param * value:
+    :rtype: bool
+    """
+    stack = [value]
+    while len(stack) > 0:
+        sub_value = stack.pop()
+        if sub_value is None or sub_value is False:
+            return False
+        if isinstance(sub_value, dict):
+            if len(sub_value) == 0:
+                return False
+            stack.extend(sub_value.values())
+        elif isinstance(sub_value, list):
+            if len(sub_value) == 0:
+                return False
+            stack.extend(sub_value)
+    return True
+
+
+def __is_sub_multiset(items, existing_items):
+    """
+    Check if every entry of a list is the same as a distinct entry of the existing
+    list, regardless of their order.  Fully set entries are matched by a canonical
+    hash of the keys the entries of the list set, so this is linear for the common
+    case of entries that are equal.  Any other entries, e.g. ones with a None value
+    that is the same as an empty list, are then matched to the remaining entries.
+    :param list items: the entries
+    :param list existing_items: the existing entries
+    :rtype: bool
+    """
+    keys = None
+    if all(isinstance(item, dict) for item in items):
+        keys = set()
+        for item in items:
+            keys.update(item)
+    remaining = defaultdict(list)
+    for existing_item in existing_items:
+        if keys is not None and isinstance(existing_item, dict):
+            projected_item = dict((k, existing_item.get(k)) for k in keys)
+        else:
+            projected_item = existing_item
+        remaining[__get_canonical_key(projected_item)].append(existing_item)
+
+    unmatched_items = []
+    for item in items:
+        # Taking an equal existing entry for a fully set entry never prevents another entry from
+        # being matched, as any entry that is the same as the existing entry is the same as this one
+        matches = remaining.get(__get_canonical_key(item)) if __is_fully_set(item) else None
+        if matches:
+            matches.pop()
+        else:
+            unmatched_items.append(item)
+    if len(unmatched_items) == 0:
+        return True
+
+    # Match the remaining entries with augmenting paths, as an entry may be the same as
+    # many existing entries, e.g. an entry that only sets some of the keys
+    remaining_items = [existing_item for matches in remaining.values() for existing_item in matches]
+    candidates = [[j for j, existing_item in enumerate(remaining_items) if deep_compare(item, existing_item)]
+                  for item in unmatched_items]
+    matched_by = dict()
+    for i in range(len(unmatched_items)):
+        if not __augment_matching(i, candidates, matched_by):
+            return False
+    return True
+
+
+def __augment_matching(start, candidates, matched_by):
+    """
+    Iteratively search for an augmenting path from an entry, updating the
+    matching of existing entries to entries if one is found
+    :param int start: the index of the entry
+    :param list[list[int]] candidates: the indexes of the existing entries each entry is the same as
+    :param dict[int, int] matched_by: the index of the entry each existing entry is matched to
+    :returns: if the entry could be matched
+    :rtype: bool
+    """
+    visited = set()
+    stack = [(start, iter(candidates[start]))]
+    # The existing entry taken at each level of the stack, to reach the next level
+    taken = []
+    while len(stack) > 0:
+        item_index, item_candidates = stack[-1]
+        for j in item_candidates:
+            if j in visited:
+                continue
+            visited.add(j)
+            if j not in matched_by:
+                for level, taken_j in enumerate(taken):
+                    matched_by[taken_j] = stack[level][0]
+                matched_by[j] = item_index
+                return True
+            taken.append(j)
+            stack.append((matched_by[j], iter(candidates[matched_by[j]])))
+            break
+        else:
+            stack.pop()
+            if len(taken) > 0:
+                taken.pop()
+    return False
+
+
+def iter_deep_diff(item, existing_item):
+    """
+    Given an item and an existing item, this iteratively walks all set keys/indexes
+    in the item and lazily yields each one that is not the same in the existing
+    item, so a caller can stop at the first difference.  A key the existing item
+    does not have is compared to None, and a None value is the same as a false
+    boolean, empty list or empty dict.  A list with more entries than the existing
+    list, or a list compared as a multiset (see register_comparison_policy) that
+    differs, is yielded as a whole, rather than per index.
+    :param * item:
+    :param * existing_item:
+    :returns: the differences as (path, value, existing value) tuples, where the path
+        is a tuple of the keys/indexes from the root of the item
+    :rtype: collections.Iterator[(tuple, *, *)]
+    """
+    if item == existing_item:
+        return
+    # A stack of (path, sub item, sub existing item) to walk, only unequal dicts and lists are pushed
+    stack = [((), item, existing_item)]
+    while len(stack) > 0:
+        path, sub_item, sub_existing_item = stack.pop()
+        if isinstance(sub_item, dict) and isinstance(sub_existing_item, dict):
+            entries = sub_item.items()
+            get_existing_value = sub_existing_item.get
+        elif isinstance(sub_item, list) and isinstance(sub_existing_item, list):
+            if len(sub_item) > len(sub_existing_item):
+                yield path, sub_item, sub_existing_item
+                continue
+            if __get_comparison_policy(path) == COMPARE_UNORDERED:
+                if not __is_sub_multiset(sub_item, sub_existing_item):
+                    yield path, sub_item, sub_existing_item
+                continue
+            entries = enumerate(sub_item)
+            get_existing_value = sub_existing_item.__getitem__
+        else:
+            if sub_item is not None or not __is_empty_value(sub_existing_item):
+                yield path, sub_item, sub_existing_item
+            continue
+        for k, value in entries:
+            existing_value = get_existing_value(k)
+            # Equal values are the same without walking them
+            if value == existing_value:
+                continue
+            if (isinstance(value, dict) and isinstance(existing_value, dict)) or \
+                    (isinstance(value, list) and isinstance(existing_value, list)):
+                stack.append((path + (k,), value, existing_value))
+            elif value is not None or not __is_empty_value(existing_value):
+                yield path + (k,), value, existing_value
+
+
+def deep_diff(item, existing_item):
+    """
+    Given an item and an existing item, this lists every set key/index in the item
+    that is not the same in the existing item.  See iter_deep_diff.
+    :param * item:
+    :param * existing_item:
+    :rtype: list[(tuple, *, *)]
+    """
+    return list(iter_deep_diff(item, existing_item))
+
+
 def deep_compare(item, existing_item):
     """
-    Given an item and an existing item, this recursively compares that all
-    set keys/indexes in the item object are present in the existing item.
+    Given an item and an existing item, this compares that all set keys/indexes
+    in the item object are present in the existing item, stopping at the first
+    difference.
     :param * item:
     :param * existing_item:
     :returns: True if the objects are the same
     :rtype: bool
     """
-    def compare(sub_item, sub_existing_item):
-        # Compare dicts
-        if isinstance(sub_item, dict) and isinstance(sub_existing_item, dict):
-            for k in sub_item:
-                try:
-                    if compare(sub_item[k], sub_existing_item[k]) is False:
-                        return False
-                except KeyError:
-                    # If the item has a key, but the existing one does not, check
-                    # if the item's value is None
-                    if compare(sub_item[k], None) is False:
-                        return False
-            return True
-        # Compare lists
-        if isinstance(sub_item, list) and isinstance(sub_existing_item, list):
-            try:
-                return all(compare(sub_item[i], sub_existing_item[i]) for i in range(len(sub_item)))
-            except IndexError:
-                # Lists were of different size
-                return False
-        # Compare the item to the existing item.  There's also a special case here
-        # where the item may have been None, but the server returns a false boolean, empty list or empty dict.
-        if sub_item == sub_existing_item:
-            return True
-        elif sub_item is None:
-            return (isinstance(sub_existing_item, bool) and sub_existing_item is False) or \
-                   (isinstance(sub_existing_item, dict) and len(sub_existing_item.items()) == 0) or \
-                   (isinstance(sub_existing_item, list) and len(sub_existing_item) == 0)
+    for _ in iter_deep_diff(item, existing_item):
         return False
+    return True
 
-    return compare(item, existing_item)
+
+def format_diff_path(path):
+    """
+    Format the path of a difference, e.g. customerNetworks[0].address
+    :param tuple path: the keys/indexes from the root of the item
+    :rtype: str
+    """
+    formatted_path = ''
+    for k in path:
+        if isinstance(k, int):
+            formatted_path += '[%d]' % k
+        else:
+            formatted_path += '.%s' % k if len(formatted_path) > 0 else k
+    return formatted_path
+
+
+def get_diff_output(differences):
+    """
+    Get an Ansible --diff output of the differences, with the before and after
+    value of each changed path
+    :param list[(tuple, *, *)] differences: the differences from deep_diff
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        before=dict((format_diff_path(path), existing_value) for path, value, existing_value in differences),
+        after=dict((format_diff_path(path), value) for path, value, existing_value in differences)
+    )
+
+
+def get_item_operation(state, existing_item, differences):
+    """
+    Get the operation that brings an existing item to the requested state
+    :param str state: the requested state, 'present' or 'absent'
+    :param dict|None existing_item: the existing item
+    :param list[(tuple, *, *)]|None differences: the differences from deep_diff
+    :returns: one of PLAN_CREATE, PLAN_UPDATE, PLAN_DELETE or PLAN_NONE
+    :rtype: str
+    """
+    if state == 'present' and existing_item is None:
+        return PLAN_CREATE
+    elif state == 'present' and len(differences) > 0:
+        return PLAN_UPDATE
+    elif state == 'absent' and existing_item is not None:
+        return PLAN_DELETE
+    return PLAN_NONE
+
+
+def get_plan(operation, existing_item, differences):
+    """
+    Get the plan of an item operation, as returned in check mode, with the
+    resolved existing item's id and href and the changed fields
+    :param str operation: one of PLAN_CREATE, PLAN_UPDATE, PLAN_DELETE or PLAN_NONE
+    :param dict|None existing_item: the existing item
+    :param list[(tuple, *, *)]|None differences: the differences from deep_diff
+    :rtype: dict
+    """
+    return dict(
+        operation=operation,
+        id=existing_item.get('id') if existing_item is not None else None,
+        href=existing_item.get('href') if existing_item is not None else None,
+        changes=[dict(path=format_diff_path(path), before=existing_value, after=value)
+                 for path, value, existing_value in differences or []]
+    )
+
+
+def get_merge_patch(item, differences):
+    """
+    Build a JSON merge patch (RFC 7396) of the differences of an item, which
+    only contains the changed fields.  Nested objects are patched per key, but
+    a changed list is replaced as a whole, as merge patches can not patch an
+    index of a list.
+    :param dict item: the item
+    :param list[(tuple, *, *)] differences: the differences from deep_diff
+    :rtype: dict
+    """
+    patch = dict()
+    for path, value, existing_value in differences:
+        if len(path) == 0:
+            return dict(item)
+        sub_patch = patch
+        sub_item = item
+        for i, k in enumerate(path):
+            sub_value = sub_item[k]
+            if i == len(path) - 1 or not isinstance(sub_value, dict):
+                sub_patch[k] = sub_value
+                break
+            sub_patch = sub_patch.setdefault(k, dict())
+            if not isinstance(sub_patch, dict) or sub_patch is sub_value:
+                # An earlier difference already replaced this whole value
+                break
+            sub_item = sub_value
+    return patch
+
+
+def __is_patch_supported(module, href_base):
+    """
+    Check if the server has not rejected a PATCH of this kind of item recently
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str href_base: the base path of the item's href, e.g. /connections
+    :rtype: bool
+    """
+    key = '%s%s' % (get_api_base_url(module), href_base)
+    rejected_at = read_cache(API_CAPABILITIES_CACHE_NAME).get(key, dict()).get('patch_rejected_at')
+    return rejected_at is None or time() - rejected_at >= API_CAPABILITIES_CACHE_TTL
+
+
+def __set_patch_unsupported(module, href_base):
+    """
+    Remember that the server rejected a PATCH of this kind of item
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str href_base: the base path of the item's href, e.g. /connections
+    """
+    key = '%s%s' % (get_api_base_url(module), href_base)
+    with update_cache(API_CAPABILITIES_CACHE_NAME) as cache:
+        cache[key] = dict(patch_rejected_at=time())
+
+
+def patch_item(module, client, update_item_fn, item, patch):
+    """
+    Send only the changed fields of an existing item as a JSON merge patch.  If
+    the server does not support PATCH for this kind of item, this falls back to
+    a full update, and remembers so for a while.  If the server rejects the PATCH
+    with a status that may also be caused by the item, it is only remembered once
+    the full update succeeded.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param (T) -> T update_item_fn: A function that fully updates the item
+    :param T item: the complete item, with its 'href'
+    :param dict patch: the merge patch from get_merge_patch
+    :rtype: T
+    """
+    href = item.get('href')
+    href_base = href.rsplit('/', 1)[0] if href is not None else None
+    if href is None or not __is_patch_supported(module, href_base):
+        return update_item_fn(item)
+    try:
+        response = get_session(client).request('PATCH', href, json=patch,
+                                               headers={'Content-Type': 'application/merge-patch+json'})
+    except get_client_http_exception() as e:
+        status_code = e.response.status_code if e.response is not None else None
+        if status_code in PATCH_UNSUPPORTED_STATUS_CODES:
+            __set_patch_unsupported(module, href_base)
+            return update_item_fn(item)
+        if status_code not in PATCH_REJECTED_STATUS_CODES:
+            raise
+        updated_item = update_item_fn(item)
+        __set_patch_unsupported(module, href_base)
+        return updated_item
+    return response.json() if len(response.content) > 0 else item
 
 
 def item_crud(module,
@@ -74,7 +444,8 @@ def item_crud(module,
               create_item_fn,
               update_item_fn,
               delete_item_fn,
-              compare_item_fn=deep_compare,
+              diff_item_fn=deep_diff,
+              patch_item_fn=None,
               copy_existing_item_properties_fn=lambda item, existing_item: item):
     """
     Handle a basic item's Ansible CRUD operations with state
@@ -92,19 +463,36 @@ def item_crud(module,
         A function that updates the existing item
     :param (T) -> T delete_item_fn:
         A function that updates the existing item
-    :param (T, T) -> boolean compare_item_fn:
-        A function that compares the Ansible item with the retrieved item.  Should
-        return True if the items are the same.
+    :param (T, dict) -> T patch_item_fn:
+        An optional function that updates the existing item with only the changed
+        fields, given the item and a merge patch of them.  If set, it is used
+        instead of update_item_fn.
+    :param (T, T) -> list[(tuple, *, *)] diff_item_fn:
+        A function that lists the differences of the Ansible item with the retrieved
+        item.  Should return an empty list if the items are the same.
     :param (T, T) -> T copy_existing_item_properties_fn:
         A function that copies existing properties from the retrieved item to the
         new item if the retrieved item exists.
-    :rtype: (bool, T, T, T)
+    :returns: if anything changed, the changed item, the Ansible item, the existing item
+        and the Ansible --diff output if the module runs with --diff, otherwise None
+    :rtype: (bool, T, T, T, dict|None)
+
+    In check mode, this exits with the plan of the operation, see get_plan.  If
+    'plan_cache' is set, the plan is cached, and the next run of the same task
+    reuses its existing item if the server confirms with its ETag that it did
+    not change, rather than retrieving and resolving it again.
     """
     # Construct item object from the parameters
     item = construct_item_fn()
 
+    plan_key = get_plan_key(module, item) if module.params.get('plan_cache') else None
+    existing_item = None
+    if plan_key is not None and not module.check_mode:
+        existing_item = get_planned_existing_item(module, plan_key)
+
     # Retrieve the existing item if applicable
-    existing_item = retrieve_existing_item_fn(item)
+    if existing_item is None:
+        existing_item = retrieve_existing_item_fn(item)
     if existing_item is None and module.params.get('resolve_existing'):
         existing_item = resolve_existing_item_fn(item)
 
@@ -113,8 +501,9 @@ def item_crud(module,
     if existing_item is not None:
         changed_item = copy_existing_item_properties_fn(item, existing_item)
 
-    # Perform a simple comparison of the passed in item and existing item
-    items_differ = not compare_item_fn(changed_item, existing_item)
+    # List the differences of the passed in item and existing item in a single pass
+    differences = diff_item_fn(changed_item, existing_item) if existing_item is not None else None
+    items_differ = existing_item is None or len(differences) > 0
 
     state = module.params.get('state')
     create_item = state == 'present' and existing_item is None
@@ -122,11 +511,34 @@ def item_crud(module,
     delete_item = state == 'absent' and existing_item is not None
     changed = create_item or update_item or delete_item
 
+    diff = None
+    if module._diff:
+        if create_item:
+            diff = dict(before=dict(), after=changed_item)
+        elif update_item:
+            diff = get_diff_output(differences)
+        elif delete_item:
+            diff = dict(before=existing_item, after=dict())
+        else:
+            diff = dict(before=dict(), after=dict())
+
     if module.check_mode:
-        module.exit_json(changed=changed)
+        if create_item:
+            plan = get_plan(PLAN_CREATE, None, None)
+        elif update_item:
+            plan = get_plan(PLAN_UPDATE, existing_item, differences)
+        elif delete_item:
+            plan = get_plan(PLAN_DELETE, existing_item, None)
+        else:
+            plan = get_plan(PLAN_NONE, existing_item, None)
+        if plan_key is not None:
+            store_plan(module, plan_key, plan, existing_item)
+        module.exit_json(changed=changed, diff=diff, plan=plan)
 
     if create_item:
         changed_item = create_item_fn(changed_item)
+    elif update_item and patch_item_fn is not None:
+        changed_item = patch_item_fn(changed_item, get_merge_patch(changed_item, differences))
     elif update_item:
         changed_item = update_item_fn(changed_item)
     elif delete_item:
@@ -135,4 +547,4 @@ def item_crud(module,
     elif existing_item is not None:
         changed_item = existing_item
 
-    return changed, changed_item, item, existing_item
+    return changed, changed_item, item, existing_item, diff
@@ -0,0 +1,48 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import sys
+
+# Importing the pureport-client exceptions imports requests, so they are only looked up
+# once pureport-client has been imported, i.e. once a client has been created
+PUREPORT_EXCEPTIONS_MODULE = 'pureport.exception.api'
+
+
+class __NeverRaisedException(Exception):
+    """
+    Stands in for a pureport-client exception that can not have been raised yet
+    """
+    pass
+
+
+def __get_exception(name):
+    """
+    Get a pureport-client exception class without importing pureport-client.
+    This is meant to be called in an except clause, which is only evaluated once
+    an exception is raised.  If pureport-client has not been imported by then,
+    the exception can not be one of its own, so a class that is never raised is
+    returned instead.
+    :param str name: the exception class name
+    :rtype: type
+    """
+    module = sys.modules.get(PUREPORT_EXCEPTIONS_MODULE)
+    return getattr(module, name) if module is not None else __NeverRaisedException
+
+
+def get_client_http_exception():
+    """
+    Get the pureport-client ClientHttpException class, for use in an except clause
+    :rtype: type
+    """
+    return __get_exception('ClientHttpException')
+
+
+def get_not_found_exception():
+    """
+    Get the pureport-client NotFoundException class, for use in an except clause
+    :rtype: type
+    """
+    return __get_exception('NotFoundException')
@@ -0,0 +1,141 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from fnmatch import fnmatchcase
+
+from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict, _camel_to_snake
+from ansible.module_utils.six import string_types
+
+INFO_FILTERS = ['name', 'type', 'state', 'tags', 'location']
+__GLOB_CHARACTERS = frozenset('*?[')
+
+
+def get_info_argument_spec():
+    """
+    Return the basic filters and fields params of an info module
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        filters=dict(type='dict', default=dict()),
+        fields=dict(type='list', default=[], elements='str')
+    )
+
+
+def get_info_filters(module):
+    """
+    Get the validated filters of an info module
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: dict
+    """
+    filters = module.params.get('filters') or dict()
+    unsupported = sorted(set(filters.keys()) - set(INFO_FILTERS))
+    if len(unsupported) > 0:
+        module.fail_json(msg="Unsupported filters %s, expected any of %s" % (unsupported, INFO_FILTERS))
+    if not isinstance(filters.get('tags', dict()), dict):
+        module.fail_json(msg="The 'tags' filter must be a dict")
+    return dict((k, v) for k, v in filters.items() if v is not None)
+
+
+def get_exact_filter(filters, name):
+    """
+    Get a filter value that can be pushed to the API as is, which is a single
+    value without any glob characters
+    :param dict filters: the validated filters
+    :param str name: the filter name
+    :rtype: str|None
+    """
+    value = filters.get(name)
+    if isinstance(value, string_types) and not __GLOB_CHARACTERS.intersection(value):
+        return value
+    return None
+
+
+def __get_link_id(link):
+    """
+    Get the id of a link object, a string id or a string href
+    :param dict|str|None link: the link
+    :rtype: str|None
+    """
+    if isinstance(link, dict):
+        link = link.get('id') or link.get('href')
+    if isinstance(link, string_types):
+        return link.split('/')[-1]
+    return None
+
+
+def __match_patterns(value, patterns):
+    """
+    Match a value against one or a list of glob patterns
+    :param value: the value
+    :param str|list[str] patterns: the patterns
+    :rtype: bool
+    """
+    if value is None:
+        return False
+    if not isinstance(patterns, list):
+        patterns = [patterns]
+    return any(fnmatchcase('%s' % value, '%s' % pattern) for pattern in patterns)
+
+
+def __match_item(item, filters):
+    """
+    Check if a raw API item matches all of the filters
+    :param dict item: the API item
+    :param dict filters: the validated filters
+    :rtype: bool
+    """
+    for name in ('name', 'type', 'state'):
+        if name in filters and not __match_patterns(item.get(name), filters[name]):
+            return False
+    if 'tags' in filters:
+        tags = item.get('tags') or dict()
+        if any(tags.get(k) != v for k, v in filters['tags'].items()):
+            return False
+    if 'location' in filters:
+        locations = filters['location'] if isinstance(filters['location'], list) else [filters['location']]
+        if __get_link_id(item.get('location')) not in [__get_link_id(location) for location in locations]:
+            return False
+    return True
+
+
+def __project_item(item, fields, snake_keys):
+    """
+    Keep only the requested top level fields of a raw API item
+    :param dict item: the API item
+    :param set[str] fields: the requested snake case fields
+    :param dict[str, str] snake_keys: a memo of camel case to snake case keys
+    :rtype: dict
+    """
+    projected_item = dict()
+    for k, v in item.items():
+        if k not in snake_keys:
+            snake_keys[k] = _camel_to_snake(k)
+        if snake_keys[k] in fields:
+            projected_item[k] = v
+    return projected_item
+
+
+def format_info_items(module, items, format_item_fn=camel_dict_to_snake_dict):
+    """
+    Filter, project and format the raw API items of an info module.  The items are
+    filtered and projected before formatting, so only the returned fields of the
+    matched items are converted to snake case.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param collections.Iterable[dict] items: the API items, which may be lazily retrieved
+    :param (dict) -> dict format_item_fn: a function that formats a single item
+    :rtype: list[dict]
+    """
+    filters = get_info_filters(module)
+    fields = set(module.params.get('fields') or [])
+    snake_keys = dict()
+    formatted_items = []
+    for item in items:
+        if not __match_item(item, filters):
+            continue
+        if len(fields) > 0:
+            item = __project_item(item, fields, snake_keys)
+        formatted_items.append(format_item_fn(item))
+    return formatted_items
@@ -0,0 +1,45 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+def get_network_properties_argument_spec():
+    """
+    Return the params of a network's properties
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        id=dict(type='str'),
+        name=dict(type='str', required=True),
+        description=dict(type='str'),
+        tags=dict(type='dict')
+    )
+
+
+def construct_network(module):
+    """
+    Construct a Network from the Ansible module arguments
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: pureport.api.client.Network
+    """
+    return dict((k, module.params.get(k))
+                for k in ('id', 'name', 'description', 'tags'))
+
+
+def copy_existing_network_properties(network, existing_network):
+    """
+    Copy properties from the existing network to the new Ansible defined
+    Network.
+    :param pureport.api.client.Network network:
+    :param pureport.api.client.Network existing_network:
+    :rtype: pureport.api.client.Network
+    """
+    copied_network = dict()
+    copied_network.update(network)
+    copied_network.update(dict(
+        id=existing_network.get('id'),
+        href=existing_network.get('href')
+    ))
+    return copied_network
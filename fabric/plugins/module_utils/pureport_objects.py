@@ -0,0 +1,128 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from time import time
+
+from .pureport_cache import read_cache, update_cache
+from .pureport_client import get_client_cache_key, get_session
+from .pureport_exceptions import get_not_found_exception
+
+OBJECT_CACHE_NAME = 'objects'
+# The least recently stored objects are evicted beyond this many objects
+OBJECT_CACHE_MAX_ENTRIES = 1000
+# Objects with any of these fields, e.g. IPSec pre-shared keys or BGP passwords, are never written to disk.
+# Module results have the snake case fields of the API objects.
+SECRET_FIELDS = frozenset(['primaryKey', 'secondaryKey', 'primary_key', 'secondary_key', 'password'])
+
+
+def get_object_cache_argument_spec():
+    """
+    Return the basic object cache params
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        object_cache=dict(type='bool', default=True)
+    )
+
+
+def has_secret_fields(value):
+    """
+    Check if an object has a secret field at any depth
+    :param * value: the object, or any value within it
+    :rtype: bool
+    """
+    if isinstance(value, dict):
+        return any((k in SECRET_FIELDS and v is not None) or has_secret_fields(v) for k, v in value.items())
+    if isinstance(value, list):
+        return any(has_secret_fields(v) for v in value)
+    return False
+
+
+def __store_object(key, item, etag, last_modified):
+    """
+    Store an object with its validators, evicting the least recently stored
+    objects if the cache is full
+    :param str key: the object cache key
+    :param dict item: the object
+    :param str|None etag: the ETag of the response
+    :param str|None last_modified: the Last-Modified of the response
+    """
+    with update_cache(OBJECT_CACHE_NAME) as cache:
+        cache[key] = dict(item=item, etag=etag, last_modified=last_modified, stored_at=time())
+        if len(cache) > OBJECT_CACHE_MAX_ENTRIES:
+            evicted_keys = sorted(cache.keys(), key=lambda k: cache[k]['stored_at'])
+            for evicted_key in evicted_keys[:len(cache) - OBJECT_CACHE_MAX_ENTRIES]:
+                del cache[evicted_key]
+
+
+def __remove_object(key):
+    """
+    Remove an object from the cache
+    :param str key: the object cache key
+    """
+    with update_cache(OBJECT_CACHE_NAME) as cache:
+        cache.pop(key, None)
+
+
+def get_object(module, client, href):
+    """
+    Retrieve an object, e.g. /networks/abc, with a conditional request if it was
+    retrieved before.  Objects are kept in a local object cache with their ETag
+    or Last-Modified, and the cached object is returned if the server responds
+    with 304 Not Modified, so an unchanged object only costs the headers.
+    Objects the server sends no validators for, or that have secret fields, are
+    not cached, and the cache is only written when an entry changes.  If
+    'object_cache' is disabled, the object is always retrieved in full.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param str href: the object href
+    :rtype: dict
+    """
+    session = get_session(client)
+    if not module.params.get('object_cache'):
+        return session.get(href).json()
+
+    key = get_client_cache_key(module, href)
+    entry = read_cache(OBJECT_CACHE_NAME).get(key)
+    headers = dict()
+    if entry is not None and entry.get('etag') is not None:
+        headers['If-None-Match'] = entry['etag']
+    elif entry is not None and entry.get('last_modified') is not None:
+        headers['If-Modified-Since'] = entry['last_modified']
+    try:
+        response = session.get(href, headers=headers)
+    except get_not_found_exception():
+        if entry is not None:
+            __remove_object(key)
+        raise
+    if response.status_code == 304 and entry is not None:
+        return entry['item']
+    item = response.json()
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if (etag is None and last_modified is None) or has_secret_fields(item):
+        if entry is not None:
+            __remove_object(key)
+    elif entry is None or (entry['item'], entry.get('etag'), entry.get('last_modified')) != (item, etag, last_modified):
+        __store_object(key, item, etag, last_modified)
+    return item
+
+
+def get_cached_object_etag(module, href, item):
+    """
+    Get the ETag of an object in the object cache, if the cached object is the
+    same as the given one, e.g. because it was just retrieved with get_object
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str href: the object href
+    :param dict item: the object
+    :rtype: str|None
+    """
+    if not module.params.get('object_cache'):
+        return None
+    entry = read_cache(OBJECT_CACHE_NAME).get(get_client_cache_key(module, href))
+    if entry is None or entry['item'] != item:
+        return None
+    return entry.get('etag')
@@ -0,0 +1,166 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import codecs
+import json
+from functools import partial
+
+from .pureport_client import ensure_session_pool_size, get_session
+
+DEFAULT_CONCURRENCY = 8
+# The number of bytes read from the response at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+__WHITESPACE = ' \t\n\r'
+
+
+def iter_json_array(chunks):
+    """
+    Incrementally decode the items of a JSON array from chunks of text, so only
+    a single item and a chunk of text are held in memory at a time.
+    :param collections.Iterable[str] chunks: the chunks of text
+    :rtype: collections.Iterator[T]
+    :raises: ValueError if the text is not a JSON array
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    for chunk in chunks:
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in __WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('Expected a JSON array')
+                started = True
+                position += 1
+            elif buffer[position] == ']':
+                return
+            elif buffer[position] == ',':
+                position += 1
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except ValueError:
+                    # The item is incomplete, wait for the next chunk
+                    break
+                if not isinstance(item, (dict, list)) and \
+                        (end == len(buffer) or buffer[end] not in __WHITESPACE + ',]'):
+                    # A scalar that is not terminated yet, e.g. a number, may continue in the next chunk
+                    break
+                position = end
+                yield item
+        buffer = buffer[position:]
+    raise ValueError('Unexpected end of a JSON array')
+
+
+def __get_relative_url(session, url):
+    """
+    Get a url relative to the session's base url, as the session prepends it
+    :param pureport.util.api.PureportSession session: the Pureport session
+    :param str url: a relative or absolute url
+    :rtype: str
+    """
+    base_url = getattr(session, '_base_url', '')
+    if base_url and url.startswith(base_url):
+        return url[len(base_url):]
+    return url
+
+
+def iter_items(session, href, params=None):
+    """
+    Lazily retrieve the items of a list endpoint, decoding the response while it
+    is streamed.  If the server paginates the response with a 'next' Link header,
+    the following pages are retrieved once the previous page is exhausted.
+    :param pureport.util.api.PureportSession session: the Pureport session
+    :param str href: the list endpoint href, e.g. /accounts/abc/connections
+    :param dict params: any query params
+    :rtype: collections.Iterator[T]
+    """
+    while href is not None:
+        response = session.get(href, params=params, stream=True)
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')()
+            chunks = (decoder.decode(chunk) for chunk in response.iter_content(STREAM_CHUNK_SIZE))
+            for item in iter_json_array(chunks):
+                yield item
+            next_link = response.links.get('next')
+        finally:
+            response.close()
+        href = __get_relative_url(session, next_link['url']) if next_link is not None else None
+        # The next link already carries the query
+        params = None
+
+
+def list_items(module, client, href, params=None):
+    """
+    Lazily retrieve the items of a list endpoint for a module, one item at a time
+    while the response is streamed
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param str href: the list endpoint href, e.g. /accounts/abc/connections
+    :param dict params: any query params
+    :rtype: collections.Iterator[T]
+    """
+    return iter_items(get_session(client), href, params)
+
+
+def get_concurrency_argument_spec():
+    """
+    Return the basic concurrency param
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        concurrency=dict(type='int', default=DEFAULT_CONCURRENCY)
+    )
+
+
+def __retrieve_items(session, href_params):
+    """
+    Retrieve all items of a list endpoint
+    :param pureport.util.api.PureportSession session: the Pureport session
+    :param (str, dict) href_params: the list endpoint href and any query params
+    :rtype: list[T]
+    """
+    href, params = href_params
+    return list(iter_items(session, href, params))
+
+
+def list_items_concurrently(module, client, hrefs, params=None):
+    """
+    Retrieve the items of many list endpoints for a module, requesting up to
+    'concurrency' endpoints at the same time over the client's single session.
+    The items are yielded endpoint by endpoint in the order of the hrefs, as soon
+    as every preceding endpoint has been retrieved, so the result is the same
+    as listing the endpoints one after another.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param list[str] hrefs: the list endpoint hrefs
+    :param dict params: any query params, sent to every endpoint
+    :rtype: collections.Iterator[T]
+    """
+    workers = max(1, min(module.params.get('concurrency') or DEFAULT_CONCURRENCY, len(hrefs)))
+    if workers == 1:
+        for href in hrefs:
+            for item in list_items(module, client, href, params):
+                yield item
+        return
+
+    # multiprocessing is slow to import, so it is only imported to list many endpoints
+    from multiprocessing.pool import ThreadPool
+    session = get_session(client)
+    ensure_session_pool_size(session, workers)
+    pool = ThreadPool(workers)
+    try:
+        for items in pool.imap(partial(__retrieve_items, session), [(href, params) for href in hrefs]):
+            for item in items:
+                yield item
+    finally:
+        pool.close()
+        pool.join()
@@ -0,0 +1,89 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.module_utils.common.validation import \
+    check_type_bool, \
+    check_type_dict, \
+    check_type_int, \
+    check_type_list
+from copy import deepcopy
+
+__TYPE_CHECKERS = dict(
+    bool=check_type_bool,
+    dict=check_type_dict,
+    int=check_type_int,
+    list=check_type_list
+)
+
+
+class SubModule(object):
+    def __init__(self, module, params):
+        """
+        A stand-in for the AnsibleModule used to construct a single item of a
+        list option, e.g. a connection of the 'connections' option.  Params the
+        item does not have, such as the client params, are the module's.
+        :param AnsibleModule module: the Ansible module
+        :param dict params: the validated params of the item
+        """
+        self.params = dict(module.params)
+        self.params.update(params)
+        self.__module = module
+
+    def __getattr__(self, name):
+        return getattr(self.__module, name)
+
+
+def get_sub_params(module, label, spec, argument_spec, mutually_exclusive=None, required_one_of=None, extra_options=None):
+    """
+    Validate a single item of a list or dict option against an argument spec,
+    filling in defaults, the same way AnsibleModule validates its own params.
+    :param AnsibleModule module: the Ansible module
+    :param str label: the item's name in error messages, e.g. 'connections[0]'
+    :param dict spec: the user provided item
+    :param dict[str, dict] argument_spec: the item's params
+    :param list[list[str]] mutually_exclusive: the item's mutually exclusive params
+    :param list[list[str]] required_one_of: the item's required one of params
+    :param list[str] extra_options: any other options the item may have, which are copied as is
+    :rtype: dict
+    """
+    def fail(msg):
+        module.fail_json(msg='%s: %s' % (label, msg))
+
+    if not isinstance(spec, dict):
+        fail('must be a dict')
+    extra_options = extra_options or []
+    unsupported = set(spec.keys()) - set(argument_spec.keys()) - set(extra_options)
+    if unsupported:
+        fail('unsupported parameters %s' % sorted(unsupported))
+
+    params = dict()
+    for name, option in argument_spec.items():
+        value = spec.get(name)
+        if value is None:
+            if option.get('required', False):
+                fail("missing required parameter '%s'" % name)
+            value = deepcopy(option.get('default'))
+        else:
+            checker = __TYPE_CHECKERS.get(option.get('type'))
+            if checker is not None:
+                try:
+                    value = checker(value)
+                except (TypeError, ValueError) as e:
+                    fail("parameter '%s' is invalid: %s" % (name, e))
+            choices = option.get('choices')
+            if choices is not None and value not in choices:
+                fail("parameter '%s' must be one of %s" % (name, choices))
+        params[name] = value
+
+    for terms in mutually_exclusive or []:
+        if len([term for term in terms if spec.get(term) is not None]) > 1:
+            fail('parameters are mutually exclusive: %s' % ', '.join(terms))
+    for terms in required_one_of or []:
+        if not any(spec.get(term) is not None for term in terms):
+            fail('one of the following is required: %s' % ', '.join(terms))
+
+    params.update(dict((name, spec.get(name)) for name in extra_options))
+    return params
@@ -0,0 +1,125 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+from time import time
+
+from .pureport_cache import read_cache, update_cache
+from .pureport_client import get_client, get_client_cache_key, get_object_id, get_session
+from .pureport_exceptions import get_not_found_exception
+from .pureport_objects import SECRET_FIELDS, get_cached_object_etag, has_secret_fields
+
+PLAN_CACHE_NAME = 'plans'
+# A check mode plan is usually applied right after it was made
+DEFAULT_PLAN_CACHE_TTL = 3600
+
+
+def get_plan_argument_spec():
+    """
+    Return the basic plan cache params
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        plan_cache=dict(type='bool', default=True),
+        plan_cache_ttl=dict(type='int', default=DEFAULT_PLAN_CACHE_TTL)
+    )
+
+
+def get_plan_key(module, item):
+    """
+    Build the plan cache key of an item, which is the same for a check mode run
+    and the following run of the same task.  The item does not have the account
+    or network it is resolved under, so these are part of the key as well, e.g.
+    for same named networks in different accounts.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param dict item: the Ansible item
+    :rtype: str
+    """
+    return get_client_cache_key(
+        module,
+        module._name,
+        get_object_id(module, 'account_id', 'account_href'),
+        get_object_id(module, 'network_id', 'network_href'),
+        json.dumps(item, sort_keys=True, default=str),
+        module.params.get('state'),
+        module.params.get('resolve_existing')
+    )
+
+
+def __has_secret_changes(plan):
+    """
+    Check if a plan changes a secret field, or a value with secret fields
+    :param dict plan: the plan
+    :rtype: bool
+    """
+    for change in plan.get('changes') or []:
+        if change['path'].split('.')[-1] in SECRET_FIELDS or \
+                has_secret_fields(change['before']) or has_secret_fields(change['after']):
+            return True
+    return False
+
+
+def store_plan(module, key, plan, existing_item):
+    """
+    Store a check mode plan with the existing item and its ETag, so the following
+    run of the same task can reuse the existing item if it did not change.  The
+    ETag is taken from the object cache, or retrieved if the item is not in it.
+    Nothing is stored if the plan has no existing item, the server does not
+    return an ETag to validate it with, or the plan or item have secret fields,
+    e.g. the pre-shared keys of an IPSec connection, as these are never written
+    to disk.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str key: the plan cache key
+    :param dict plan: the plan
+    :param dict|None existing_item: the existing item
+    """
+    if existing_item is None or existing_item.get('href') is None or \
+            has_secret_fields(existing_item) or __has_secret_changes(plan):
+        return
+    # An existing item that was just retrieved by id has its ETag in the object cache
+    etag = get_cached_object_etag(module, existing_item['href'], existing_item)
+    if etag is None:
+        response = get_session(get_client(module)).get(existing_item['href'])
+        existing_item = response.json()
+        etag = response.headers.get('ETag')
+    if etag is None or has_secret_fields(existing_item):
+        return
+    now = time()
+    ttl = module.params.get('plan_cache_ttl')
+    with update_cache(PLAN_CACHE_NAME) as cache:
+        for expired_key in [k for k, v in cache.items() if now - v['planned_at'] >= ttl]:
+            del cache[expired_key]
+        cache[key] = dict(plan=plan, existing_item=existing_item, etag=etag, planned_at=now)
+
+
+def get_planned_existing_item(module, key):
+    """
+    Get the existing item of a cached check mode plan, if the server confirms it
+    has not changed since.  This only costs a conditional GET of the item, which
+    replaces retrieving and resolving it.  A plan is only used once, so the
+    plan cache is only written if it has one for this key.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str key: the plan cache key
+    :returns: the existing item, or None if there is no valid plan
+    :rtype: dict|None
+    """
+    if key not in read_cache(PLAN_CACHE_NAME):
+        return None
+    with update_cache(PLAN_CACHE_NAME) as cache:
+        entry = cache.pop(key, None)
+    if entry is None or time() - entry['planned_at'] >= module.params.get('plan_cache_ttl'):
+        return None
+    try:
+        response = get_session(get_client(module)).get(
+            entry['plan']['href'],
+            headers={'If-None-Match': entry['etag']}
+        )
+    except get_not_found_exception():
+        return None
+    if response.status_code == 304:
+        return entry['existing_item']
+    # The item changed, so it may no longer be the one that would be resolved
+    return None
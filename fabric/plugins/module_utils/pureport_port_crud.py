@@ -0,0 +1,74 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.module_utils.common.dict_transformations import snake_dict_to_camel_dict
+
+from .pureport_client import get_object_link
+
+
+def get_port_properties_argument_spec():
+    """
+    Return the params of a port's properties
+    :rtype: dict[str, dict]
+    """
+    return dict(
+        id=dict(type='str'),
+        name=dict(type='str', required=True),
+        description=dict(type='str'),
+        facility_id=dict(type='str'),
+        facility_href=dict(type='str'),
+        provider=dict(type='str', required=True),
+        speed=dict(type='int', required=True, choices=[1000, 10000, 40000]),
+        media_type=dict(type='str', required=True),
+        availability_domain=dict(type='str', required=True, choices=['PRIMARY', 'SECONDARY']),
+        billing_term=dict(type='str', required=True, choices=['HOURLY', 'MONTHLY', 'ONE_YEAR', 'TWO_YEAR'])
+    )
+
+
+def get_port_required_one_of():
+    """
+    Return the port required one of array
+    :rtype: list[list[str]]
+    """
+    return [
+        ['facility_id', 'facility_href']
+    ]
+
+
+def construct_port(module):
+    """
+    Construct a Port from the Ansible module arguments
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: Port
+    """
+    port = dict()
+    port.update(dict((k, module.params.get(k))
+                     for k in ('id', 'name', 'description',
+                               'provider', 'speed', 'media_type',
+                               'availability_domain', 'billing_term')))
+    port.update(dict(
+        account=get_object_link(module, '/accounts', 'account_id', 'account_href'),
+        facility=get_object_link(module, '/facilities', 'facility_id', 'facility_href'),
+    ))
+    port = snake_dict_to_camel_dict(port)
+    return port
+
+
+def copy_existing_port_properties(port, existing_port):
+    """
+    Copy properties from the existing port to the new Ansible defined
+    Port.
+    :param Port port:
+    :param Port existing_port:
+    :rtype: Port
+    """
+    copied_port = dict()
+    copied_port.update(port)
+    copied_port.update(dict(
+        id=existing_port.get('id'),
+        href=existing_port.get('href')
+    ))
+    return copied_port
@@ -0,0 +1,305 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import os
+import socket
+import subprocess
+import sys
+from threading import Thread
+from time import sleep, time
+
+try:
+    from http.server import BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn, UnixStreamServer
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn, UnixStreamServer
+
+try:
+    from requests import Session
+    from requests.adapters import HTTPAdapter
+    from requests.exceptions import RequestException
+    from urllib3.connection import HTTPConnection
+    from urllib3.connectionpool import HTTPConnectionPool
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+    Session = None
+    HTTPAdapter = object
+    RequestException = None
+    HTTPConnection = object
+    HTTPConnectionPool = object
+
+from .pureport_cache import get_cache_dir, lock_cache
+
+ENVIRONMENT_PROXY_SOCKET = 'PUREPORT_ANSIBLE_PROXY_SOCKET'
+PROXY_SOCKET_NAME = 'proxy.sock'
+PROXY_LOCK_NAME = 'proxy'
+PROXY_HOST = 'pureport-proxy'
+PROXY_UPSTREAM_HEADER = 'X-Pureport-Proxy-Upstream'
+# Requests to this path without an upstream are answered by the proxy itself, with its request count
+PROXY_STATUS_PATH = '/__pureport_proxy/status'
+# Stop the proxy after this many seconds without a request
+PROXY_IDLE_TIMEOUT = 600
+# Wait at most this many seconds for a new proxy to accept connections
+PROXY_START_TIMEOUT = 5
+PROXY_POOL_MAXSIZE = 16
+# Run by a new interpreter to serve the proxy, with the module name, socket path and idle timeout as arguments
+PROXY_BOOTSTRAP = 'import sys; from importlib import import_module; import_module(sys.argv[1]).serve_proxy(sys.argv[2], int(sys.argv[3]))'
+
+
+def get_proxy_socket_path():
+    """
+    Get the path of the local proxy's Unix socket.
+    This may be overridden with the PUREPORT_ANSIBLE_PROXY_SOCKET environment variable.
+    :rtype: str
+    """
+    return os.environ.get(ENVIRONMENT_PROXY_SOCKET) or os.path.join(get_cache_dir(), PROXY_SOCKET_NAME)
+
+
+def is_proxy_running(socket_path):
+    """
+    Check if a proxy is accepting connections on a Unix socket
+    :param str socket_path: the Unix socket path
+    :rtype: bool
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return True
+    except socket.error:
+        return False
+    finally:
+        sock.close()
+
+
+class ProxyRequestHandler(BaseHTTPRequestHandler):
+    """
+    Forwards each request to the upstream from the X-Pureport-Proxy-Upstream
+    header using the server's shared, pooled keep-alive session.
+    """
+    protocol_version = 'HTTP/1.1'
+    # Headers that only apply to a single hop, or are recomputed by the proxy
+    __HOP_BY_HOP_HEADERS = frozenset([
+        'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+        'te', 'trailer', 'transfer-encoding', 'upgrade', 'host', 'content-length',
+        'content-encoding', PROXY_UPSTREAM_HEADER.lower()
+    ])
+
+    @staticmethod
+    def __copy_headers(headers):
+        """
+        Copy the end-to-end headers of a request or response
+        :param headers: the headers
+        :rtype: dict[str, str]
+        """
+        return dict((k, v) for k, v in headers.items()
+                    if k.lower() not in ProxyRequestHandler.__HOP_BY_HOP_HEADERS)
+
+    def log_message(self, format, *args):
+        pass
+
+    def __send(self, status_code, headers, content):
+        self.send_response(status_code)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def __forward(self):
+        self.server.last_request_time = time()
+        upstream = self.headers.get(PROXY_UPSTREAM_HEADER) or ''
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length > 0 else None
+        if not upstream and self.command == 'GET' and self.path == PROXY_STATUS_PATH:
+            self.__send(200, {'Content-Type': 'application/json'},
+                        json.dumps(dict(requests=self.server.request_count)).encode('utf-8'))
+            return
+        if not upstream.startswith(('http://', 'https://')):
+            self.__send(400, {'Content-Type': 'application/json'},
+                        json.dumps(dict(message='Missing or invalid %s header' % PROXY_UPSTREAM_HEADER)).encode('utf-8'))
+            return
+        self.server.request_count += 1
+        try:
+            response = self.server.session.request(
+                self.command,
+                upstream.rstrip('/') + self.path,
+                headers=self.__copy_headers(self.headers),
+                data=body,
+                allow_redirects=False
+            )
+        except RequestException as e:
+            self.__send(502, {'Content-Type': 'application/json'},
+                        json.dumps(dict(message='Pureport proxy error: %s' % e)).encode('utf-8'))
+            return
+        self.__send(response.status_code, self.__copy_headers(response.headers), response.content)
+
+    do_GET = __forward
+    do_POST = __forward
+    do_PUT = __forward
+    do_PATCH = __forward
+    do_DELETE = __forward
+
+
+class ProxyServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        """
+        A threaded HTTP server on a Unix socket, holding a single pooled
+        keep-alive session, so TCP and TLS connections to the upstream are
+        reused between module invocations.
+        :param str socket_path: the Unix socket path
+        """
+        UnixStreamServer.__init__(self, socket_path, ProxyRequestHandler)
+        self.session = Session()
+        adapter = HTTPAdapter(pool_maxsize=PROXY_POOL_MAXSIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.last_request_time = time()
+        self.request_count = 0
+
+
+def serve_proxy(socket_path, idle_timeout=PROXY_IDLE_TIMEOUT):
+    """
+    Serve the proxy on a Unix socket until it has been idle for a while
+    :param str socket_path: the Unix socket path
+    :param int idle_timeout: the number of idle seconds before stopping
+    """
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = ProxyServer(socket_path)
+    os.chmod(socket_path, 0o600)
+
+    def stop_when_idle():
+        while time() - server.last_request_time < idle_timeout:
+            sleep(1)
+        server.shutdown()
+
+    watcher = Thread(target=stop_when_idle)
+    watcher.daemon = True
+    watcher.start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.session.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def __spawn_proxy(socket_path, idle_timeout):
+    """
+    Start the proxy in a new, detached interpreter, which outlives this module.
+    A new interpreter does not inherit the memory, file descriptors or stdio of
+    the module, or of the Ansible worker when run by the fabric action plugin,
+    so nothing waits on the proxy.
+    :param str socket_path: the Unix socket path
+    :param int idle_timeout: the number of idle seconds before stopping
+    """
+    # The directory this module's package is imported from, e.g. the AnsiballZ payload or the collections path
+    import_root = os.path.abspath(__file__)
+    for part in __name__.split('.'):
+        import_root = os.path.dirname(import_root)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([import_root] + [path for path in sys.path if path])
+    if sys.version_info >= (3, 2):
+        detach = dict(start_new_session=True)
+    else:
+        detach = dict(preexec_fn=os.setsid)
+    with open(os.devnull, 'r+b') as devnull:
+        subprocess.Popen(
+            [sys.executable, '-c', PROXY_BOOTSTRAP, __name__, socket_path, '%d' % idle_timeout],
+            stdin=devnull,
+            stdout=devnull,
+            stderr=devnull,
+            cwd='/',
+            env=env,
+            close_fds=True,
+            **detach
+        )
+
+
+def start_proxy(socket_path, idle_timeout=PROXY_IDLE_TIMEOUT):
+    """
+    Start the proxy if it is not already running.  This is serialized
+    between concurrent forks, so only a single proxy is started.
+    :param str socket_path: the Unix socket path
+    :param int idle_timeout: the number of idle seconds before stopping
+    :returns: if the proxy is accepting connections
+    :rtype: bool
+    """
+    if not HAS_REQUESTS or not hasattr(socket, 'AF_UNIX') or not sys.executable:
+        return False
+    if is_proxy_running(socket_path):
+        return True
+    with lock_cache(PROXY_LOCK_NAME):
+        if is_proxy_running(socket_path):
+            return True
+        __spawn_proxy(socket_path, idle_timeout)
+        deadline = time() + PROXY_START_TIMEOUT
+        while time() < deadline:
+            if is_proxy_running(socket_path):
+                return True
+            sleep(0.05)
+    return False
+
+
+class UnixSocketConnection(HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        """
+        An HTTP connection over a Unix socket
+        :param str socket_path: the Unix socket path
+        """
+        self.socket_path = kwargs.pop('socket_path')
+        super(UnixSocketConnection, self).__init__(*args, **kwargs)
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class UnixSocketConnectionPool(HTTPConnectionPool):
+    ConnectionCls = UnixSocketConnection
+
+
+class UnixSocketAdapter(HTTPAdapter):
+    def __init__(self, socket_path, **kwargs):
+        """
+        A requests adapter that sends every request over a Unix socket
+        :param str socket_path: the Unix socket path
+        """
+        super(UnixSocketAdapter, self).__init__(**kwargs)
+        self.__pool = UnixSocketConnectionPool(PROXY_HOST, socket_path=socket_path)
+
+    def get_connection(self, url, proxies=None):
+        return self.__pool
+
+    def get_connection_with_tls_context(self, request, verify, proxies=None, cert=None):
+        return self.__pool
+
+    def close(self):
+        super(UnixSocketAdapter, self).close()
+        self.__pool.close()
+
+
+def use_proxy(session, socket_path):
+    """
+    Route a Pureport session through the local proxy
+    :param pureport.util.api.PureportSession session: the Pureport session
+    :param str socket_path: the Unix socket path
+    """
+    proxy_url = 'http://%s' % PROXY_HOST
+    session.mount(proxy_url + '/', UnixSocketAdapter(socket_path))
+    session.headers[PROXY_UPSTREAM_HEADER] = session._base_url
+    session._base_url = proxy_url
+    # Environment proxies would otherwise be applied to the local proxy url
+    session.trust_env = False
@@ -0,0 +1,108 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+from time import time
+
+from .pureport_cache import update_cache
+from .pureport_client import get_client_cache_key
+from .pureport_exceptions import get_not_found_exception
+
+RESOLVE_CACHE_NAME = 'resolve_indexes'
+
+
+def build_index(items, keys):
+    """
+    Index a list of items by the values of some of their keys in a single pass.
+    Any key with more than one item is a duplicate.
+    :param list[dict] items: the items
+    :param list[str] keys: the keys to index on
+    :rtype: dict[tuple, list[dict]]
+    """
+    index = dict()
+    for item in items:
+        index.setdefault(tuple(item.get(k) for k in keys), []).append(item)
+    return index
+
+
+def __get_index_key(item, keys):
+    """
+    Get the serialized index key of an item, for storage in the cache
+    :param dict item: the item
+    :param list[str] keys: the keys to index on
+    :rtype: str
+    """
+    return json.dumps([item.get(k) for k in keys])
+
+
+def __get_cached_item(get_item_fn, item_id, item, keys):
+    """
+    Retrieve a previously resolved item by its id, verifying it still matches
+    :param (str) -> T get_item_fn: a function that retrieves an item by id
+    :param str item_id: the cached item id
+    :param T item: the Ansible inferred item
+    :param list[str] keys: the keys to match on
+    :rtype: T|None
+    """
+    try:
+        cached_item = get_item_fn(item_id)
+    except get_not_found_exception():
+        return None
+    if all(cached_item.get(k) == item.get(k) for k in keys):
+        return cached_item
+    return None
+
+
+def resolve_existing_items(module, listing_href, list_items_fn, get_item_fn, item, keys):
+    """
+    Resolve the existing items that match the Ansible inferred item on some keys.
+
+    Instead of scanning the full listing on every task, the listing is indexed
+    once and the matching ids are cached locally for 'resolve_existing_cache_ttl'
+    seconds, so later tasks only need to retrieve the single matched item.
+    A cached match is always re-retrieved and verified and a cache miss always
+    re-lists, so stale entries can not cause a duplicate create.  The listing is
+    streamed and only the matched items are kept in memory.
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :param str listing_href: the href of the listing, e.g. /accounts/abc/networks
+    :param () -> collections.Iterable[T] list_items_fn: a function that lazily lists all items
+    :param (str) -> T get_item_fn: a function that retrieves an item by id
+    :param T item: the Ansible inferred item
+    :param list[str] keys: the keys to match on
+    :returns: the matched items, where more than one is ambiguous
+    :rtype: list[T]
+    """
+    ttl = module.params.get('resolve_existing_cache_ttl') or 0
+    cache_key = get_client_cache_key(module, listing_href, *keys)
+    index_key = __get_index_key(item, keys)
+    now = time()
+
+    if ttl > 0:
+        with update_cache(RESOLVE_CACHE_NAME) as cache:
+            for expired_key in [k for k, v in cache.items() if v['expires_at'] <= now]:
+                del cache[expired_key]
+            cached_ids = cache.get(cache_key, dict()).get('index', dict()).get(index_key, [])
+        if len(cached_ids) == 1:
+            cached_item = __get_cached_item(get_item_fn, cached_ids[0], item, keys)
+            if cached_item is not None:
+                return [cached_item]
+
+    # Stream the listing, only keeping the matched items and a compact index of ids
+    matched_items = []
+    index = dict()
+    for listed_item in list_items_fn():
+        listed_index_key = __get_index_key(listed_item, keys)
+        if listed_index_key == index_key:
+            matched_items.append(listed_item)
+            if ttl <= 0 and len(matched_items) > 1:
+                # Already ambiguous, there is no need to list the rest
+                break
+        if ttl > 0:
+            index.setdefault(listed_index_key, []).append(listed_item.get('id'))
+    if ttl > 0:
+        with update_cache(RESOLVE_CACHE_NAME) as cache:
+            cache[cache_key] = dict(expires_at=now + ttl, index=index)
+    return matched_items
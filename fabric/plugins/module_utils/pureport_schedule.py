@@ -0,0 +1,82 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import sys
+
+from ansible.module_utils.six import reraise
+from ansible.module_utils.six.moves.queue import Queue
+
+
+def __run_task(index, task_fn):
+    """
+    Run a task in a worker thread, returning any exception rather than raising
+    it, so it can be raised in the scheduling thread.  This includes a SystemExit,
+    e.g. from fail_json, as the scheduling thread would otherwise wait forever.
+    :param int index: the index of the task
+    :param () -> T task_fn: the task
+    :returns: the index of the task, if it succeeded and its result or exception info
+    :rtype: (int, bool, T|tuple)
+    """
+    try:
+        return index, True, task_fn()
+    except BaseException:
+        return index, False, sys.exc_info()
+
+
+def run_in_dependency_order(tasks, concurrency):
+    """
+    Run tasks as soon as the tasks they depend on have completed, running up to
+    'concurrency' independent tasks at the same time.  If a task fails, no
+    other tasks are started, the running tasks are completed, and the first
+    failure is raised.
+    :param list[(() -> T, collections.Iterable[int])] tasks:
+        A list of (task, indexes of the tasks it depends on) tuples
+    :param int concurrency: the maximum number of tasks run at the same time
+    :returns: the result of each task, in order
+    :rtype: list[T]
+    """
+    results = [None for task in tasks]
+    if len(tasks) == 0:
+        return results
+    remaining = dict((index, set(dependencies)) for index, (task_fn, dependencies) in enumerate(tasks))
+    dependents = dict()
+    for index, dependencies in remaining.items():
+        for dependency in dependencies:
+            dependents.setdefault(dependency, []).append(index)
+
+    # multiprocessing is slow to import, so it is only imported to run tasks
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(max(1, min(concurrency, len(tasks))))
+    completed = Queue()
+    running = [0]
+    failure = None
+
+    def start_ready():
+        for index in sorted(index for index, dependencies in remaining.items() if len(dependencies) == 0):
+            del remaining[index]
+            pool.apply_async(__run_task, (index, tasks[index][0]), callback=completed.put)
+            running[0] += 1
+
+    try:
+        start_ready()
+        while running[0] > 0:
+            index, succeeded, result = completed.get()
+            running[0] -= 1
+            if not succeeded:
+                failure = failure or result
+            elif failure is None:
+                results[index] = result
+                for dependent in dependents.get(index, []):
+                    remaining[dependent].discard(index)
+                start_ready()
+    finally:
+        pool.close()
+        pool.join()
+    if failure is not None:
+        reraise(*failure)
+    if len(remaining) > 0:
+        raise ValueError('Tasks %s have circular dependencies' % sorted(remaining.keys()))
+    return results
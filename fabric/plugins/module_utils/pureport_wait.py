@@ -0,0 +1,129 @@
+# Copyright (c), Pureport, 2020
+# Simplified BSD License (see licenses/simplified_bsd.txt or https://opensource.org/licenses/BSD-2-Clause)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from functools import partial
+from random import uniform
+from time import sleep, time
+
+from .pureport_exceptions import get_not_found_exception
+
+WAIT_INITIAL_DELAY = 2
+WAIT_MAX_DELAY = 60
+WAIT_BACKOFF_MULTIPLIER = 2
+WAIT_DEFAULT_TIMEOUT = 1800
+WAIT_DEFAULT_CONCURRENCY = 8
+
+WAIT_COMPLETED = 'completed'
+WAIT_FAILED = 'failed'
+WAIT_TIMEOUT = 'timeout'
+
+__FAILED_STATES = dict(
+    ACTIVE=['FAILED_TO_PROVISION', 'FAILED_TO_UPDATE', 'DELETED'],
+    DELETED=['FAILED_TO_DELETE']
+)
+
+
+def __poll_connection(client, connection_id):
+    """
+    Retrieve the current connection, where a missing connection has been deleted
+    :param pureport.api.client.Client client: the Pureport client
+    :param str connection_id: the connection id
+    :rtype: pureport.api.client.Connection|None
+    """
+    try:
+        return client.connections.get(connection_id)
+    except get_not_found_exception():
+        return None
+
+
+def __get_outcome(connection, expected_state):
+    """
+    Get the outcome of a polled connection, or None if it is still pending
+    :param pureport.api.client.Connection|None connection: the polled connection
+    :param str expected_state: the expected state, either ACTIVE or DELETED
+    :rtype: str|None
+    """
+    state = connection.get('state') if connection is not None else 'DELETED'
+    if state == expected_state:
+        return WAIT_COMPLETED
+    if state in __FAILED_STATES.get(expected_state, []):
+        return WAIT_FAILED
+    return None
+
+
+def __get_next_delay(delay):
+    """
+    Increase a poll delay exponentially up to a maximum, with a random jitter
+    so many pending connections do not poll the API in lockstep.
+    :param float delay: the previous delay
+    :returns: the next delay and the jittered time to wait
+    :rtype: (float, float)
+    """
+    next_delay = min(delay * WAIT_BACKOFF_MULTIPLIER, WAIT_MAX_DELAY)
+    return next_delay, uniform(next_delay / 2, next_delay)
+
+
+def wait_for_connections(client, targets, timeout=WAIT_DEFAULT_TIMEOUT, concurrency=WAIT_DEFAULT_CONCURRENCY):
+    """
+    Wait for many connections to reach their expected state at the same time.
+
+    Each connection is polled with its own exponential backoff and jitter, and
+    the connections that are due are retrieved concurrently over the client's
+    single HTTP session.  This returns when every connection has completed or
+    failed, or the timeout has passed.
+    :param pureport.api.client.Client client: the Pureport client
+    :param list[(str, str)] targets: a list of (connection id, expected state) tuples,
+        where the expected state is either ACTIVE or DELETED
+    :param int timeout: the number of seconds to wait for all connections
+    :param int concurrency: the maximum number of connections retrieved at once
+    :returns: a (connection id, outcome, last polled connection) result per target, in order,
+        where outcome is one of 'completed', 'failed' or 'timeout'
+    :rtype: list[(str, str, pureport.api.client.Connection|None)]
+    """
+    deadline = time() + timeout
+    expected_states = dict(targets)
+    outcomes = dict()
+    connections = dict()
+    # Connection id -> (next poll time, current delay)
+    pending = dict((connection_id, (time(), WAIT_INITIAL_DELAY / WAIT_BACKOFF_MULTIPLIER))
+                   for connection_id in expected_states)
+
+    workers = max(1, min(concurrency, len(pending)))
+    if workers > 1:
+        # multiprocessing is slow to import, so it is only imported to wait for many connections
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(workers)
+    else:
+        pool = None
+    map_fn = pool.map if pool is not None else lambda fn, items: [fn(item) for item in items]
+    try:
+        while pending:
+            now = time()
+            due = [connection_id for connection_id, (poll_at, delay) in pending.items() if poll_at <= now]
+            if not due:
+                sleep(max(0, min(poll_at for poll_at, delay in pending.values()) - now))
+                continue
+            polled = map_fn(partial(__poll_connection, client), due)
+            now = time()
+            for connection_id, connection in zip(due, polled):
+                connections[connection_id] = connection
+                outcome = __get_outcome(connection, expected_states[connection_id])
+                if outcome is not None:
+                    outcomes[connection_id] = outcome
+                    del pending[connection_id]
+                else:
+                    delay, wait = __get_next_delay(pending[connection_id][1])
+                    # Always poll a last time at the deadline
+                    pending[connection_id] = (min(now + wait, deadline), delay)
+            if now >= deadline:
+                break
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return [(connection_id, outcomes.get(connection_id, WAIT_TIMEOUT), connections.get(connection_id))
+            for connection_id, expected_state in targets]
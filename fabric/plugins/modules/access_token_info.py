@@ -38,6 +38,13 @@ options:
             - The pre-configured API Secret for a Pureport Account.
         required: true
         type: str
+    api_token_cache:
+        description:
+            - Reuse a still valid access token from the local token cache instead of logging in again.
+            - Tokens are refreshed a minute before they expire.
+        required: false
+        type: bool
+        default: true
 '''
 
 EXAMPLES = '''
@@ -58,38 +65,59 @@ access_token:
         - An access token that can be used with other Pureport facts.
     returned: success
     type: str
+token_cache:
+    description:
+        - The cumulative hit and miss counts of the local access token cache.
+    returned: success
+    type: complex
+    contains:
+        hits:
+            description:
+                - The number of logins avoided by reusing a cached access token.
+            returned: success
+            type: int
+            sample: 39
+        misses:
+            description:
+                - The number of logins performed because no valid cached access token existed.
+            returned: success
+            type: int
+            sample: 1
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 from traceback import format_exc
 
-try:
-    from pureport.api.client import Client
-    from pureport.exception.api import ClientHttpException
-    HAS_PUREPORT_CLIENT = True
-except ImportError:
-    HAS_PUREPORT_CLIENT = False
-    Client = None
-    ClientHttpException = None
+from ..module_utils.pureport_client import \
+    get_cached_access_token, \
+    get_token_cache_stats
+from ..module_utils.pureport_exceptions import get_client_http_exception
 
 
 def main():
     argument_spec = dict(
         api_base_url=dict(type='str'),
         api_key=dict(type='str', required=True),
-        api_secret=dict(type='str', required=True, no_log=True)
+        api_secret=dict(type='str', required=True, no_log=True),
+        api_token_cache=dict(type='bool', default=True)
     )
     mutually_exclusive = []
     module = AnsibleModule(
         argument_spec=argument_spec,
         mutually_exclusive=mutually_exclusive
     )
-    if not HAS_PUREPORT_CLIENT:
+    try:
+        from pureport.api.client import Client
+    except ImportError:
         module.fail_json(msg='pureport-client required for this module')
     client = Client(module.params.get('api_base_url'))
     try:
-        module.exit_json(access_token=client.login(module.params.get('api_key'), module.params.get('api_secret')))
-    except ClientHttpException as e:
+        if module.params.get('api_token_cache'):
+            access_token = get_cached_access_token(module, client)
+        else:
+            access_token = client.login(module.params.get('api_key'), module.params.get('api_secret'))
+        module.exit_json(access_token=access_token, token_cache=get_token_cache_stats())
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
@@ -24,6 +24,7 @@ requirements: [ pureport-client ]
 author: Matt Traynham (@mtraynham)
 extends_documentation_fragment:
     - pureport.fabric.client
+    - pureport.fabric.info
 '''
 
 EXAMPLES = '''
@@ -96,22 +97,25 @@ accounts:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
 from traceback import format_exc
 
-try:
-    from pureport.exception.api import ClientHttpException
-except ImportError:
-    ClientHttpException = None
 from ..module_utils.pureport_client import \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
     get_client
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_info import \
+    get_info_argument_spec, \
+    get_info_filters, \
+    get_exact_filter, \
+    format_info_items
+from ..module_utils.pureport_pagination import list_items
 
 
 def main():
     argument_spec = dict()
     argument_spec.update(get_client_argument_spec())
+    argument_spec.update(get_info_argument_spec())
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
     module = AnsibleModule(
@@ -121,9 +125,10 @@ def main():
     )
     try:
         client = get_client(module)
-        accounts = client.accounts.list()
-        module.exit_json(accounts=[camel_dict_to_snake_dict(account) for account in accounts])
-    except ClientHttpException as e:
+        # The API can only search by a single name, the remaining filters are applied locally
+        accounts = list_items(module, client, '/accounts', dict(name=get_exact_filter(get_info_filters(module), 'name')))
+        module.exit_json(accounts=format_info_items(module, accounts))
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
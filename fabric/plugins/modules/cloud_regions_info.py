@@ -24,6 +24,8 @@ requirements: [ pureport-client ]
 author: Matt Traynham (@mtraynham)
 extends_documentation_fragment:
     - pureport.fabric.client
+    - pureport.fabric.info
+    - pureport.fabric.catalog
 '''
 
 EXAMPLES = '''
@@ -78,22 +80,21 @@ cloud_regions:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
 from traceback import format_exc
 
-try:
-    from pureport.exception.api import ClientHttpException
-except ImportError:
-    ClientHttpException = None
 from ..module_utils.pureport_client import \
     get_client_argument_spec, \
-    get_client_mutually_exclusive, \
-    get_client
+    get_client_mutually_exclusive
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_info import get_info_argument_spec, format_info_items
+from ..module_utils.pureport_catalog import get_catalog_argument_spec, list_catalog_items
 
 
 def main():
     argument_spec = dict()
     argument_spec.update(get_client_argument_spec())
+    argument_spec.update(get_info_argument_spec())
+    argument_spec.update(get_catalog_argument_spec())
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
     module = AnsibleModule(
@@ -102,10 +103,9 @@ def main():
         supports_check_mode=True
     )
     try:
-        client = get_client(module)
-        cloud_regions = client.cloud_regions.list()
-        module.exit_json(cloud_regions=[camel_dict_to_snake_dict(cloud_region) for cloud_region in cloud_regions])
-    except ClientHttpException as e:
+        cloud_regions = list_catalog_items(module, '/cloudRegions')
+        module.exit_json(cloud_regions=format_info_items(module, cloud_regions))
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
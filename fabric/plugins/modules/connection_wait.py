@@ -0,0 +1,192 @@
+#!/usr/bin/python
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'Pureport'
+}
+
+DOCUMENTATION = '''
+---
+module: connection_wait
+short_description: Wait for many connections to become active or deleted
+description:
+    - "Wait for many connections to become active or deleted at the same time.  This allows connections
+      to be created, updated or deleted without 'wait_for_server' and waited on together afterwards."
+    - "Each connection is polled with an exponential backoff and jitter until it reaches the expected
+      state, fails or the timeout passes."
+version_added: "2.8.0"
+requirements: [ pureport-client ]
+author: Matt Traynham (@mtraynham)
+options:
+    connection_ids:
+        description:
+            - A list of Pureport Connection object id fields.
+            - One of 'connection_ids' or 'connection_hrefs' should be supplied for this command.
+        required: false
+        type: list
+        elements: str
+    connection_hrefs:
+        description:
+            - A list of Pureport Connection object href fields.
+            - This should be the full 'href' path to the Connection ReST object (e.g /connections/abc).
+            - One of 'connection_ids' or 'connection_hrefs' should be supplied for this command.
+        required: false
+        type: list
+        elements: str
+    state:
+        description:
+            - Wait until the connections are active (present) or deleted (absent).
+        required: false
+        type: str
+        choices: ['present', 'absent']
+        default: present
+    timeout:
+        description:
+            - The number of seconds to wait for all connections.
+        required: false
+        type: int
+        default: 1800
+    concurrency:
+        description:
+            - The maximum number of connections retrieved from the server at once.
+        required: false
+        type: int
+        default: 8
+extends_documentation_fragment:
+    - pureport.fabric.client
+'''
+
+EXAMPLES = '''
+- name: Create connections without waiting
+  aws_direct_connect_connection:
+    api_key: XXXXXXXXXXXXX
+    api_secret: XXXXXXXXXXXXXXXXX
+    network_href: /networks/network-XXXXXXXXXXXXXXXXXXXXXX
+    name: "My AWS Direct Connect Connection {{ item }}"
+    speed: 50
+    high_availability: true
+    location_href: /locations/XX-XXX
+    aws_account_id: XXXXXXXXXXXX
+    aws_region: XX-XXXX-#
+  loop: [1, 2, 3]
+  register: result
+
+- name: Wait for all of the connections to become active
+  connection_wait:
+    api_key: XXXXXXXXXXXXX
+    api_secret: XXXXXXXXXXXXXXXXX
+    connection_ids: "{{ result.results | map(attribute='id') | list }}"
+    timeout: 3600
+  register: result  # Registers result.connections
+'''
+
+RETURN = '''
+connections:
+    description:
+        - A result per provided connection, in the same order as provided.
+    returned: always
+    type: complex
+    contains:
+        id:
+            description:
+                - The connection id.
+            returned: always
+            type: str
+        outcome:
+            description:
+                - The outcome of waiting for this connection, one of 'completed', 'failed' or 'timeout'.
+            returned: always
+            type: str
+            sample: completed
+        connection:
+            description:
+                - The last retrieved connection.
+                - This is null if the connection was deleted.
+            returned: always
+            type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
+from traceback import format_exc
+
+from ..module_utils.pureport_client import \
+    get_client_argument_spec, \
+    get_client_mutually_exclusive, \
+    get_client
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_wait import \
+    WAIT_COMPLETED, \
+    WAIT_DEFAULT_CONCURRENCY, \
+    WAIT_DEFAULT_TIMEOUT, \
+    wait_for_connections
+
+
+def get_connection_ids(module):
+    """
+    Get the connection ids from the Ansible module params
+    :param AnsibleModule module: the Ansible module
+    :rtype: list[str]
+    """
+    connection_ids = list(module.params.get('connection_ids') or [])
+    connection_ids += [connection_href.split('/')[-1] for connection_href in module.params.get('connection_hrefs') or []]
+    return connection_ids
+
+
+def main():
+    argument_spec = dict()
+    argument_spec.update(get_client_argument_spec())
+    argument_spec.update(
+        dict(
+            connection_ids=dict(type='list', elements='str'),
+            connection_hrefs=dict(type='list', elements='str'),
+            state=dict(type='str', choices=['present', 'absent'], default='present'),
+            timeout=dict(type='int', default=WAIT_DEFAULT_TIMEOUT),
+            concurrency=dict(type='int', default=WAIT_DEFAULT_CONCURRENCY)
+        )
+    )
+    mutually_exclusive = []
+    mutually_exclusive += get_client_mutually_exclusive()
+    required_one_of = [
+        ['connection_ids', 'connection_hrefs']
+    ]
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        mutually_exclusive=mutually_exclusive,
+        required_one_of=required_one_of,
+        supports_check_mode=True
+    )
+    expected_state = 'ACTIVE' if module.params.get('state') == 'present' else 'DELETED'
+    try:
+        results = wait_for_connections(
+            get_client(module),
+            [(connection_id, expected_state) for connection_id in get_connection_ids(module)],
+            module.params.get('timeout'),
+            module.params.get('concurrency')
+        )
+        connections = [
+            dict(
+                id=connection_id,
+                outcome=outcome,
+                connection=camel_dict_to_snake_dict(connection) if connection is not None else None
+            )
+            for connection_id, outcome, connection in results
+        ]
+        incomplete = [connection for connection in connections if connection['outcome'] != WAIT_COMPLETED]
+        if len(incomplete) > 0:
+            module.fail_json(msg='Waiting failed for %d connection(s).' % len(incomplete), connections=connections)
+        module.exit_json(changed=False, connections=connections)
+    except get_client_http_exception() as e:
+        module.fail_json(msg=e.response.text, exception=format_exc())
+
+
+if __name__ == '__main__':
+    main()
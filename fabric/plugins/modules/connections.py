@@ -0,0 +1,198 @@
+#!/usr/bin/python
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'Pureport'
+}
+
+DOCUMENTATION = '''
+---
+module: connections
+short_description: Create, update or delete many connections of mixed types in a single task
+description:
+    - "Create, update or delete many connections of mixed types in a single task.  The existing
+      connections of each network are listed once and compared in memory before any changes are made."
+version_added: "2.8.0"
+requirements: [ pureport-client ]
+author: Matt Traynham (@mtraynham)
+options:
+    connections:
+        description:
+            - A list of connections to reconcile.
+            - Each connection must have a 'type', which is one of 'AWS_DIRECT_CONNECT', 'AZURE_EXPRESS_ROUTE',
+              'GOOGLE_CLOUD_INTERCONNECT', 'ORACLE_FAST_CONNECT', 'PORT' or 'SITE_IPSEC_VPN'.
+            - The remaining properties of a connection are the same options as the connection type's module, e.g.
+              'aws_direct_connect_connection' or 'site_ipsec_vpn_connection'.
+            - Each connection may also have a 'state' ('present' or 'absent', defaults to 'present') and
+              a 'network_id' or 'network_href' to override the network options of this module.
+        required: true
+        type: list
+        elements: dict
+extends_documentation_fragment:
+    - pureport.fabric.client
+    - pureport.fabric.network
+    - pureport.fabric.resolve_existing
+    - pureport.fabric.wait_for_server
+'''
+
+EXAMPLES = '''
+- name: Reconcile a set of connections for a network
+  connections:
+    api_key: XXXXXXXXXXXXX
+    api_secret: XXXXXXXXXXXXXXXXX
+    network_href: /networks/network-XXXXXXXXXXXXXXXXXXXXXX
+    connections:
+      - type: AWS_DIRECT_CONNECT
+        name: My AWS Direct Connect Connection
+        speed: 50
+        high_availability: true
+        location_href: /locations/XX-XXX
+        aws_account_id: XXXXXXXXXXXX
+        aws_region: XX-XXXX-#
+      - type: AZURE_EXPRESS_ROUTE
+        name: My Azure Express Route Connection
+        speed: 50
+        high_availability: true
+        location_href: /locations/XX-XXX
+        service_key: XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX
+      - type: SITE_IPSEC_VPN
+        name: My Old Site IPSec VPN Connection
+        state: absent
+        speed: 50
+        location_href: /locations/XX-XXX
+        primary_customer_router_ip: a.b.c.d
+  register: result  # Registers result.connections
+
+- name: Display the connection hrefs
+  debug:
+    var: item
+  loop: "{{ result.connections | json_query('[*].connection.href') }}"
+'''
+
+RETURN = '''
+connections:
+    description:
+        - A result per provided connection, in the same order as the 'connections' option.
+    returned: always
+    type: complex
+    contains:
+        changed:
+            description:
+                - If this connection was created, updated or deleted.
+                - If the server rejected a change, the connections after it are not changed.
+            returned: always
+            type: bool
+        failed:
+            description:
+                - If the server rejected the change of this connection.
+            returned: when the server rejected the change of this connection
+            type: bool
+        operation:
+            description:
+                - The operation performed for this connection, one of 'create', 'update' or 'delete'.
+                - This is null if the connection was unchanged.
+            returned: always
+            type: str
+            sample: create
+        connection:
+            description:
+                - The created, updated, deleted or unchanged connection.
+                - This is null if an absent connection did not exist.
+            returned: always
+            type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
+from traceback import format_exc
+
+from ..module_utils.pureport_client import \
+    get_client_argument_spec, \
+    get_client_mutually_exclusive, \
+    get_network_argument_spec, \
+    get_network_mutually_exclusive, \
+    get_network_id
+from ..module_utils.pureport_crud import get_resolve_existing_argument_spec
+from ..module_utils.pureport_connection_crud import \
+    ConnectionApplyError, \
+    get_wait_for_server_argument_spec, \
+    connections_crud
+from ..module_utils.pureport_connection_types import \
+    get_connection_types, \
+    get_connection_params
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_params import SubModule
+
+
+def get_connections_output(results):
+    """
+    Get the output of every connection
+    :param list[(bool, str|None, pureport.api.client.Connection)] results:
+        a (changed, operation, connection) result per connection
+    :rtype: list[dict]
+    """
+    return [
+        dict(
+            changed=connection_changed,
+            operation=operation,
+            connection=camel_dict_to_snake_dict(connection) if connection is not None else None
+        )
+        for connection_changed, operation, connection in results
+    ]
+
+
+def main():
+    argument_spec = dict()
+    argument_spec.update(get_client_argument_spec())
+    argument_spec.update(get_network_argument_spec())
+    argument_spec.update(get_resolve_existing_argument_spec())
+    argument_spec.update(get_wait_for_server_argument_spec())
+    argument_spec.update(
+        dict(
+            connections=dict(type='list', required=True, elements='dict')
+        )
+    )
+    mutually_exclusive = []
+    mutually_exclusive += get_client_mutually_exclusive()
+    mutually_exclusive += get_network_mutually_exclusive()
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        mutually_exclusive=mutually_exclusive,
+        supports_check_mode=True
+    )
+    connection_types = get_connection_types()
+    connections = []
+    for index, spec in enumerate(module.params.get('connections')):
+        params = get_connection_params(module, 'connections[%d]' % index, connection_types, spec,
+                                       extra_options=['network_id', 'network_href'])
+        connection_module = SubModule(module, params)
+        network_id = get_network_id(connection_module) or get_network_id(module)
+        if network_id is None:
+            module.fail_json(msg="connections[%d]: one of the following is required: "
+                                 "network_id, network_href" % index)
+        connection = connection_types[params['type']]['construct_fn'](connection_module)
+        connections.append((connection, network_id, params['state']))
+    try:
+        changed, results = connections_crud(module, connections)
+        module.exit_json(changed=changed, connections=get_connections_output(results))
+    except ConnectionApplyError as e:
+        connections_output = get_connections_output(e.results)
+        connections_output[e.index]['failed'] = True
+        module.fail_json(msg=e.response.text if e.response is not None else str(e),
+                         exception=format_exc(),
+                         changed=any(output['changed'] for output in connections_output),
+                         connections=connections_output)
+    except get_client_http_exception() as e:
+        module.fail_json(msg=e.response.text, exception=format_exc())
+
+
+if __name__ == '__main__':
+    main()
@@ -26,25 +26,52 @@ options:
     account_id:
         description:
             - The Pureport Account object's id field.
-            - Only one of 'account_id', 'account_href', 'network_id' or 'network_href' should be supplied for this command.
+            - Only one of 'account_id', 'account_href', 'network_id', 'network_href', or 'network_ids' and
+              'network_hrefs' should be supplied for this command.
     account_href:
         description:
             - The Pureport Account object's href field.
             - This should be the full 'href' path to the Account ReST object (e.g /accounts/abc).
-            - Only one of 'account_id', 'account_href', 'network_id' or 'network_href' should be supplied for this command.
+            - Only one of 'account_id', 'account_href', 'network_id', 'network_href', or 'network_ids' and
+              'network_hrefs' should be supplied for this command.
     network_id:
         description:
             - The Pureport Network object's id field.
-            - Only one of 'account_id', 'account_href', 'network_id' or 'network_href' should be supplied for this command.
+            - Only one of 'account_id', 'account_href', 'network_id', 'network_href', or 'network_ids' and
+              'network_hrefs' should be supplied for this command.
     network_href:
         description:
             - The Pureport Network object's href field.
             - This should be the full 'href' path to the Network ReST object (e.g /networks/abc).
-            - Only one of 'account_id', 'account_href', 'network_id' or 'network_href' should be supplied for this command.
+            - Only one of 'account_id', 'account_href', 'network_id', 'network_href', or 'network_ids' and
+              'network_hrefs' should be supplied for this command.
+    network_ids:
+        description:
+            - A list of Pureport Network object id fields.
+            - The connections of all of these networks are retrieved at the same time, and returned network by
+              network in the order of 'network_ids' and then 'network_hrefs'.
+        required: false
+        type: list
+        elements: str
+    network_hrefs:
+        description:
+            - A list of Pureport Network object href fields (e.g /networks/abc).
+            - The connections of all of these networks are retrieved at the same time, and returned network by
+              network in the order of 'network_ids' and then 'network_hrefs'.
+        required: false
+        type: list
+        elements: str
+    concurrency:
+        description:
+            - The maximum number of networks whose connections are retrieved from the server at once.
+        required: false
+        type: int
+        default: 8
 extends_documentation_fragment:
     - pureport.fabric.client
     - pureport.fabric.account
     - pureport.fabric.network
+    - pureport.fabric.info
 '''
 
 EXAMPLES = '''
@@ -62,6 +89,29 @@ EXAMPLES = '''
     network_href: /networks/network-XXXXXXXXXXXXXXXXXXXXXX
   register: result   # Registers result.connections
 
+- name: List connections for many networks at the same time
+  connections_info:
+    api_key: XXXXXXXXXXXXX
+    api_secret: XXXXXXXXXXXXXXXXX
+    network_hrefs:
+      - /networks/network-XXXXXXXXXXXXXXXXXXXXXX
+      - /networks/network-YYYYYYYYYYYYYYYYYYYYYY
+  register: result   # Registers result.connections
+
+- name: List the ids and names of the active AWS connections in a location for a network
+  connections_info:
+    api_key: XXXXXXXXXXXXX
+    api_secret: XXXXXXXXXXXXXXXXX
+    network_href: /networks/network-XXXXXXXXXXXXXXXXXXXXXX
+    filters:
+      type: AWS_DIRECT_CONNECT
+      state: ACTIVE
+      location: /locations/XX-XXX
+    fields:
+      - id
+      - name
+  register: result   # Registers result.connections
+
 - name: Display all connection hrefs using a json_query filter
   debug:
     var: item
@@ -76,14 +126,9 @@ connections:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
 from itertools import chain
 from traceback import format_exc
 
-try:
-    from pureport.exception.api import ClientHttpException
-except ImportError:
-    ClientHttpException = None
 from ..module_utils.pureport_client import \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
@@ -94,18 +139,47 @@ from ..module_utils.pureport_client import \
     get_network_argument_spec, \
     get_network_mutually_exclusive, \
     get_network_id
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_info import get_info_argument_spec, format_info_items
+from ..module_utils.pureport_pagination import \
+    get_concurrency_argument_spec, \
+    list_items, \
+    list_items_concurrently
+
+
+def get_network_ids(module):
+    """
+    Get the network ids from the passed in module's network_ids and network_hrefs,
+    in order and without duplicates
+    :param ansible.module_utils.basic.AnsibleModule module: the Ansible module
+    :rtype: list[str]
+    """
+    network_ids = list(module.params.get('network_ids') or [])
+    network_ids += [href.split('/')[-1] for href in module.params.get('network_hrefs') or []]
+    seen = set()
+    return [network_id for network_id in network_ids if not (network_id in seen or seen.add(network_id))]
 
 
 def main():
     argument_spec = dict()
     argument_spec.update(get_client_argument_spec())
+    argument_spec.update(get_info_argument_spec())
     argument_spec.update(get_account_argument_spec())
     argument_spec.update(get_network_argument_spec())
+    argument_spec.update(get_concurrency_argument_spec())
+    argument_spec.update(
+        dict(
+            network_ids=dict(type='list', elements='str'),
+            network_hrefs=dict(type='list', elements='str')
+        )
+    )
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
     required_one_of = []
     required_one_of += [
-        list(chain.from_iterable(get_account_mutually_exclusive() + get_network_mutually_exclusive()))
+        list(chain.from_iterable(
+            get_account_mutually_exclusive() + get_network_mutually_exclusive() + [['network_ids', 'network_hrefs']]
+        ))
     ]
     module = AnsibleModule(
         argument_spec=argument_spec,
@@ -116,15 +190,23 @@ def main():
         connections = None
         account_id = get_account_id(module)
         network_id = get_network_id(module)
+        network_ids = get_network_ids(module)
         client = get_client(module)
         # Retrieve connections from the account
         if account_id is not None:
-            connections = client.accounts.connections(account_id).list()
+            connections = list_items(module, client, '/accounts/%s/connections' % account_id)
         # Retrieve connections from the network
         elif network_id is not None:
-            connections = client.networks.connections(network_id).list()
-        module.exit_json(connections=[camel_dict_to_snake_dict(connection) for connection in connections])
-    except ClientHttpException as e:
+            connections = list_items(module, client, '/networks/%s/connections' % network_id)
+        # Retrieve connections from many networks at the same time
+        elif len(network_ids) > 0:
+            connections = list_items_concurrently(
+                module,
+                client,
+                ['/networks/%s/connections' % network_id for network_id in network_ids]
+            )
+        module.exit_json(connections=format_info_items(module, connections))
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
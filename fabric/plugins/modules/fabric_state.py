@@ -0,0 +1,619 @@
+#!/usr/bin/python
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'Pureport'
+}
+
+DOCUMENTATION = '''
+---
+module: fabric_state
+short_description: Converge a network with its ports and connections in a single task
+description:
+    - "Converge a whole topology, a network with its ports and connections, to a declarative desired state
+      in a single task.  The existing networks and ports of the account are listed at the same time, followed by
+      the existing connections of the network, and everything is compared in memory before any change is made."
+    - "Changes are made in dependency order, i.e. a new network and the ports a connection uses are created
+      before the connection, and connections are deleted before their network or ports.  Changes that do
+      not depend on each other are made at the same time."
+version_added: "2.8.0"
+requirements: [ pureport-client ]
+author: Matt Traynham (@mtraynham)
+options:
+    network:
+        description:
+            - The network, with the same options as the 'network' module, i.e. 'id', 'name', 'description',
+              'tags' and 'state'.
+            - If the network's 'state' is 'absent', all of the listed connections are deleted as well, regardless
+              of their own 'state'.
+        required: true
+        type: dict
+    ports:
+        description:
+            - A list of ports of the account, with the same options as the 'port' module, including 'state'.
+            - Port names must be unique, so connections can refer to them.
+        required: false
+        type: list
+        elements: dict
+        default: []
+    connections:
+        description:
+            - A list of connections of the network, with the same options as the 'connections' module's
+              'connections', except for 'network_id' and 'network_href'.
+            - A 'PORT' connection may refer to a port of the 'ports' option by name with 'primary_port_name'
+              and 'secondary_port_name', rather than by id or href, so a new port can be used right away.
+        required: false
+        type: list
+        elements: dict
+        default: []
+    concurrency:
+        description:
+            - The maximum number of requests or changes made at the same time.
+        required: false
+        type: int
+        default: 8
+extends_documentation_fragment:
+    - pureport.fabric.client
+    - pureport.fabric.account
+    - pureport.fabric.resolve_existing
+    - pureport.fabric.wait_for_server
+notes:
+    - Connections are always waited on until they are deleted before their network or ports are deleted.
+    - In check mode, the changed objects are returned as they would be sent, and a connection's reference to
+      a new port has no 'href' yet.
+    - If applying the plan fails, the results of every object are still returned, and only the objects that
+      were changed before the failure are 'changed'.
+'''
+
+EXAMPLES = '''
+- name: Converge a network with its port and connections
+  fabric_state:
+    api_key: XXXXXXXXXXXXX
+    api_secret: XXXXXXXXXXXXXXXXX
+    account_href: /accounts/ac-XXXXXXXXXXXXXXXXXXXXXX
+    wait_for_server: true
+    network:
+      name: My Network
+      description: My network description
+    ports:
+      - name: My Port
+        facility_href: /facilities/XX-XXX
+        provider: Equinix
+        speed: 1000
+        media_type: LX
+        availability_domain: PRIMARY
+        billing_term: HOURLY
+    connections:
+      - type: PORT
+        name: My Port Connection
+        speed: 50
+        location_href: /locations/XX-XXX
+        primary_port_name: My Port
+        primary_customer_vlan: 100
+      - type: AWS_DIRECT_CONNECT
+        name: My AWS Direct Connect Connection
+        speed: 50
+        location_href: /locations/XX-XXX
+        aws_account_id: XXXXXXXXXXXX
+        aws_region: XX-XXXX-#
+  register: result  # Registers result.network, result.ports and result.connections
+
+- name: Delete the network and its connections
+  fabric_state:
+    api_key: XXXXXXXXXXXXX
+    api_secret: XXXXXXXXXXXXXXXXX
+    account_href: /accounts/ac-XXXXXXXXXXXXXXXXXXXXXX
+    network:
+      name: My Network
+      state: absent
+    connections:
+      - type: AWS_DIRECT_CONNECT
+        name: My AWS Direct Connect Connection
+        speed: 50
+        location_href: /locations/XX-XXX
+        aws_account_id: XXXXXXXXXXXX
+        aws_region: XX-XXXX-#
+'''
+
+RETURN = '''
+network:
+    description:
+        - The network's result.
+    returned: always
+    type: complex
+    contains:
+        changed:
+            description:
+                - If the network was created, updated or deleted.
+                - If applying the plan failed, this is only true if the network was changed before the failure.
+            returned: always
+            type: bool
+        operation:
+            description:
+                - The operation for the network, one of 'create', 'update', 'delete' or 'none'.
+            returned: always
+            type: str
+            sample: create
+        network:
+            description:
+                - The created, updated, deleted or unchanged network.
+                - This is null if an absent network did not exist.
+            returned: always
+            type: dict
+ports:
+    description:
+        - A result per provided port, in the same order as the 'ports' option, with 'changed', 'operation'
+          and 'port' like the network's result.
+    returned: always
+    type: list
+    elements: dict
+connections:
+    description:
+        - A result per provided connection, in the same order as the 'connections' option, with 'changed',
+          'operation' and 'connection' like the network's result.
+    returned: always
+    type: list
+    elements: dict
+plan:
+    description:
+        - The changes, in the order they were planned, with the objects they depend on.
+    returned: always
+    type: list
+    elements: dict
+    sample: [{"name": "network", "operation": "create", "depends_on": []},
+             {"name": "ports[0]", "operation": "create", "depends_on": []},
+             {"name": "connections[0]", "operation": "create", "depends_on": ["network", "ports[0]"]}]
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
+from functools import partial
+from traceback import format_exc
+
+from ..module_utils.pureport_client import \
+    get_client_argument_spec, \
+    get_client_mutually_exclusive, \
+    get_client, \
+    get_session, \
+    ensure_session_pool_size, \
+    get_account_argument_spec, \
+    get_account_mutually_exclusive, \
+    get_account_id
+from ..module_utils.pureport_crud import \
+    PLAN_CREATE, \
+    PLAN_UPDATE, \
+    PLAN_DELETE, \
+    PLAN_NONE, \
+    get_state_argument_spec, \
+    get_resolve_existing_argument_spec, \
+    get_item_operation, \
+    get_merge_patch, \
+    deep_diff, \
+    patch_item
+from ..module_utils.pureport_connection_crud import \
+    get_wait_for_server_argument_spec, \
+    index_connections, \
+    plan_connections, \
+    apply_connection_plan
+from ..module_utils.pureport_connection_types import \
+    get_connection_types, \
+    get_connection_params
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_network_crud import \
+    get_network_properties_argument_spec, \
+    construct_network, \
+    copy_existing_network_properties
+from ..module_utils.pureport_pagination import \
+    DEFAULT_CONCURRENCY, \
+    get_concurrency_argument_spec, \
+    list_items
+from ..module_utils.pureport_params import \
+    SubModule, \
+    get_sub_params
+from ..module_utils.pureport_port_crud import \
+    get_port_properties_argument_spec, \
+    get_port_required_one_of, \
+    construct_port, \
+    copy_existing_port_properties
+from ..module_utils.pureport_resolve import build_index
+from ..module_utils.pureport_schedule import run_in_dependency_order
+from ..module_utils.pureport_wait import WAIT_COMPLETED, wait_for_connections
+
+# The connection links to ports that can refer to a port of the 'ports' option by name
+PORT_LINK_FIELDS = dict(
+    primary_port='primaryPort',
+    secondary_port='secondaryPort'
+)
+
+
+class ConnectionWaitError(Exception):
+    def __init__(self, connection_id, outcome, connection):
+        """
+        Raised when a connection did not reach its expected state
+        :param str connection_id: the connection id
+        :param str outcome: the wait outcome, 'failed' or 'timeout'
+        :param pureport.api.client.Connection|None connection: the last polled connection
+        """
+        super(ConnectionWaitError, self).__init__('Waiting for the server failed for connection %s.' % connection_id)
+        self.connection_id = connection_id
+        self.outcome = outcome
+        self.connection = connection
+
+
+class Step(object):
+    def __init__(self, name, operation, item, existing_item, differences=None):
+        """
+        A planned operation for a single object of the topology
+        :param str name: the object's name in the output, e.g. 'ports[0]'
+        :param str operation: one of 'create', 'update', 'delete' or 'none'
+        :param dict item: the Ansible item, with the existing item's properties
+        :param dict|None existing_item: the existing item
+        :param list|None differences: the differences from deep_diff
+        """
+        self.name = name
+        self.operation = operation
+        self.item = item
+        self.existing_item = existing_item
+        self.differences = differences
+        self.depends_on = []
+        self.linked_port_steps = dict()
+        self.result = item if operation in (PLAN_CREATE, PLAN_UPDATE) else existing_item
+        # If the operation was sent to the server, so the object may have changed even if a later wait failed
+        self.applied = False
+
+
+def find_existing_item(module, label, item, existing_items, claimed_ids):
+    """
+    Find the existing item of an Ansible item by its id, or by its name if it
+    was not found and 'resolve_existing' is set
+    :param AnsibleModule module: the Ansible module
+    :param str label: the item's name in error messages, e.g. 'ports[0]'
+    :param dict item: the Ansible item
+    :param (dict[str, dict], dict[tuple, list[dict]]) existing_items: the existing items by id and by name
+    :param set[str] claimed_ids: the ids of the existing items found so far
+    :rtype: dict|None
+    """
+    by_id, by_name = existing_items
+    existing_item = None
+    if item.get('id') is not None:
+        existing_item = by_id.get(item.get('id'))
+    # Like item_crud, an item whose id is not found is resolved by its name
+    if existing_item is None and module.params.get('resolve_existing'):
+        matched_items = by_name.get((item.get('name'),), [])
+        if len(matched_items) > 1:
+            module.fail_json(msg="%s: Resolved more than one existing item for '%s'.  Please provide an 'id' "
+                                 "or use a more distinct name." % (label, item.get('name')))
+        elif len(matched_items) == 1:
+            existing_item = matched_items[0]
+    if existing_item is not None:
+        if existing_item.get('id') in claimed_ids:
+            module.fail_json(msg="%s: More than one item resolved to the existing item '%s'."
+                                 % (label, existing_item.get('id')))
+        claimed_ids.add(existing_item.get('id'))
+    return existing_item
+
+
+def index_items(items):
+    """
+    Index existing items by id and by name
+    :param collections.Iterable[dict] items: the existing items
+    :rtype: (dict[str, dict], dict[tuple, list[dict]])
+    """
+    by_id = dict((item.get('id'), item) for item in items)
+    return by_id, build_index(by_id.values(), ['name'])
+
+
+def plan_item(module, name, params, construct_fn, copy_existing_item_properties_fn, existing_items, claimed_ids):
+    """
+    Plan the operation of a network or port
+    :param AnsibleModule module: the Ansible module
+    :param str name: the item's name in the output
+    :param dict params: the validated params of the item
+    :param (AnsibleModule) -> dict construct_fn: a function that constructs the item from params
+    :param (dict, dict) -> dict copy_existing_item_properties_fn:
+        a function that copies existing properties to the item
+    :param (dict[str, dict], dict[tuple, list[dict]]) existing_items: the existing items by id and by name
+    :param set[str] claimed_ids: the ids of the existing items found so far
+    :rtype: Step
+    """
+    item = construct_fn(SubModule(module, params))
+    existing_item = find_existing_item(module, name, item, existing_items, claimed_ids)
+    differences = None
+    if existing_item is not None:
+        item = copy_existing_item_properties_fn(item, existing_item)
+        differences = deep_diff(item, existing_item)
+    return Step(name, get_item_operation(params['state'], existing_item, differences), item, existing_item, differences)
+
+
+def plan_fabric(module, client):
+    """
+    Retrieve the existing network, ports and connections in a few listings, and
+    plan every operation with its dependencies
+    :param AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :returns: the network step, the port steps and the connection steps with their connection plans
+    :rtype: (Step, list[Step], list[(Step, tuple)])
+    """
+    account_id = get_account_id(module)
+    concurrency = module.params.get('concurrency') or DEFAULT_CONCURRENCY
+
+    # Validate everything before making any request
+    network_argument_spec = get_network_properties_argument_spec()
+    network_argument_spec.update(get_state_argument_spec())
+    network_params = get_sub_params(module, 'network', module.params.get('network'), network_argument_spec)
+    port_argument_spec = get_port_properties_argument_spec()
+    port_argument_spec.update(get_state_argument_spec())
+    ports_params = [get_sub_params(module, 'ports[%d]' % index, spec, port_argument_spec,
+                                   required_one_of=get_port_required_one_of())
+                    for index, spec in enumerate(module.params.get('ports'))]
+    port_indexes = dict()
+    for index, port_params in enumerate(ports_params):
+        if port_params['name'] in port_indexes:
+            module.fail_json(msg="ports[%d]: the port name '%s' is not unique" % (index, port_params['name']))
+        port_indexes[port_params['name']] = index
+
+    # List the existing networks and ports at the same time
+    ensure_session_pool_size(get_session(client), concurrency)
+    existing_networks, existing_ports = run_in_dependency_order([
+        (lambda: list(list_items(module, client, '/accounts/%s/networks' % account_id)), []),
+        (lambda: list(list_items(module, client, '/accounts/%s/ports' % account_id)), [])
+    ], concurrency)
+
+    network_step = plan_item(module, 'network', network_params, construct_network, copy_existing_network_properties,
+                             index_items(existing_networks), set())
+    port_steps = []
+    claimed_port_ids = set()
+    existing_ports = index_items(existing_ports)
+    for index, port_params in enumerate(ports_params):
+        port_steps.append(plan_item(module, 'ports[%d]' % index, port_params, construct_port,
+                                    copy_existing_port_properties, existing_ports, claimed_port_ids))
+
+    # List the existing connections of an existing network
+    existing_network = network_step.existing_item
+    network_id = existing_network.get('id') if existing_network is not None else None
+    existing_connections = []
+    if network_id is not None:
+        existing_connections = list_items(module, client, '/networks/%s/connections' % network_id)
+
+    connection_types = get_connection_types()
+    connections = []
+    connections_port_steps = []
+    for index, spec in enumerate(module.params.get('connections')):
+        label = 'connections[%d]' % index
+        if not isinstance(spec, dict):
+            module.fail_json(msg='%s: must be a dict' % label)
+        spec = dict(spec)
+        linked_port_steps = dict()
+        for field in PORT_LINK_FIELDS:
+            port_name = spec.pop('%s_name' % field, None)
+            if port_name is None:
+                continue
+            if spec.get('type') != 'PORT':
+                module.fail_json(msg="%s: '%s_name' is only supported by PORT connections" % (label, field))
+            if spec.get('%s_id' % field) is not None or spec.get('%s_href' % field) is not None:
+                module.fail_json(msg='%s: parameters are mutually exclusive: %s_name, %s_id, %s_href'
+                                     % (label, field, field, field))
+            if port_name not in port_indexes:
+                module.fail_json(msg="%s: '%s_name' does not match any of the ports" % (label, field))
+            linked_port_steps[field] = port_steps[port_indexes[port_name]]
+            # The link is set once the port is known, this only satisfies the validation
+            spec['%s_href' % field] = '/ports/%s' % port_name
+        params = get_connection_params(module, label, connection_types, spec)
+        state = 'absent' if network_params['state'] == 'absent' else params['state']
+        connection = connection_types[params['type']]['construct_fn'](SubModule(module, params))
+        for field, port_step in linked_port_steps.items():
+            if state == 'present' and port_step.operation == PLAN_DELETE:
+                module.fail_json(msg="%s: the port '%s' is absent" % (label, port_step.item.get('name')))
+            port = port_step.existing_item if port_step.operation != PLAN_CREATE else None
+            connection[PORT_LINK_FIELDS[field]] = dict(href=port.get('href') if port is not None else None)
+        connections.append((connection, network_id, state))
+        connections_port_steps.append(linked_port_steps)
+
+    connection_steps = []
+    plans = plan_connections(module, connections, {network_id: index_connections(existing_connections)})
+    for index, (plan, linked_port_steps) in enumerate(zip(plans, connections_port_steps)):
+        operation, plan_network_id, changed_connection, existing_connection, differences = plan
+        step = Step('connections[%d]' % index, operation or PLAN_NONE, changed_connection, existing_connection,
+                    differences)
+        step.linked_port_steps = linked_port_steps
+        if step.operation in (PLAN_CREATE, PLAN_UPDATE):
+            if network_step.operation == PLAN_CREATE:
+                step.depends_on.append(network_step)
+            step.depends_on.extend(port_step for field, port_step in sorted(linked_port_steps.items())
+                                   if port_step.operation != PLAN_NONE)
+        connection_steps.append((step, plan))
+
+    # Connections are deleted before their network and ports
+    changed_connection_steps = [step for step, plan in connection_steps if step.operation != PLAN_NONE]
+    for step in [network_step] + port_steps:
+        if step.operation == PLAN_DELETE:
+            step.depends_on.extend(changed_connection_steps)
+    return network_step, port_steps, connection_steps
+
+
+def apply_item(module, client, step, create_fn, update_fn, delete_fn):
+    """
+    Apply the operation of a network or port
+    :param AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param Step step: the step
+    :param (dict) -> dict create_fn: a function that creates the item
+    :param (dict) -> dict update_fn: a function that fully updates the item
+    :param (dict) -> None delete_fn: a function that deletes the item
+    :rtype: dict
+    """
+    if step.operation == PLAN_CREATE:
+        step.result = create_fn(step.item)
+    elif step.operation == PLAN_UPDATE:
+        step.result = patch_item(module, client, update_fn, step.item, get_merge_patch(step.item, step.differences))
+    elif step.operation == PLAN_DELETE:
+        delete_fn(step.existing_item)
+    step.applied = True
+    return step.result
+
+
+def apply_connection(module, client, network_step, step, plan, wait_for_delete):
+    """
+    Apply the operation of a connection, once the network and ports it uses
+    exist, waiting for it if 'wait_for_server' or 'wait_for_delete' is set
+    :param AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param Step network_step: the network step
+    :param Step step: the connection step
+    :param tuple plan: the connection plan from plan_connections
+    :param bool wait_for_delete: if a deleted connection should be waited on
+    :rtype: pureport.api.client.Connection
+    """
+    operation, network_id, changed_connection, existing_connection, differences = plan
+    for field, port_step in step.linked_port_steps.items():
+        if port_step.result is not None:
+            changed_connection[PORT_LINK_FIELDS[field]] = dict(href=port_step.result.get('href'))
+    if network_id is None and network_step.result is not None:
+        network_id = network_step.result.get('id')
+    result_connection, expected_state = apply_connection_plan(
+        module,
+        client,
+        (operation, network_id, changed_connection, existing_connection, differences)
+    )
+    step.result = result_connection
+    step.applied = True
+    wait = module.params.get('wait_for_server') or (expected_state == 'DELETED' and wait_for_delete)
+    if expected_state is None or not wait:
+        return step.result
+    [(connection_id, outcome, polled_connection)] = wait_for_connections(
+        client,
+        [(result_connection.get('id'), expected_state)],
+        module.params.get('wait_for_server_timeout')
+    )
+    if outcome != WAIT_COMPLETED:
+        raise ConnectionWaitError(connection_id, outcome, polled_connection)
+    step.result = polled_connection or result_connection
+    return step.result
+
+
+def apply_fabric(module, client, network_step, port_steps, connection_steps):
+    """
+    Apply every planned operation in dependency order, applying the operations
+    that do not depend on each other at the same time
+    :param AnsibleModule module: the Ansible module
+    :param pureport.api.client.Client client: the Pureport client
+    :param Step network_step: the network step
+    :param list[Step] port_steps: the port steps
+    :param list[(Step, tuple)] connection_steps: the connection steps with their connection plans
+    """
+    account_id = get_account_id(module)
+    wait_for_delete = network_step.operation == PLAN_DELETE or \
+        any(port_step.operation == PLAN_DELETE for port_step in port_steps)
+    tasks = [(network_step, partial(
+        apply_item, module, client, network_step,
+        lambda network: client.accounts.networks(account_id).create(network),
+        client.networks.update,
+        lambda network: client.networks.delete(network.get('id'))
+    ))]
+    tasks += [(port_step, partial(
+        apply_item, module, client, port_step,
+        lambda port: client.accounts.ports(account_id).create(port),
+        client.ports.update,
+        lambda port: client.ports.delete(port.get('id'))
+    )) for port_step in port_steps]
+    tasks += [(step, partial(apply_connection, module, client, network_step, step, plan, wait_for_delete))
+              for step, plan in connection_steps]
+    tasks = [(step, task_fn) for step, task_fn in tasks if step.operation != PLAN_NONE]
+    task_indexes = dict((id(step), index) for index, (step, task_fn) in enumerate(tasks))
+    run_in_dependency_order(
+        [(task_fn, [task_indexes[id(dependency)] for dependency in step.depends_on]) for step, task_fn in tasks],
+        module.params.get('concurrency') or DEFAULT_CONCURRENCY
+    )
+
+
+def get_step_output(step, key, failed=False):
+    """
+    Get the output of a step
+    :param Step step: the step
+    :param str key: the key of the object in the output, e.g. 'network'
+    :param bool failed: if applying the plan failed, so only the applied steps changed
+    :rtype: dict
+    """
+    output = dict(changed=step.operation != PLAN_NONE and (step.applied or not failed), operation=step.operation)
+    output[key] = camel_dict_to_snake_dict(step.result) if step.result is not None else None
+    return output
+
+
+def get_fabric_output(network_step, port_steps, connection_steps, failed=False):
+    """
+    Get the output of the module
+    :param Step network_step: the network step
+    :param list[Step] port_steps: the port steps
+    :param list[(Step, tuple)] connection_steps: the connection steps with their connection plans
+    :param bool failed: if applying the plan failed, so only the applied steps changed
+    :rtype: dict
+    """
+    steps = [network_step] + port_steps + [step for step, plan in connection_steps]
+    network_output = get_step_output(network_step, 'network', failed)
+    ports_output = [get_step_output(step, 'port', failed) for step in port_steps]
+    connections_output = [get_step_output(step, 'connection', failed) for step, plan in connection_steps]
+    return dict(
+        changed=any(output['changed'] for output in [network_output] + ports_output + connections_output),
+        network=network_output,
+        ports=ports_output,
+        connections=connections_output,
+        plan=[dict(name=step.name,
+                   operation=step.operation,
+                   depends_on=[dependency.name for dependency in step.depends_on])
+              for step in steps if step.operation != PLAN_NONE]
+    )
+
+
+def main():
+    argument_spec = dict()
+    argument_spec.update(get_client_argument_spec())
+    argument_spec.update(get_account_argument_spec())
+    argument_spec.update(get_resolve_existing_argument_spec())
+    argument_spec.update(get_wait_for_server_argument_spec())
+    argument_spec.update(get_concurrency_argument_spec())
+    argument_spec.update(
+        dict(
+            network=dict(type='dict', required=True),
+            ports=dict(type='list', default=[], elements='dict'),
+            connections=dict(type='list', default=[], elements='dict')
+        )
+    )
+    mutually_exclusive = []
+    mutually_exclusive += get_client_mutually_exclusive()
+    required_one_of = []
+    required_one_of += get_account_mutually_exclusive()
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        mutually_exclusive=mutually_exclusive,
+        required_one_of=required_one_of,
+        supports_check_mode=True
+    )
+    fabric_plan = None
+    try:
+        client = get_client(module)
+        fabric_plan = plan_fabric(module, client)
+        if not module.check_mode:
+            apply_fabric(module, client, *fabric_plan)
+        module.exit_json(**get_fabric_output(*fabric_plan))
+    except ConnectionWaitError as e:
+        output = get_fabric_output(*fabric_plan, failed=True)
+        module.fail_json(msg=str(e),
+                         connection=dict(id=e.connection_id,
+                                         outcome=e.outcome,
+                                         state=e.connection.get('state') if e.connection is not None else None),
+                         **output)
+    except get_client_http_exception() as e:
+        output = get_fabric_output(*fabric_plan, failed=True) if fabric_plan is not None else dict()
+        module.fail_json(msg=e.response.text, exception=format_exc(), **output)
+
+
+if __name__ == '__main__':
+    main()
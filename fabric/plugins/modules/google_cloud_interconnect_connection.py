@@ -38,6 +38,8 @@ extends_documentation_fragment:
     - pureport.fabric.network
     - pureport.fabric.state
     - pureport.fabric.resolve_existing
+    - pureport.fabric.plan
+    - pureport.fabric.object_cache
     - pureport.fabric.wait_for_server
     - pureport.fabric.connection_args
 '''
@@ -115,21 +117,22 @@ connection:
     description: the created, updated, or deleted connection
     type: dict
     returned: always
+plan:
+    description:
+        - In check mode, the planned operation, one of 'create', 'update', 'delete' or 'none', the id and href of
+          the existing object, and the path, current and requested value of each changed field.
+    returned: check mode
+    type: dict
+    sample: {"operation": "update", "id": "network-rfqj4qc9fO8hDOczEB7Z_Q", "href": "/networks/network-rfqj4qc9fO8hDOczEB7Z_Q",
+             "changes": [{"path": "description", "before": "My network", "after": "My updated network"}]}
 '''
 
 from functools import partial
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.common.dict_transformations import \
-    camel_dict_to_snake_dict, \
-    snake_dict_to_camel_dict
+from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
 from traceback import format_exc
-try:
-    from pureport.exception.api import ClientHttpException
-except ImportError:
-    ClientHttpException = None
 
 from ..module_utils.pureport_client import \
-    get_object_link, \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
     get_network_argument_spec, \
@@ -139,43 +142,14 @@ from ..module_utils.pureport_crud import \
     get_resolve_existing_argument_spec
 from ..module_utils.pureport_connection_crud import \
     get_wait_for_server_argument_spec, \
-    get_connection_argument_spec, \
     get_connection_required_one_of, \
-    get_cloud_connection_argument_spec, \
     connection_crud
-
-
-def construct_connection(module):
-    """
-    Construct a Connection from the Ansible module arguments
-    :param AnsibleModule module: the Ansible module
-    :rtype: pureport.api.client.Connection
-    """
-    connection = dict((k, module.params.get(k)) for k in (
-        'id',
-        'name',
-        'description',
-        'speed',
-        'high_availability',
-        'billing_term',
-        'customer_networks',
-        'primary_pairing_key',
-        'secondary_pairing_key'
-    ))
-    connection.update(dict(
-        type='GOOGLE_CLOUD_INTERCONNECT',
-        location=get_object_link(module, '/locations', 'location_id', 'location_href'),
-        nat=dict(
-            enabled=module.params.get('nat_enabled'),
-            mappings=[dict(native_cidr=nat_mapping)
-                      for nat_mapping in module.params.get('nat_mappings')]
-        )
-    ))
-    connection = snake_dict_to_camel_dict(connection)
-    connection.update(dict(
-        tags=module.params.get('tags')
-    ))
-    return connection
+from ..module_utils.pureport_connection_types import \
+    get_google_cloud_interconnect_connection_argument_spec, \
+    construct_google_cloud_interconnect_connection
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_objects import get_object_cache_argument_spec
+from ..module_utils.pureport_plan import get_plan_argument_spec
 
 
 def main():
@@ -184,15 +158,10 @@ def main():
     argument_spec.update(get_network_argument_spec())
     argument_spec.update(get_state_argument_spec())
     argument_spec.update(get_resolve_existing_argument_spec())
+    argument_spec.update(get_plan_argument_spec())
+    argument_spec.update(get_object_cache_argument_spec())
     argument_spec.update(get_wait_for_server_argument_spec())
-    argument_spec.update(get_connection_argument_spec())
-    argument_spec.update(get_cloud_connection_argument_spec())
-    argument_spec.update(
-        dict(
-            primary_pairing_key=dict(type='str', required=True),
-            secondary_pairing_key=dict(type='str')
-        )
-    )
+    argument_spec.update(get_google_cloud_interconnect_connection_argument_spec())
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
     required_one_of = []
@@ -201,7 +170,8 @@ def main():
     module = AnsibleModule(
         argument_spec=argument_spec,
         mutually_exclusive=mutually_exclusive,
-        required_one_of=required_one_of
+        required_one_of=required_one_of,
+        supports_check_mode=True
     )
     # Using partials to fill in the method params
     try:
@@ -209,16 +179,18 @@ def main():
             changed,
             changed_connection,
             argument_connection,
-            existing_connection
+            existing_connection,
+            diff
         ) = connection_crud(
             module,
-            partial(construct_connection, module)
+            partial(construct_google_cloud_interconnect_connection, module)
         )
         module.exit_json(
             changed=changed,
+            diff=diff,
             **camel_dict_to_snake_dict(changed_connection)
         )
-    except ClientHttpException as e:
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
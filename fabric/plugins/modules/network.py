@@ -49,6 +49,8 @@ extends_documentation_fragment:
     - pureport.fabric.account
     - pureport.fabric.state
     - pureport.fabric.resolve_existing
+    - pureport.fabric.plan
+    - pureport.fabric.object_cache
 '''
 
 EXAMPLES = '''
@@ -105,6 +107,14 @@ description:
     returned: success
     type: str
     sample: "My network description"
+plan:
+    description:
+        - In check mode, the planned operation, one of 'create', 'update', 'delete' or 'none', the id and href of
+          the existing object, and the path, current and requested value of each changed field.
+    returned: check mode
+    type: dict
+    sample: {"operation": "update", "id": "network-rfqj4qc9fO8hDOczEB7Z_Q", "href": "/networks/network-rfqj4qc9fO8hDOczEB7Z_Q",
+             "changes": [{"path": "description", "before": "My network", "after": "My updated network"}]}
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -112,11 +122,6 @@ from ansible.module_utils.common.dict_transformations import camel_dict_to_snake
 from functools import partial
 from traceback import format_exc
 
-try:
-    from pureport.exception.api import ClientHttpException, NotFoundException
-except ImportError:
-    ClientHttpException = None
-    NotFoundException = None
 from ..module_utils.pureport_client import \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
@@ -127,22 +132,23 @@ from ..module_utils.pureport_client import \
 from ..module_utils.pureport_crud import \
     get_state_argument_spec, \
     get_resolve_existing_argument_spec, \
-    item_crud
-
-
-def construct_network(module):
-    """
-    Construct a Network from the Ansible module arguments
-    :param AnsibleModule module: the Ansible module
-    :rtype: pureport.api.client.Network
-    """
-    return dict((k, module.params.get(k))
-                for k in ('id', 'name', 'description', 'tags'))
-
-
-def retrieve_network(client, network):
+    item_crud, \
+    patch_item
+from ..module_utils.pureport_exceptions import get_client_http_exception, get_not_found_exception
+from ..module_utils.pureport_network_crud import \
+    get_network_properties_argument_spec, \
+    construct_network, \
+    copy_existing_network_properties
+from ..module_utils.pureport_pagination import list_items
+from ..module_utils.pureport_objects import get_object_cache_argument_spec, get_object
+from ..module_utils.pureport_plan import get_plan_argument_spec
+from ..module_utils.pureport_resolve import resolve_existing_items
+
+
+def retrieve_network(module, client, network):
     """
     Retrieve the Network from the Ansible inferred Network
+    :param AnsibleModule module: the Ansible module
     :param pureport.api.client.Client client: the Pureport client
     :param pureport.api.client.Network network: the Ansible inferred Network
     :rtype: pureport.api.client.Network|None
@@ -150,8 +156,8 @@ def retrieve_network(client, network):
     network_id = network.get('id')
     if network_id is not None:
         try:
-            return client.networks.get(network_id)
-        except NotFoundException:
+            return get_object(module, client, '/networks/%s' % network_id)
+        except get_not_found_exception():
             return None
     return None
 
@@ -167,10 +173,14 @@ def resolve_network(module, client, network):
     """
     account_id = get_account_id(module)
     if account_id is not None:
-        existing_networks = client.accounts.networks(account_id).list()
-        matched_networks = [existing_network for existing_network in existing_networks
-                            if all([existing_network.get(k) == network.get(k)
-                                    for k in ['name']])]
+        matched_networks = resolve_existing_items(
+            module,
+            '/accounts/%s/networks' % account_id,
+            partial(list_items, module, client, '/accounts/%s/networks' % account_id),
+            lambda network_id: get_object(module, client, '/networks/%s' % network_id),
+            network,
+            ['name']
+        )
         if len(matched_networks) == 1:
             return matched_networks[0]
         elif len(matched_networks) > 1:
@@ -181,37 +191,15 @@ def resolve_network(module, client, network):
     return None
 
 
-def copy_existing_network_properties(network, existing_network):
-    """
-    Copy properties from the existing network to the new Ansible defined
-    Network.
-    :param pureport.api.client.Network network:
-    :param pureport.api.client.Network existing_network:
-    :rtype: pureport.api.client.Network
-    """
-    copied_network = dict()
-    copied_network.update(network)
-    copied_network.update(dict(
-        id=existing_network.get('id'),
-        href=existing_network.get('href')
-    ))
-    return copied_network
-
-
 def main():
     argument_spec = dict()
     argument_spec.update(get_client_argument_spec())
     argument_spec.update(get_account_argument_spec())
     argument_spec.update(get_state_argument_spec())
     argument_spec.update(get_resolve_existing_argument_spec())
-    argument_spec.update(
-        dict(
-            id=dict(type='str'),
-            name=dict(type='str', required=True),
-            description=dict(type='str'),
-            tags=dict(type='dict')
-        )
-    )
+    argument_spec.update(get_plan_argument_spec())
+    argument_spec.update(get_object_cache_argument_spec())
+    argument_spec.update(get_network_properties_argument_spec())
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
     required_one_of = []
@@ -229,22 +217,25 @@ def main():
             changed,
             changed_network,
             argument_network,
-            existing_network
+            existing_network,
+            diff
         ) = item_crud(
             module,
             partial(construct_network, module),
-            partial(retrieve_network, client),
+            partial(retrieve_network, module, client),
             partial(resolve_network, module, client),
             lambda network: client.accounts.networks(get_account_id(module)).create(network),
             client.networks.update,
             lambda network: client.networks.delete(network.get('id')),
+            patch_item_fn=partial(patch_item, module, client, client.networks.update),
             copy_existing_item_properties_fn=copy_existing_network_properties
         )
         module.exit_json(
             changed=changed,
+            diff=diff,
             **camel_dict_to_snake_dict(changed_network)
         )
-    except ClientHttpException as e:
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
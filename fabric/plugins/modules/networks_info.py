@@ -25,6 +25,7 @@ author: Matt Traynham (@mtraynham)
 extends_documentation_fragment:
     - pureport.fabric.client
     - pureport.fabric.account
+    - pureport.fabric.info
 '''
 
 EXAMPLES = '''
@@ -74,13 +75,8 @@ networks:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
 from traceback import format_exc
 
-try:
-    from pureport.exception.api import ClientHttpException
-except ImportError:
-    ClientHttpException = None
 from ..module_utils.pureport_client import \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
@@ -88,11 +84,15 @@ from ..module_utils.pureport_client import \
     get_account_argument_spec, \
     get_account_mutually_exclusive, \
     get_account_id
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_info import get_info_argument_spec, format_info_items
+from ..module_utils.pureport_pagination import list_items
 
 
 def main():
     argument_spec = dict()
     argument_spec.update(get_client_argument_spec())
+    argument_spec.update(get_info_argument_spec())
     argument_spec.update(get_account_argument_spec())
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
@@ -106,9 +106,9 @@ def main():
     )
     try:
         client = get_client(module)
-        networks = client.accounts.networks(get_account_id(module)).list()
-        module.exit_json(networks=[camel_dict_to_snake_dict(network) for network in networks])
-    except ClientHttpException as e:
+        networks = list_items(module, client, '/accounts/%s/networks' % get_account_id(module))
+        module.exit_json(networks=format_info_items(module, networks))
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
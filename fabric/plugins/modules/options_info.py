@@ -35,6 +35,7 @@ options:
         elements: str
 extends_documentation_fragment:
     - pureport.fabric.client
+    - pureport.fabric.catalog
 '''
 
 EXAMPLES = '''
@@ -106,14 +107,12 @@ options:
 from ansible.module_utils.basic import AnsibleModule
 from traceback import format_exc
 
-try:
-    from pureport.exception.api import ClientHttpException
-except ImportError:
-    ClientHttpException = None
 from ..module_utils.pureport_client import \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
     get_client
+from ..module_utils.pureport_catalog import get_catalog_argument_spec, get_catalog
+from ..module_utils.pureport_exceptions import get_client_http_exception
 
 
 def main():
@@ -141,6 +140,7 @@ def main():
             elements='str'
         )
     ))
+    argument_spec.update(get_catalog_argument_spec())
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
     module = AnsibleModule(
@@ -149,10 +149,17 @@ def main():
         supports_check_mode=True
     )
     try:
-        client = get_client(module)
-        options = client.options.list(module.params.get('types'))
+        types = module.params.get('types')
+        if module.params.get('catalog_cache'):
+            # Cache all of the options once, rather than each subset of types
+            options = get_catalog(module, '/options')
+            if len(types) > 0:
+                options = dict((k, v) for k, v in options.items() if k in types)
+        else:
+            client = get_client(module)
+            options = client.options.list(types)
         module.exit_json(options=options)
-    except ClientHttpException as e:
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
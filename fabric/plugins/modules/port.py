@@ -84,6 +84,8 @@ extends_documentation_fragment:
     - pureport.fabric.account
     - pureport.fabric.state
     - pureport.fabric.resolve_existing
+    - pureport.fabric.plan
+    - pureport.fabric.object_cache
 '''
 
 EXAMPLES = '''
@@ -238,56 +240,49 @@ state:
     returned: success
     type: str
     sample: ACTIVE
+plan:
+    description:
+        - In check mode, the planned operation, one of 'create', 'update', 'delete' or 'none', the id and href of
+          the existing object, and the path, current and requested value of each changed field.
+    returned: check mode
+    type: dict
+    sample: {"operation": "update", "id": "network-rfqj4qc9fO8hDOczEB7Z_Q", "href": "/networks/network-rfqj4qc9fO8hDOczEB7Z_Q",
+             "changes": [{"path": "description", "before": "My network", "after": "My updated network"}]}
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.common.dict_transformations import \
-    camel_dict_to_snake_dict, \
-    snake_dict_to_camel_dict
+from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
 from functools import partial
 from traceback import format_exc
 
-try:
-    from pureport.exception.api import ClientHttpException, NotFoundException
-except ImportError:
-    ClientHttpException = None
-    NotFoundException = None
 from ..module_utils.pureport_client import \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
     get_client, \
-    get_object_link, \
     get_account_argument_spec, \
     get_account_mutually_exclusive, \
     get_account_id
 from ..module_utils.pureport_crud import \
     get_state_argument_spec, \
     get_resolve_existing_argument_spec, \
-    item_crud
-
-
-def construct_port(module):
-    """
-    Construct a Port from the Ansible module arguments
-    :param AnsibleModule module: the Ansible module
-    :rtype: Port
-    """
-    port = dict()
-    port.update(dict((k, module.params.get(k))
-                     for k in ('id', 'name', 'description',
-                               'provider', 'speed', 'media_type',
-                               'availability_domain', 'billing_term')))
-    port.update(dict(
-        account=get_object_link(module, '/accounts', 'account_id', 'account_href'),
-        facility=get_object_link(module, '/facilities', 'facility_id', 'facility_href'),
-    ))
-    port = snake_dict_to_camel_dict(port)
-    return port
+    item_crud, \
+    patch_item
+from ..module_utils.pureport_exceptions import get_client_http_exception, get_not_found_exception
+from ..module_utils.pureport_pagination import list_items
+from ..module_utils.pureport_objects import get_object_cache_argument_spec, get_object
+from ..module_utils.pureport_plan import get_plan_argument_spec
+from ..module_utils.pureport_port_crud import \
+    get_port_properties_argument_spec, \
+    get_port_required_one_of, \
+    construct_port, \
+    copy_existing_port_properties
+from ..module_utils.pureport_resolve import resolve_existing_items
 
 
-def retrieve_port(client, port):
+def retrieve_port(module, client, port):
     """
     Retrieve the Port from the Ansible inferred Port
+    :param AnsibleModule module: the Ansible module
     :param pureport.api.client.Client client: the Pureport client
     :param Port port: the Ansible inferred Port
     :rtype: Port|None
@@ -295,8 +290,8 @@ def retrieve_port(client, port):
     port_id = port.get('id')
     if port_id is not None:
         try:
-            return client.ports.get(port_id)
-        except NotFoundException:
+            return get_object(module, client, '/ports/%s' % port_id)
+        except get_not_found_exception():
             return None
     return None
 
@@ -312,10 +307,14 @@ def resolve_port(module, client, port):
     """
     account_id = get_account_id(module)
     if account_id is not None:
-        existing_ports = client.accounts.ports(account_id).list()
-        matched_ports = [existing_port for existing_port in existing_ports
-                         if all([existing_port.get(k) == port.get(k)
-                                 for k in ['name']])]
+        matched_ports = resolve_existing_items(
+            module,
+            '/accounts/%s/ports' % account_id,
+            partial(list_items, module, client, '/accounts/%s/ports' % account_id),
+            lambda port_id: get_object(module, client, '/ports/%s' % port_id),
+            port,
+            ['name']
+        )
         if len(matched_ports) == 1:
             return matched_ports[0]
         elif len(matched_ports) > 1:
@@ -326,50 +325,20 @@ def resolve_port(module, client, port):
     return None
 
 
-def copy_existing_port_properties(port, existing_port):
-    """
-    Copy properties from the existing port to the new Ansible defined
-    Port.
-    :param Port port:
-    :param Port existing_port:
-    :rtype: Port
-    """
-    copied_port = dict()
-    copied_port.update(port)
-    copied_port.update(dict(
-        id=existing_port.get('id'),
-        href=existing_port.get('href')
-    ))
-    return copied_port
-
-
 def main():
     argument_spec = dict()
     argument_spec.update(get_client_argument_spec())
     argument_spec.update(get_account_argument_spec())
     argument_spec.update(get_state_argument_spec())
     argument_spec.update(get_resolve_existing_argument_spec())
-    argument_spec.update(
-        dict(
-            id=dict(type='str'),
-            name=dict(type='str', required=True),
-            description=dict(type='str'),
-            facility_id=dict(type='str'),
-            facility_href=dict(type='str'),
-            provider=dict(type='str', required=True),
-            speed=dict(type='int', required=True, choices=[1000, 10000, 40000]),
-            media_type=dict(type='str', required=True),
-            availability_domain=dict(type='str', required=True, choices=['PRIMARY', 'SECONDARY']),
-            billing_term=dict(type='str', required=True, choices=['HOURLY', 'MONTHLY', 'ONE_YEAR', 'TWO_YEAR'])
-        )
-    )
+    argument_spec.update(get_plan_argument_spec())
+    argument_spec.update(get_object_cache_argument_spec())
+    argument_spec.update(get_port_properties_argument_spec())
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
     required_one_of = []
     required_one_of += get_account_mutually_exclusive()
-    required_one_of += [
-        ['facility_id', 'facility_href']
-    ]
+    required_one_of += get_port_required_one_of()
     module = AnsibleModule(
         argument_spec=argument_spec,
         mutually_exclusive=mutually_exclusive,
@@ -383,22 +352,25 @@ def main():
             changed,
             changed_port,
             argument_port,
-            existing_port
+            existing_port,
+            diff
         ) = item_crud(
             module,
             partial(construct_port, module),
-            partial(retrieve_port, client),
+            partial(retrieve_port, module, client),
             partial(resolve_port, module, client),
             lambda port: client.accounts.ports(get_account_id(module)).create(port),
             client.ports.update,
             lambda port: client.ports.delete(port.get('id')),
+            patch_item_fn=partial(patch_item, module, client, client.ports.update),
             copy_existing_item_properties_fn=copy_existing_port_properties
         )
         module.exit_json(
             changed=changed,
+            diff=diff,
             **camel_dict_to_snake_dict(changed_port)
         )
-    except ClientHttpException as e:
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
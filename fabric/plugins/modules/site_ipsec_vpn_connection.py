@@ -192,6 +192,8 @@ extends_documentation_fragment:
     - pureport.fabric.network
     - pureport.fabric.state
     - pureport.fabric.resolve_existing
+    - pureport.fabric.plan
+    - pureport.fabric.object_cache
     - pureport.fabric.wait_for_server
     - pureport.fabric.connection_args
 '''
@@ -369,21 +371,22 @@ connection:
     description: the created, updated, or deleted connection
     type: dict
     returned: always
+plan:
+    description:
+        - In check mode, the planned operation, one of 'create', 'update', 'delete' or 'none', the id and href of
+          the existing object, and the path, current and requested value of each changed field.
+    returned: check mode
+    type: dict
+    sample: {"operation": "update", "id": "network-rfqj4qc9fO8hDOczEB7Z_Q", "href": "/networks/network-rfqj4qc9fO8hDOczEB7Z_Q",
+             "changes": [{"path": "description", "before": "My network", "after": "My updated network"}]}
 '''
 
 from functools import partial
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.common.dict_transformations import \
-    camel_dict_to_snake_dict, \
-    snake_dict_to_camel_dict
+from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
 from traceback import format_exc
-try:
-    from pureport.exception.api import ClientHttpException
-except ImportError:
-    ClientHttpException = None
 
 from ..module_utils.pureport_client import \
-    get_object_link, \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
     get_network_argument_spec, \
@@ -393,126 +396,14 @@ from ..module_utils.pureport_crud import \
     get_resolve_existing_argument_spec
 from ..module_utils.pureport_connection_crud import \
     get_wait_for_server_argument_spec, \
-    get_connection_argument_spec, \
     get_connection_required_one_of, \
     connection_crud
-
-__IKE_V1_IKE_ENCRYPTION_ALGORITHMS = [
-    'AES_128',
-    'AES_192',
-    'AES_256'
-]
-__IKE_V1_IKE_INTEGRITY_ALGORITHMS = [
-    'MD5_HMAC',
-    'SHA1_HMAC',
-    'SHA256_HMAC',
-    'SHA384_HMAC',
-    'SHA512_HMAC'
-]
-__NO_INTEGRITY_ALGORITHMS = [
-    'AES_128_GCM_64',
-    'AES_192_GCM_64',
-    'AES_256_GCM_64',
-    'AES_128_GCM_96',
-    'AES_192_GCM_96',
-    'AES_256_GCM_96',
-    'AES_128_GCM_128',
-    'AES_192_GCM_128',
-    'AES_256_GCM_128',
-    'AES_128_GMAC',
-    'AES_192_GMAC',
-    'AES_256_GMAC'
-]
-
-
-def construct_connection(module):
-    """
-    Construct a Connection from the Ansible module arguments
-    :param AnsibleModule module: the Ansible module
-    :rtype: pureport.api.client.Connection
-    """
-    connection = dict((k, module.params.get(k)) for k in (
-        'id',
-        'name',
-        'description',
-        'speed',
-        'high_availability',
-        'billing_term',
-        'customer_asn',
-        'customer_networks',
-        'primary_customer_router_ip',
-        'secondary_customer_router_ip',
-        'routing_type',
-        'physical_address',
-        'ike_version',
-        'primary_key',
-        'secondary_key',
-        'traffic_selectors',
-        'enable_bgp_password'
-    ))
-    is_ike_v1 = connection.get('ike_version') == 'V1'
-    connection.update([
-        (
-            'ikeV1' if is_ike_v1 else 'ikeV2',
-            dict(
-                ike=dict((k[4:], module.params.get(k)) for k in (
-                    'ike_encryption',
-                    'ike_integrity',
-                    'ike_prf' if not is_ike_v1 else None,
-                    'ike_dh_group',
-                ) if k is not None),
-                esp=dict((k[4:], module.params.get(k)) for k in (
-                    'esp_encryption',
-                    'esp_integrity',
-                    'esp_dh_group'
-                ))
-            )
-        )
-    ])
-
-    if 'ikeV1' in connection:
-        if connection['ikeV1']['ike']['encryption'] not in __IKE_V1_IKE_ENCRYPTION_ALGORITHMS:
-            module.fail_json(msg='For IKE V1, \'ike_encryption\' must '
-                                 'be one of %s' % __IKE_V1_IKE_ENCRYPTION_ALGORITHMS)
-        if connection['ikeV1']['ike']['integrity'] is None:
-            connection['ikeV1']['ike']['integrity'] = 'SHA256_HMAC'
-        elif connection['ikeV1']['ike']['integrity'] not in __IKE_V1_IKE_INTEGRITY_ALGORITHMS:
-            module.fail_json(msg='For IKE V1, \'ike_integrity\' must '
-                                 'be one of %s' % __IKE_V1_IKE_INTEGRITY_ALGORITHMS)
-        if connection['ikeV1']['esp']['encryption'] in __NO_INTEGRITY_ALGORITHMS:
-            del connection['ikeV1']['esp']['integrity']
-    elif 'ikeV2' in connection:
-        if connection['ikeV2']['ike']['encryption'] in __NO_INTEGRITY_ALGORITHMS:
-            if connection['ikeV2']['ike']['integrity'] is not None:
-                del connection['ikeV2']['ike']['integrity']
-            if connection['ikeV2']['ike']['prf'] is None:
-                connection['ikeV2']['ike']['prf'] = 'SHA_256'
-        else:
-            if connection['ikeV2']['ike']['integrity'] is None:
-                connection['ikeV2']['ike']['integrity'] = 'SHA256_HMAC'
-            if connection['ikeV2']['ike']['prf'] is not None:
-                del connection['ikeV2']['ike']['prf']
-
-    connection.update(dict(
-        type='SITE_IPSEC_VPN',
-        authType='PSK',
-        location=get_object_link(module, '/locations', 'location_id', 'location_href'),
-        nat=dict(
-            enabled=module.params.get('nat_enabled'),
-            mappings=[dict(native_cidr=nat_mapping)
-                      for nat_mapping in module.params.get('nat_mappings')]
-        )
-    ))
-    connection = snake_dict_to_camel_dict(connection)
-    # Correct naming
-    connection.update(dict(
-        primaryCustomerRouterIP=connection.pop('primaryCustomerRouterIp'),
-        secondaryCustomerRouterIP=connection.pop('secondaryCustomerRouterIp'),
-        customerASN=connection.pop('customerAsn'),
-        enableBGPPassword=connection.pop('enableBgpPassword'),
-        tags=module.params.get('tags')
-    ))
-    return connection
+from ..module_utils.pureport_connection_types import \
+    get_site_ipsec_vpn_connection_argument_spec, \
+    construct_site_ipsec_vpn_connection
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_objects import get_object_cache_argument_spec
+from ..module_utils.pureport_plan import get_plan_argument_spec
 
 
 def main():
@@ -521,152 +412,10 @@ def main():
     argument_spec.update(get_network_argument_spec())
     argument_spec.update(get_state_argument_spec())
     argument_spec.update(get_resolve_existing_argument_spec())
+    argument_spec.update(get_plan_argument_spec())
+    argument_spec.update(get_object_cache_argument_spec())
     argument_spec.update(get_wait_for_server_argument_spec())
-    argument_spec.update(get_connection_argument_spec())
-    argument_spec.update(
-        dict(
-            primary_customer_router_ip=dict(type='str', required=True),
-            secondary_customer_router_ip=dict(type='str'),
-            routing_type=dict(
-                type='str',
-                choices=[
-                    'ROUTE_BASED_BGP',
-                    'ROUTE_BASED_STATIC',
-                    'POLICY_BASED'
-                ],
-                default='ROUTE_BASED_BGP'
-            ),
-            physical_address=dict(type='dict'),
-            ike_version=dict(
-                type='str',
-                choices=[
-                    'V1',
-                    'V2'
-                ],
-                default='V2'
-            ),
-            ike_encryption=dict(
-                type='str',
-                choices=[
-                    'NULL',
-                    'AES_128',
-                    'AES_192',
-                    'AES_256',
-                    'AES_128_CTR',
-                    'AES_192_CTR',
-                    'AES_256_CTR',
-                    'AES_128_GCM_64',
-                    'AES_192_GCM_64',
-                    'AES_256_GCM_64',
-                    'AES_128_GCM_96',
-                    'AES_192_GCM_96',
-                    'AES_256_GCM_96',
-                    'AES_128_GCM_128',
-                    'AES_192_GCM_128',
-                    'AES_256_GCM_128'
-                ],
-                default='AES_128'
-            ),
-            ike_integrity=dict(
-                type='str',
-                choices=[
-                    'MD5_HMAC',
-                    'SHA1_HMAC',
-                    'SHA256_HMAC',
-                    'SHA384_HMAC',
-                    'SHA512_HMAC',
-                    'AES_XCBC'
-                ]
-            ),
-            ike_prf=dict(
-                type='str',
-                choices=[
-                    'MD5',
-                    'SHA_1',
-                    'AES_XCBC',
-                    'SHA_256',
-                    'SHA_384',
-                    'SHA_512'
-                ]
-            ),
-            ike_dh_group=dict(
-                type='str',
-                choices=[
-                    'MODP_1024',
-                    'MODP_1536',
-                    'MODP_2048',
-                    'MODP_3072',
-                    'MODP_4096',
-                    'MODP_6144',
-                    'MODP_8192',
-                    'ECP_192',
-                    'ECP_224',
-                    'ECP_256',
-                    'ECP_384',
-                    'ECP_521'
-                ],
-                default='MODP_2048'
-            ),
-            esp_encryption=dict(
-                type='str',
-                choices=[
-                    'NULL',
-                    'AES_128',
-                    'AES_192',
-                    'AES_256',
-                    'AES_128_CTR',
-                    'AES_192_CTR',
-                    'AES_256_CTR',
-                    'AES_128_GCM_64',
-                    'AES_192_GCM_64',
-                    'AES_256_GCM_64',
-                    'AES_128_GCM_96',
-                    'AES_192_GCM_96',
-                    'AES_256_GCM_96',
-                    'AES_128_GCM_128',
-                    'AES_192_GCM_128',
-                    'AES_256_GCM_128',
-                    'AES_128_GMAC',
-                    'AES_192_GMAC',
-                    'AES_256_GMAC'
-                ],
-                default='AES_128'
-            ),
-            esp_integrity=dict(
-                type='str',
-                choices=[
-                    'MD5_HMAC',
-                    'SHA1_HMAC',
-                    'SHA256_HMAC',
-                    'SHA384_HMAC',
-                    'SHA512_HMAC',
-                    'AES_XCBC'
-                ]
-            ),
-            esp_dh_group=dict(
-                type='str',
-                choices=[
-                    'MODP_1024',
-                    'MODP_1536',
-                    'MODP_2048',
-                    'MODP_3072',
-                    'MODP_4096',
-                    'MODP_6144',
-                    'MODP_8192',
-                    'ECP_192',
-                    'ECP_224',
-                    'ECP_256',
-                    'ECP_384',
-                    'ECP_521'
-                ],
-                default='MODP_2048'
-            ),
-            primary_key=dict(type='str'),
-            secondary_key=dict(type='str'),
-            traffic_selectors=dict(type='list', default=[], elements='dict'),
-            enable_bgp_password=dict(type='bool')
-        )
-    )
+    argument_spec.update(get_site_ipsec_vpn_connection_argument_spec())
     mutually_exclusive = []
     mutually_exclusive += get_client_mutually_exclusive()
     mutually_exclusive += [
@@ -678,7 +427,8 @@ def main():
     module = AnsibleModule(
         argument_spec=argument_spec,
         mutually_exclusive=mutually_exclusive,
-        required_one_of=required_one_of
+        required_one_of=required_one_of,
+        supports_check_mode=True
     )
     # Using partials to fill in the method params
     try:
@@ -686,16 +436,18 @@ def main():
             changed,
             changed_connection,
             argument_connection,
-            existing_connection
+            existing_connection,
+            diff
         ) = connection_crud(
             module,
-            partial(construct_connection, module)
+            partial(construct_site_ipsec_vpn_connection, module)
         )
         module.exit_json(
             changed=changed,
+            diff=diff,
             **camel_dict_to_snake_dict(changed_connection)
         )
-    except ClientHttpException as e:
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
@@ -39,6 +39,7 @@ options:
 extends_documentation_fragment:
     - pureport.fabric.client
     - pureport.fabric.account
+    - pureport.fabric.info
 '''
 
 EXAMPLES = '''
@@ -145,13 +146,8 @@ supported_ports:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.common.dict_transformations import camel_dict_to_snake_dict
 from traceback import format_exc
 
-try:
-    from pureport.exception.api import ClientHttpException
-except ImportError:
-    ClientHttpException = None
 from ..module_utils.pureport_client import \
     get_client_argument_spec, \
     get_client_mutually_exclusive, \
@@ -160,11 +156,15 @@ from ..module_utils.pureport_client import \
     get_account_argument_spec, \
     get_account_mutually_exclusive, \
     get_account_id
+from ..module_utils.pureport_exceptions import get_client_http_exception
+from ..module_utils.pureport_info import get_info_argument_spec, format_info_items
+from ..module_utils.pureport_pagination import list_items
 
 
 def main():
     argument_spec = dict()
     argument_spec.update(get_client_argument_spec())
+    argument_spec.update(get_info_argument_spec())
     argument_spec.update(get_account_argument_spec())
     argument_spec.update(dict(
         facility_id=dict(type='str'),
@@ -185,12 +185,14 @@ def main():
     )
     try:
         client = get_client(module)
-        supported_ports = client.accounts \
-            .supported_ports(get_account_id(module)) \
-            .list(get_object_id(module, 'facility_id', 'facility_href'))
-        module.exit_json(supported_ports=[camel_dict_to_snake_dict(supported_port)
-                                          for supported_port in supported_ports])
-    except ClientHttpException as e:
+        supported_ports = list_items(
+            module,
+            client,
+            '/accounts/%s/supportedPorts' % get_account_id(module),
+            dict(facility=get_object_id(module, 'facility_id', 'facility_href'))
+        )
+        module.exit_json(supported_ports=format_info_items(module, supported_ports))
+    except get_client_http_exception() as e:
         module.fail_json(msg=e.response.text, exception=format_exc())
 
 
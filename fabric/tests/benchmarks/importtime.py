@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+"""
+Measure the import time of each pureport.fabric module.
+
+Every task starts a new Python process that imports its module before doing any
+work, so this is paid by every task, even one that exits in check mode or is
+served from the local cache.  Each module is imported in a fresh interpreter
+with `python -X importtime`, and the median cumulative import time is reported,
+along with any slow to import dependency, e.g. requests, the module imports
+before it runs.  Results can be saved and later compared against, failing when a
+module got slower than the tolerance allows or imports a new slow dependency.
+"""
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from run import COLLECTION_DIR, link_collection
+
+MODULES_PACKAGE = 'ansible_collections.pureport.fabric.plugins.modules'
+# Dependencies that should only be imported once a module needs them
+SLOW_IMPORTS = ('requests', 'urllib3', 'pureport.api.client', 'multiprocessing.pool', 'yaml', 'click')
+# Import time differences below this many milliseconds are treated as noise
+IMPORT_TIME_NOISE = 5.0
+
+
+def get_module_names():
+    """
+    Get the names of all modules in the collection
+    :rtype: list[str]
+    """
+    modules_dir = os.path.join(COLLECTION_DIR, 'plugins', 'modules')
+    return sorted(name[:-3] for name in os.listdir(modules_dir) if name.endswith('.py'))
+
+
+def measure_import(collections_path, module):
+    """
+    Import a module in a new interpreter with -X importtime
+    :param str collections_path: a directory containing ansible_collections/pureport/fabric
+    :param str module: the module name
+    :returns: the cumulative import time in milliseconds and the names of all imported modules
+    :rtype: (float, list[str])
+    """
+    name = '%s.%s' % (MODULES_PACKAGE, module)
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % name],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=collections_path,
+        env=dict(os.environ, PYTHONPATH=collections_path)
+    )
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError('Importing %s failed: %s' % (module, stderr.decode('utf-8', 'replace')))
+    import_time = None
+    imported = []
+    # Lines look like 'import time:   self [us] | cumulative | imported package'
+    for line in stderr.decode('utf-8', 'replace').splitlines():
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, imported_name = line[len('import time:'):].split('|')
+        imported_name = imported_name.strip()
+        imported.append(imported_name)
+        if imported_name == name:
+            import_time = int(cumulative) / 1000.0
+    return import_time, imported
+
+
+def measure(collections_path, module, runs):
+    """
+    Measure a module's import time
+    :param str collections_path: a directory containing ansible_collections/pureport/fabric
+    :param str module: the module name
+    :param int runs: the number of runs
+    :rtype: dict
+    """
+    import_times = []
+    imported = []
+    for _ in range(runs):
+        import_time, imported = measure_import(collections_path, module)
+        import_times.append(import_time)
+    import_times.sort()
+    return dict(
+        import_time_ms=import_times[len(import_times) // 2],
+        imported_modules=len(imported),
+        slow_imports=sorted(name for name in imported if name in SLOW_IMPORTS)
+    )
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline
+    :param dict[str, dict] results: the results by module name
+    :param dict[str, dict] baseline: the baseline results by module name
+    :param float tolerance: the allowed relative increase of import time
+    :returns: a description of each regression
+    :rtype: list[str]
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result['import_time_ms'] > expected['import_time_ms'] * (1 + tolerance) and \
+                result['import_time_ms'] - expected['import_time_ms'] > IMPORT_TIME_NOISE:
+            regressions.append('%s: %.1fms import time, was %.1fms' % (
+                name, result['import_time_ms'], expected['import_time_ms']))
+        new_slow_imports = sorted(set(result['slow_imports']) - set(expected['slow_imports']))
+        if len(new_slow_imports) > 0:
+            regressions.append('%s: now imports %s' % (name, ', '.join(new_slow_imports)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='the number of runs per module, the median is reported')
+    parser.add_argument('--module', action='append', default=[], help='only measure this module, may be repeated')
+    parser.add_argument('--budget', type=float, help='fail if any module takes longer than this many milliseconds to import')
+    parser.add_argument('--save', help='save the results as JSON to this file')
+    parser.add_argument('--compare', help='compare the results against a JSON file saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='the allowed relative increase of import time when comparing, default 0.25')
+    args = parser.parse_args()
+
+    modules = args.module or get_module_names()
+    collections_path = link_collection()
+    try:
+        results = dict()
+        print('%-40s %12s %8s  %s' % ('module', 'import (ms)', 'modules', 'slow imports'))
+        for module in modules:
+            result = measure(collections_path, module, args.runs)
+            results[module] = result
+            print('%-40s %12.1f %8d  %s' % (module, result['import_time_ms'], result['imported_modules'],
+                                            ', '.join(result['slow_imports']) or '-'))
+            sys.stdout.flush()
+    finally:
+        shutil.rmtree(collections_path, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(dict(results=results), f, indent=2, sort_keys=True)
+    failures = []
+    if args.budget is not None:
+        failures += ['%s: %.1fms import time, over the %.1fms budget' % (name, result['import_time_ms'], args.budget)
+                     for name, result in sorted(results.items()) if result['import_time_ms'] > args.budget]
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failures += compare(results, baseline['results'], args.tolerance)
+    for failure in failures:
+        print('REGRESSION %s' % failure)
+    if len(failures) > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
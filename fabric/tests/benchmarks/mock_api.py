@@ -0,0 +1,425 @@
+#!/usr/bin/env python
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+"""
+A deterministic, in-memory mock of the Pureport API used by the benchmarks.
+
+Every response is generated from the dataset sizes alone, so two runs with the
+same sizes see exactly the same objects, ids and ETags.  Each request is delayed
+by a fixed latency to approximate a round-trip to the real API, and recorded so
+the number of HTTP calls made by a module can be reported.
+
+Besides the API, the server exposes two control endpoints, which are not recorded:
+    GET  /__calls  the recorded [method, path, status] calls
+    POST /__reset  clear the recorded calls and regenerate the dataset
+"""
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import json
+import threading
+from copy import deepcopy
+from hashlib import sha1
+from itertools import count
+from time import sleep
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlsplit
+
+CONNECTION_TYPES = ['AWS_DIRECT_CONNECT', 'AZURE_EXPRESS_ROUTE', 'GOOGLE_CLOUD_INTERCONNECT', 'SITE_IPSEC_VPN']
+OPTIONS = {
+    'IKEV1IKEEncryption': [dict(value='AES_128', description='128 bit AES-CBC', default=True)],
+    'IKEV2IKEPRF': [dict(value='SHA_256', description='SHA-256', default=True)]
+}
+
+
+def link(kind, object_id, title=None):
+    """
+    Build a link object
+    :param str kind: the resource kind, e.g. 'networks'
+    :param str object_id: the object id
+    :param str title: an optional title
+    :rtype: dict
+    """
+    result = dict(id=object_id, href='/%s/%s' % (kind, object_id))
+    if title is not None:
+        result['title'] = title
+    return result
+
+
+def merge_patch(target, patch):
+    """
+    Apply a JSON merge patch (RFC 7396)
+    :param * target: the patched value
+    :param * patch: the patch
+    :rtype: *
+    """
+    if not isinstance(patch, dict):
+        return deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else dict()
+    for k, v in patch.items():
+        if v is None:
+            result.pop(k, None)
+        else:
+            result[k] = merge_patch(result.get(k), v)
+    return result
+
+
+class Dataset(object):
+    def __init__(self, accounts=1, networks=2, connections=10, ports=2, locations=20, facilities=20):
+        """
+        A generated set of Pureport objects
+        :param int accounts: the number of accounts
+        :param int networks: the number of networks per account
+        :param int connections: the number of connections per network
+        :param int ports: the number of ports per account
+        :param int locations: the number of locations
+        :param int facilities: the number of facilities
+        """
+        self.sizes = dict(accounts=accounts, networks=networks, connections=connections, ports=ports,
+                          locations=locations, facilities=facilities)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Regenerate the dataset from its sizes, discarding any changes
+        """
+        sizes = self.sizes
+        self.ids = count(1)
+        self.locations = [
+            dict(link('locations', 'loc-%d' % i), name='Location %d' % i,
+                 geoCoordinates=dict(latitude=float(i % 90), longitude=float(i % 180)),
+                 locationLinks=[link('locations', 'loc-%d' % ((i + 1) % sizes['locations']))])
+            for i in range(sizes['locations'])
+        ]
+        self.facilities = [
+            dict(link('facilities', 'fac-%d' % i), name='Facility %d' % i, vendor='Vendor', state='ACTIVE',
+                 altIds=['ALT-%d' % i], location=link('locations', 'loc-%d' % (i % max(1, sizes['locations']))),
+                 physicalAddress=dict(street='%d Main St' % i, city='City', state='ST', postalCode='00000', country='US'))
+            for i in range(sizes['facilities'])
+        ]
+        self.cloud_regions = [
+            dict(link('cloudRegions', 'aws-region-%d' % i), provider='AWS', providerAssignedId='region-%d' % i,
+                 displayName='Region %d' % i)
+            for i in range(10)
+        ]
+        self.cloud_services = [
+            dict(link('cloudServices', 'aws-service-%d' % i), provider='AWS', service='S3', name='Service %d' % i,
+                 ipv4PrefixCount=10, ipv6PrefixCount=0, cloudRegion=link('cloudRegions', 'aws-region-%d' % i))
+            for i in range(10)
+        ]
+        self.accounts = dict()
+        self.networks = dict()
+        self.connections = dict()
+        self.ports = dict()
+        for a in range(sizes['accounts']):
+            account_id = 'ac-%d' % a
+            self.accounts[account_id] = dict(link('accounts', account_id), name='Account %d' % a)
+            for n in range(sizes['networks']):
+                network_id = 'network-%d-%d' % (a, n)
+                self.networks[network_id] = dict(link('networks', network_id), name='Network %d-%d' % (a, n),
+                                                 description='', account=link('accounts', account_id))
+                for c in range(sizes['connections']):
+                    connection_id = 'conn-%d-%d-%d' % (a, n, c)
+                    self.connections[connection_id] = dict(
+                        link('connections', connection_id),
+                        name='Connection %d-%d-%d' % (a, n, c),
+                        type=CONNECTION_TYPES[c % len(CONNECTION_TYPES)],
+                        state='ACTIVE',
+                        speed=50,
+                        billingTerm='HOURLY',
+                        highAvailability=False,
+                        location=link('locations', 'loc-%d' % (c % max(1, sizes['locations']))),
+                        network=link('networks', network_id),
+                        customerNetworks=[dict(name='Network %d' % c, address='10.%d.%d.0/24' % (n % 256, c % 256))],
+                        nat=dict(enabled=False, mappings=[]),
+                        tags=dict(index='%d' % c)
+                    )
+            for p in range(sizes['ports']):
+                port_id = 'port-%d-%d' % (a, p)
+                self.ports[port_id] = dict(
+                    link('ports', port_id), name='Port %d-%d' % (a, p), provider='AWS', speed=1000,
+                    mediaType='LR', availabilityDomain='PRIMARY', billingTerm='HOURLY', state='ACTIVE',
+                    account=link('accounts', account_id),
+                    facility=link('facilities', 'fac-%d' % (p % max(1, sizes['facilities'])))
+                )
+
+    def next_id(self, prefix):
+        """
+        Get the next deterministic id for a created object
+        :param str prefix: the id prefix
+        :rtype: str
+        """
+        return '%s-new-%d' % (prefix, next(self.ids))
+
+
+class MockApiRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def __send(self, status_code, body=None, headers=None):
+        content = b'' if body is None else json.dumps(body, sort_keys=True).encode('utf-8')
+        self.server.record_status(self.__call, status_code)
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for k, v in (headers or dict()).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def __send_get(self, body):
+        """
+        Send a GET response with a deterministic ETag, honoring If-None-Match
+        :param list|dict body: the response body
+        """
+        etag = '"%s"' % sha1(json.dumps(body, sort_keys=True).encode('utf-8')).hexdigest()
+        if self.headers.get('If-None-Match') == etag:
+            self.__send(304, None, {'ETag': etag})
+        else:
+            self.__send(200, body, {'ETag': etag})
+
+    def __not_found(self, method, path):
+        self.__send(404, dict(status=404, code='NOT_FOUND', message='No route for %s %s' % (method, path)))
+
+    def __read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length).decode('utf-8')) if length > 0 else None
+
+    def __handle(self, method):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = parse_qs(url.query)
+        body = self.__read_body()
+
+        if url.path == '/__calls':
+            content = json.dumps(self.server.get_calls()).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+        if url.path == '/__reset':
+            self.server.reset()
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.__call = self.server.record_call(method, self.path)
+        sleep(self.server.latency)
+        dataset = self.server.dataset
+        with dataset.lock:
+            self.__route(method, url.path, parts, query, body, dataset)
+
+    def __route(self, method, path, parts, query, body, dataset):
+        collections = dict(networks=dataset.networks, connections=dataset.connections, ports=dataset.ports)
+        if path == '/login' and method == 'POST':
+            return self.__send(200, dict(access_token='mock-access-token', refresh_token='mock-refresh-token',
+                                         expires_in=3600))
+        if method == 'GET' and path in ('/locations', '/facilities', '/cloudRegions', '/cloudServices', '/options'):
+            return self.__send_get(dict(
+                locations=dataset.locations,
+                facilities=dataset.facilities,
+                cloudRegions=dataset.cloud_regions,
+                cloudServices=dataset.cloud_services,
+                options=OPTIONS
+            )[parts[0]])
+        if method == 'GET' and len(parts) == 2 and parts[0] in ('locations', 'facilities'):
+            items = dataset.locations if parts[0] == 'locations' else dataset.facilities
+            matches = [item for item in items if item['id'] == parts[1]]
+            return self.__send_get(matches[0]) if matches else self.__not_found(method, path)
+        if path == '/accounts' and method == 'GET':
+            accounts = list(dataset.accounts.values())
+            if 'name' in query:
+                accounts = [account for account in accounts if account['name'] in query['name']]
+            if 'ids' in query:
+                accounts = [account for account in accounts if account['id'] in query['ids']]
+            return self.__send_get(accounts)
+        if len(parts) >= 2 and parts[0] == 'accounts':
+            account = dataset.accounts.get(parts[1])
+            if account is None:
+                return self.__not_found(method, path)
+            if len(parts) == 2 and method == 'GET':
+                return self.__send_get(account)
+            if len(parts) == 3 and method == 'GET':
+                account_href = account['href']
+                if parts[2] == 'connections':
+                    network_hrefs = set(network['href'] for network in dataset.networks.values()
+                                        if network['account']['href'] == account_href)
+                    return self.__send_get([connection for connection in dataset.connections.values()
+                                            if connection['network']['href'] in network_hrefs])
+                if parts[2] in ('networks', 'ports'):
+                    return self.__send_get([item for item in collections[parts[2]].values()
+                                            if item['account']['href'] == account_href])
+                if parts[2] == 'supportedConnections':
+                    return self.__send_get([
+                        dict(id='sc-%d' % i, href='/supportedConnections/sc-%d' % i, type=connection_type, speed=50,
+                             location=link('locations', 'loc-%d' % i), billingPlans=[dict(billingTerm='HOURLY')])
+                        for i, connection_type in enumerate(CONNECTION_TYPES)
+                    ])
+                if parts[2] == 'supportedPorts':
+                    facility_ids = query.get('facility') or [facility['id'] for facility in dataset.facilities]
+                    return self.__send_get([
+                        dict(facility=link('facilities', facility_id), provider='AWS', speed=speed,
+                             availabilityDomain='PRIMARY', mediaType='LR', billingPlans=[dict(billingTerm='HOURLY')])
+                        for facility_id in facility_ids for speed in (1000, 10000)
+                    ])
+            if len(parts) == 3 and method == 'POST' and parts[2] in ('networks', 'ports'):
+                object_id = dataset.next_id(parts[2][:-1])
+                created = dict(body, id=object_id, href='/%s/%s' % (parts[2], object_id),
+                               account=link('accounts', account['id']))
+                if parts[2] == 'ports':
+                    created['state'] = 'ACTIVE'
+                collections[parts[2]][object_id] = created
+                return self.__send(201, created)
+        if len(parts) == 3 and parts[0] == 'networks' and parts[2] == 'connections':
+            network = dataset.networks.get(parts[1])
+            if network is None:
+                return self.__not_found(method, path)
+            if method == 'GET':
+                return self.__send_get([connection for connection in dataset.connections.values()
+                                        if connection['network']['href'] == network['href']])
+            if method == 'POST':
+                object_id = dataset.next_id('conn')
+                created = dict(body, id=object_id, href='/connections/%s' % object_id, state='ACTIVE',
+                               network=link('networks', network['id']))
+                dataset.connections[object_id] = created
+                return self.__send(201, created)
+        if len(parts) == 2 and parts[0] in collections:
+            items = collections[parts[0]]
+            if parts[1] not in items:
+                return self.__not_found(method, path)
+            if method == 'GET':
+                return self.__send_get(items[parts[1]])
+            if method == 'PUT':
+                updated = deepcopy(body)
+                for k in ('id', 'href', 'account', 'network', 'state'):
+                    if k in items[parts[1]]:
+                        updated.setdefault(k, items[parts[1]][k])
+                items[parts[1]] = updated
+                return self.__send(200, updated)
+            if method == 'PATCH' and self.server.patch:
+                patched = merge_patch(items[parts[1]], body)
+                for k in ('id', 'href', 'account', 'network', 'state'):
+                    if k in items[parts[1]]:
+                        patched[k] = items[parts[1]][k]
+                items[parts[1]] = patched
+                return self.__send(200, patched)
+            if method == 'DELETE':
+                del items[parts[1]]
+                return self.__send(200, None)
+            return self.__send(405, dict(status=405, code='METHOD_NOT_ALLOWED', message='%s is not allowed' % method))
+        return self.__not_found(method, path)
+
+    def do_GET(self):
+        self.__handle('GET')
+
+    def do_POST(self):
+        self.__handle('POST')
+
+    def do_PUT(self):
+        self.__handle('PUT')
+
+    def do_PATCH(self):
+        self.__handle('PATCH')
+
+    def do_DELETE(self):
+        self.__handle('DELETE')
+
+
+class MockApiServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, dataset, latency=0.0, patch=True):
+        """
+        A threaded mock Pureport API server
+        :param (str, int) address: the host and port to listen on, port 0 picks a free port
+        :param Dataset dataset: the served dataset
+        :param float latency: the number of seconds each request is delayed
+        :param bool patch: if PATCH is supported, otherwise it is rejected with a 405
+        """
+        HTTPServer.__init__(self, address, MockApiRequestHandler)
+        self.dataset = dataset
+        self.latency = latency
+        self.patch = patch
+        self.__calls = []
+        self.__calls_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return 'http://%s:%d' % self.server_address[:2]
+
+    def record_call(self, method, path):
+        with self.__calls_lock:
+            self.__calls.append([method, path, None])
+            return len(self.__calls) - 1
+
+    def record_status(self, index, status_code):
+        with self.__calls_lock:
+            self.__calls[index][2] = status_code
+
+    def get_calls(self):
+        with self.__calls_lock:
+            return [list(call) for call in self.__calls]
+
+    def reset(self):
+        with self.__calls_lock:
+            self.__calls = []
+        with self.dataset.lock:
+            self.dataset.reset()
+
+
+def get_dataset_argument_parser(parser):
+    """
+    Add the dataset size and latency arguments to a parser
+    :param argparse.ArgumentParser parser: the parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser.add_argument('--latency', type=float, default=20, help='the latency of each request in milliseconds')
+    parser.add_argument('--accounts', type=int, default=1, help='the number of accounts')
+    parser.add_argument('--networks', type=int, default=2, help='the number of networks per account')
+    parser.add_argument('--connections', type=int, default=100, help='the number of connections per network')
+    parser.add_argument('--ports', type=int, default=10, help='the number of ports per account')
+    parser.add_argument('--locations', type=int, default=50, help='the number of locations')
+    parser.add_argument('--facilities', type=int, default=50, help='the number of facilities')
+    parser.add_argument('--no-patch', action='store_true', help='reject PATCH requests with a 405')
+    return parser
+
+
+def create_server(args, host='127.0.0.1', port=0):
+    """
+    Create a mock server from parsed dataset arguments
+    :param argparse.Namespace args: the parsed arguments
+    :param str host: the host to listen on
+    :param int port: the port to listen on
+    :rtype: MockApiServer
+    """
+    dataset = Dataset(accounts=args.accounts, networks=args.networks, connections=args.connections,
+                      ports=args.ports, locations=args.locations, facilities=args.facilities)
+    return MockApiServer((host, port), dataset, latency=args.latency / 1000.0, patch=not args.no_patch)
+
+
+def main():
+    parser = get_dataset_argument_parser(argparse.ArgumentParser(description=__doc__.strip().split('\n')[0]))
+    parser.add_argument('--port', type=int, default=8765, help='the port to listen on')
+    args = parser.parse_args()
+    server = create_server(args, port=args.port)
+    print('Serving the mock Pureport API on %s' % server.url)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
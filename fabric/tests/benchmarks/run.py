@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+#
+# Copyright: Pureport
+# GNU General Public License v3.0+ (see licenses/gpl-3.0-standalone.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+#
+"""
+Benchmark the pureport.fabric modules against a local mock Pureport API.
+
+Each case runs a module the way Ansible does, as a separate Python process, and
+reports its wall time, the number of HTTP calls it made and its peak RSS.  The
+mock dataset is regenerated before every run, so the number of calls is
+deterministic and any increase is a regression.  Results can be saved and later
+compared against, failing when a case makes more calls, or is slower or larger
+than the tolerance allows.
+"""
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from time import time
+
+try:
+    from urllib.request import Request, urlopen
+except ImportError:
+    from urllib2 import Request, urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mock_api import get_dataset_argument_parser, create_server
+
+COLLECTION_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+# Wall time differences below this many seconds are treated as noise
+WALL_TIME_NOISE = 0.05
+
+NETWORK = dict(account_id='ac-0', name='Benchmark Network')
+PORT = dict(account_id='ac-0', name='Benchmark Port', facility_id='fac-0', provider='AWS', speed=1000,
+            media_type='LR', availability_domain='PRIMARY', billing_term='HOURLY')
+CONNECTION = dict(network_id='network-0-0', name='Benchmark Connection', speed=50, location_id='loc-0',
+                  aws_account_id='123456789012', aws_region='us-west-2')
+BULK_CONNECTIONS = [dict(type='AWS_DIRECT_CONNECT', name='Benchmark Connection %d' % i, speed=50,
+                         location_id='loc-0', aws_account_id='123456789012', aws_region='us-west-2')
+                    for i in range(10)]
+FABRIC = dict(account_id='ac-0', network=dict(name='Benchmark Fabric'),
+              ports=[dict(((k, v) for k, v in PORT.items() if k != 'account_id'), name='Benchmark Fabric Port %d' % i)
+                     for i in range(2)],
+              connections=[dict(type='PORT', name='Benchmark Fabric Connection %d' % i, speed=50, location_id='loc-0',
+                                primary_port_name='Benchmark Fabric Port %d' % (i % 2), primary_customer_vlan=100 + i)
+                           for i in range(4)] + BULK_CONNECTIONS[:4])
+
+# Each case is a module, its args and whether it runs on a cold or a warm local
+# cache.  Any setup invocations run first on the same dataset and are not measured.
+CASES = [
+    dict(name='access_token_info', module='access_token_info', args=dict()),
+    dict(name='accounts_info', module='accounts_info', args=dict()),
+    dict(name='accounts_info/filter', module='accounts_info', args=dict(filters=dict(name='Account 0'))),
+    dict(name='cloud_regions_info', module='cloud_regions_info', args=dict()),
+    dict(name='cloud_regions_info/warm', module='cloud_regions_info', args=dict(), warm=True),
+    dict(name='cloud_services_info', module='cloud_services_info', args=dict()),
+    dict(name='cloud_services_info/warm', module='cloud_services_info', args=dict(), warm=True),
+    dict(name='connections_info/account', module='connections_info', args=dict(account_id='ac-0')),
+    dict(name='connections_info/network', module='connections_info', args=dict(network_id='network-0-0')),
+    dict(name='connections_info/networks', module='connections_info',
+         args=dict(network_ids=['network-0-0', 'network-0-1'])),
+    dict(name='connections_info/fields', module='connections_info',
+         args=dict(account_id='ac-0', fields=['id', 'name'], filters=dict(type='AWS_*'))),
+    dict(name='facilities_info', module='facilities_info', args=dict()),
+    dict(name='facilities_info/warm', module='facilities_info', args=dict(), warm=True),
+    dict(name='locations_info', module='locations_info', args=dict()),
+    dict(name='locations_info/warm', module='locations_info', args=dict(), warm=True),
+    dict(name='networks_info', module='networks_info', args=dict(account_id='ac-0')),
+    dict(name='options_info', module='options_info', args=dict()),
+    dict(name='options_info/warm', module='options_info', args=dict(), warm=True),
+    dict(name='ports_info', module='ports_info', args=dict(account_id='ac-0')),
+    dict(name='supported_connections_info', module='supported_connections_info', args=dict(account_id='ac-0')),
+    dict(name='supported_ports_info', module='supported_ports_info', args=dict(account_id='ac-0', facility_id='fac-0')),
+    dict(name='network/create', module='network', args=NETWORK),
+    dict(name='network/unchanged', module='network', args=NETWORK, setup=[('network', NETWORK)]),
+    dict(name='network/update', module='network', args=dict(NETWORK, description='Updated'),
+         setup=[('network', NETWORK)]),
+    dict(name='network/delete', module='network', args=dict(NETWORK, state='absent'), setup=[('network', NETWORK)]),
+    dict(name='port/create', module='port', args=PORT),
+    dict(name='port/unchanged', module='port', args=PORT, setup=[('port', PORT)]),
+    dict(name='aws_direct_connect_connection/create', module='aws_direct_connect_connection', args=CONNECTION),
+    dict(name='aws_direct_connect_connection/unchanged', module='aws_direct_connect_connection', args=CONNECTION,
+         setup=[('aws_direct_connect_connection', CONNECTION)]),
+    dict(name='aws_direct_connect_connection/update', module='aws_direct_connect_connection',
+         args=dict(CONNECTION, description='Updated'), setup=[('aws_direct_connect_connection', CONNECTION)]),
+    dict(name='aws_direct_connect_connection/update-speed', module='aws_direct_connect_connection',
+         args=dict(CONNECTION, speed=100, wait_for_server=True), setup=[('aws_direct_connect_connection', CONNECTION)]),
+    dict(name='aws_direct_connect_connection/update-tags', module='aws_direct_connect_connection',
+         args=dict(CONNECTION, tags=dict(team='network'), wait_for_server=True),
+         setup=[('aws_direct_connect_connection', CONNECTION)]),
+    dict(name='aws_direct_connect_connection/delete', module='aws_direct_connect_connection',
+         args=dict(CONNECTION, state='absent'), setup=[('aws_direct_connect_connection', CONNECTION)]),
+    dict(name='connections/create', module='connections',
+         args=dict(network_id='network-0-0', connections=BULK_CONNECTIONS)),
+    dict(name='connections/unchanged', module='connections',
+         args=dict(network_id='network-0-0', connections=BULK_CONNECTIONS),
+         setup=[('connections', dict(network_id='network-0-0', connections=BULK_CONNECTIONS))]),
+    dict(name='fabric_state/create', module='fabric_state', args=FABRIC),
+    dict(name='fabric_state/unchanged', module='fabric_state', args=FABRIC, setup=[('fabric_state', FABRIC)]),
+    dict(name='connection_wait', module='connection_wait',
+         args=dict(connection_ids=['conn-0-0-%d' % i for i in range(10)])),
+]
+
+
+class Runner(object):
+    def __init__(self, server, collections_path):
+        """
+        Runs modules against the mock server and measures them
+        :param mock_api.MockApiServer server: the mock server
+        :param str collections_path: a directory containing ansible_collections/pureport/fabric
+        """
+        self.server = server
+        self.collections_path = collections_path
+
+    def __control(self, path, method='GET'):
+        request = Request(self.server.url + path, data=b'' if method == 'POST' else None)
+        response = urlopen(request)
+        try:
+            content = response.read()
+            return json.loads(content.decode('utf-8')) if content else None
+        finally:
+            response.close()
+
+    def invoke(self, module, args, cache_dir):
+        """
+        Run a module in a new process, the way Ansible runs it
+        :param str module: the module name
+        :param dict args: the module args
+        :param str cache_dir: the local cache directory of the module
+        :returns: the module result, the wall time in seconds and the peak RSS in kilobytes
+        :rtype: (dict, float, int)
+        """
+        module_args = dict(api_base_url=self.server.url, api_key='benchmark', api_secret='benchmark')
+        module_args.update(args)
+        fd, args_path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(dict(ANSIBLE_MODULE_ARGS=module_args), f)
+        env = dict(os.environ,
+                   PYTHONPATH=self.collections_path,
+                   PUREPORT_API_URL=self.server.url,
+                   PUREPORT_ANSIBLE_CACHE_DIR=cache_dir)
+        env.pop('PUREPORT_ANSIBLE_PROXY_SOCKET', None)
+        try:
+            with tempfile.TemporaryFile() as output:
+                start = time()
+                process = subprocess.Popen(
+                    [sys.executable, '-m', 'ansible_collections.pureport.fabric.plugins.modules.%s' % module, args_path],
+                    stdout=output, stderr=subprocess.STDOUT, cwd=self.collections_path, env=env
+                )
+                _, status, usage = os.wait4(process.pid, 0)
+                process.returncode = status
+                wall_time = time() - start
+                output.seek(0)
+                content = output.read().decode('utf-8', 'replace')
+        finally:
+            os.remove(args_path)
+        try:
+            result = json.loads(content[content.index('{'):])
+        except ValueError:
+            result = dict(failed=True, msg=content.strip())
+        if status != 0 and not result.get('failed'):
+            result = dict(failed=True, msg=content.strip())
+        return result, wall_time, usage.ru_maxrss
+
+    def run(self, case, runs):
+        """
+        Measure a case, starting each run from a freshly generated dataset
+        :param dict case: the case
+        :param int runs: the number of runs
+        :rtype: dict
+        """
+        wall_times = []
+        calls = 0
+        max_rss = 0
+        for _ in range(runs):
+            self.__control('/__reset', 'POST')
+            cache_dir = tempfile.mkdtemp(prefix='pureport-benchmark-')
+            try:
+                invocations = list(case.get('setup', []))
+                if case.get('warm'):
+                    invocations.append((case['module'], case['args']))
+                for module, args in invocations:
+                    result, _, _ = self.invoke(module, args, cache_dir)
+                    if result.get('failed'):
+                        raise RuntimeError('Setup of %s failed: %s' % (case['name'], result.get('msg')))
+                calls_before = len(self.__control('/__calls'))
+                result, wall_time, rss = self.invoke(case['module'], case['args'], cache_dir)
+                if result.get('failed'):
+                    raise RuntimeError('%s failed: %s' % (case['name'], result.get('msg')))
+                wall_times.append(wall_time)
+                calls = max(calls, len(self.__control('/__calls')) - calls_before)
+                max_rss = max(max_rss, rss)
+            finally:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+        wall_times.sort()
+        return dict(wall_time=wall_times[len(wall_times) // 2], calls=calls, peak_rss_kb=max_rss)
+
+
+def link_collection():
+    """
+    Expose this checkout as the pureport.fabric collection in a temporary directory
+    :rtype: str
+    """
+    collections_path = tempfile.mkdtemp(prefix='pureport-collections-')
+    namespace_path = os.path.join(collections_path, 'ansible_collections', 'pureport')
+    os.makedirs(namespace_path)
+    os.symlink(COLLECTION_DIR, os.path.join(namespace_path, 'fabric'))
+    return collections_path
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline
+    :param dict[str, dict] results: the results by case name
+    :param dict[str, dict] baseline: the baseline results by case name
+    :param float tolerance: the allowed relative increase of wall time and peak RSS
+    :returns: a description of each regression
+    :rtype: list[str]
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result['calls'] > expected['calls']:
+            regressions.append('%s: %d HTTP calls, was %d' % (name, result['calls'], expected['calls']))
+        if result['wall_time'] > expected['wall_time'] * (1 + tolerance) and \
+                result['wall_time'] - expected['wall_time'] > WALL_TIME_NOISE:
+            regressions.append('%s: %.3fs wall time, was %.3fs' % (name, result['wall_time'], expected['wall_time']))
+        if result['peak_rss_kb'] > expected['peak_rss_kb'] * (1 + tolerance):
+            regressions.append('%s: %.1fMB peak RSS, was %.1fMB' % (
+                name, result['peak_rss_kb'] / 1024.0, expected['peak_rss_kb'] / 1024.0))
+    return regressions
+
+
+def main():
+    parser = get_dataset_argument_parser(argparse.ArgumentParser(description=__doc__.strip().split('\n')[0]))
+    parser.add_argument('--runs', type=int, default=3, help='the number of runs per case, the median wall time is reported')
+    parser.add_argument('--case', action='append', default=[], help='only run cases whose name starts with this, may be repeated')
+    parser.add_argument('--save', help='save the results as JSON to this file')
+    parser.add_argument('--compare', help='compare the results against a JSON file saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='the allowed relative increase of wall time and peak RSS when comparing')
+    args = parser.parse_args()
+
+    cases = [case for case in CASES if len(args.case) == 0 or case['name'].startswith(tuple(args.case))]
+    server = create_server(args)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+    collections_path = link_collection()
+    try:
+        runner = Runner(server, collections_path)
+        results = dict()
+        print('%-45s %10s %8s %10s' % ('case', 'wall (s)', 'calls', 'rss (MB)'))
+        for case in cases:
+            result = runner.run(case, args.runs)
+            results[case['name']] = result
+            print('%-45s %10.3f %8d %10.1f' % (case['name'], result['wall_time'], result['calls'],
+                                               result['peak_rss_kb'] / 1024.0))
+            sys.stdout.flush()
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(collections_path, ignore_errors=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(dict(dataset=dict((k, v) for k, v in vars(args).items()
+                                        if k in ('latency', 'accounts', 'networks', 'connections', 'ports',
+                                                 'locations', 'facilities', 'no_patch')),
+                           results=results), f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()